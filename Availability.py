@@ -0,0 +1,90 @@
+from BookingIndex import toDateKey
+
+def formatClock(seconds):
+    """
+    Formats seconds since midnight as 'HH:MM'.
+
+    Args:
+        seconds (int): Seconds since midnight; 86400 is formatted as '24:00'.
+
+    Returns:
+        str: The time in 'HH:MM' format.
+    """
+
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+def findFreeSlots(bookings, venueIds, dates, dayStart, dayEnd, minDuration):
+    """
+    Computes the free intervals of every venue on every date with a single sweep over the bookings.
+
+    Within each venue and date the bookings must be ordered by start time, as the availability query returns them.
+    For each venue and date the sweep keeps the end of the latest booking seen so far; a gap between it
+    and the next booking's start, or the end of the day, is free if it is at least minDuration long.
+    Overlapping bookings are handled because the end only ever moves forward.
+
+    Args:
+        bookings (Iterable[tuple]): (venue_id, date, from_seconds, end_seconds) rows with times in seconds since
+                                    midnight, e.g. in (date, venue_id, from_time) order.
+        venueIds (Iterable[int]): The venues to report, in the order they should be listed.
+        dates (Iterable[datetime.date or str]): The dates to report, in ascending order.
+        dayStart (int): The start of the bookable day, in seconds since midnight.
+        dayEnd (int): The end of the bookable day, in seconds since midnight.
+        minDuration (int): The shortest free interval to report, in seconds.
+
+    Returns:
+        dict: Maps each venue id to a dict mapping each date ('YYYY-MM-DD') to a list of (start, end) pairs in seconds.
+    """
+
+    dateKeys = [toDateKey(day) for day in dates]
+    free = {venueId: {} for venueId in venueIds}
+    busyUntil = {}
+
+    # Rows arrive grouped by venue and date, so the group state is only looked up when the group changes
+    groupVenue = groupDate = slots = cursorKey = None
+    cursor = dayStart
+    for venueId, day, start, end in bookings:
+        if venueId != groupVenue or day != groupDate:
+            if cursorKey is not None:
+                busyUntil[cursorKey] = cursor
+            groupVenue, groupDate = venueId, day
+            days = free.get(venueId)
+            if days is None:
+                slots = cursorKey = None
+                continue
+            key = toDateKey(day)
+            cursorKey = (venueId, key)
+            slots = days.get(key)
+            if slots is None:
+                slots = days[key] = []
+                cursor = dayStart
+            else:
+                cursor = busyUntil[cursorKey]
+        elif slots is None:
+            continue
+
+        # Clip the booking to the bookable day
+        if start < dayStart:
+            start = dayStart
+        elif start > dayEnd:
+            start = dayEnd
+        if start - cursor >= minDuration:
+            slots.append((cursor, start))
+        if end > cursor:
+            cursor = end if end < dayEnd else dayEnd
+
+    if cursorKey is not None:
+        busyUntil[cursorKey] = cursor
+
+    result = {}
+    for venueId, days in free.items():
+        result[venueId] = {}
+        for key in dateKeys:
+            slots = days.get(key)
+            if slots is None:
+                # No bookings that day, so the whole day is free
+                slots = [(dayStart, dayEnd)] if dayEnd - dayStart >= minDuration else []
+            elif dayEnd - busyUntil[(venueId, key)] >= minDuration:
+                slots.append((busyUntil[(venueId, key)], dayEnd))
+            result[venueId][key] = slots
+
+    return result
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Availability import findFreeSlots
+
+def generateBookings(venues, days, perDay, seed=0):
+    """
+    Generates random non-overlapping bookings, ordered the way the availability query returns them.
+
+    Args:
+        venues (int): Number of venues.
+        days (int): Number of consecutive days, starting today.
+        perDay (int): Bookings per venue per day.
+        seed (int): Random seed, so runs are comparable.
+
+    Returns:
+        tuple[list[tuple], list[date]]: (venue_id, date, from_seconds, end_seconds) rows in (date, venue_id, from_time)
+            order, as the availability query returns them, and the dates.
+    """
+
+    rng = random.Random(seed)
+    dates = [date.today() + timedelta(days=offset) for offset in range(days)]
+    bookings = []
+    for day in dates:
+        for venueId in range(1, venues + 1):
+            # Pick start times on a 30-minute grid between 08:00 and 20:00 and make each booking 30-90 minutes long
+            starts = sorted(rng.sample(range(16, 40), perDay))
+            for slot in starts:
+                start = slot * 1800
+                end = min(start + rng.choice((1800, 3600, 5400)), 20 * 3600)
+                bookings.append((venueId, day, start, end))
+    return bookings, dates
+
+def timeSweep(bookings, venueIds, dates, minDuration, repeats):
+    """
+    Runs the sweep repeatedly.
+
+    Returns:
+        list[float]: The duration in seconds of each run.
+    """
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        findFreeSlots(bookings, venueIds, dates, 8 * 3600, 20 * 3600, minDuration)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def timeDatabase(fromDate, toDate, minDuration, repeats):
+    """
+    Runs VenueManagement.findAvailability against the configured database, query included.
+
+    Returns:
+        list[float]: The duration in seconds of each run.
+    """
+
+    from VenueManagement import VenueManagement
+
+    service = VenueManagement()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        service.findAvailability(fromDate, toDate, minDuration // 60)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def report(label, timings):
+    p95 = statistics.quantiles(timings, n=20, method='inclusive')[-1] if len(timings) >= 2 else timings[0]
+    print(f"{label:<32} p50 {statistics.median(timings) * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the free-slot availability sweep.")
+    parser.add_argument('--venues', type=int, default=300)
+    parser.add_argument('--days', type=int, default=31)
+    parser.add_argument('--per-day', type=int, default=6, help="Bookings per venue per day")
+    parser.add_argument('--duration', type=int, default=60, help="Minimum free interval in minutes")
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--db', action='store_true',
+                        help="Also time findAvailability end to end against the configured database")
+    args = parser.parse_args()
+
+    bookings, dates = generateBookings(args.venues, args.days, args.per_day)
+    print(f"{args.venues} venues x {args.days} days, {len(bookings)} bookings")
+
+    timings = timeSweep(bookings, range(1, args.venues + 1), dates, args.duration * 60, args.repeats)
+    report("sweep (in memory)", timings)
+
+    if args.db:
+        timings = timeDatabase(dates[0].isoformat(), dates[-1].isoformat(), args.duration * 60, args.repeats)
+        report("findAvailability (database)", timings)
@@ -0,0 +1,96 @@
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PasswordHasher import PasswordHasher, PasswordHasherBusyError
+
+PASSWORD = 'Venue@Scope1'
+
+def measureSingleCore(rounds, duration):
+    """
+    Verifies one password repeatedly on the calling thread.
+
+    Args:
+        rounds (int): The bcrypt cost factor.
+        duration (float): Seconds to keep verifying.
+
+    Returns:
+        list[float]: The duration in seconds of each verification.
+    """
+
+    hashedPassword = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds))
+    timings = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline or not timings:
+        started = time.perf_counter()
+        bcrypt.checkpw(PASSWORD.encode('utf-8'), hashedPassword)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def measurePool(rounds, duration, workers, clients):
+    """
+    Verifies passwords through PasswordHasher from several client threads, like concurrent login requests.
+
+    Args:
+        rounds (int): The bcrypt cost factor.
+        duration (float): Seconds to keep verifying.
+        workers (int): Threads in the hasher's pool.
+        clients (int): Concurrent callers.
+
+    Returns:
+        tuple[int, int, float]: Completed verifications, rejected verifications and elapsed seconds.
+    """
+
+    hasher = PasswordHasher(rounds=rounds, workers=workers, maxQueue=workers, timeout=60)
+    hashedPassword = hasher.hash(PASSWORD)
+    completed = [0] * clients
+    rejected = [0] * clients
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        while time.perf_counter() < deadline:
+            try:
+                hasher.verify(PASSWORD, hashedPassword)
+                completed[index] += 1
+            except PasswordHasherBusyError:
+                rejected[index] += 1
+                time.sleep(0.001)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    return sum(completed), sum(rejected), elapsed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure bcrypt login throughput per core at each cost factor.")
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--duration', type=float, default=3.0, help="Seconds to measure each cost factor")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Hasher pool threads")
+    parser.add_argument('--clients', type=int, default=None, help="Concurrent callers (default 4 per worker)")
+    args = parser.parse_args()
+    clients = args.clients or args.workers * 4
+
+    print(f"{args.workers} hasher thread(s), {clients} concurrent caller(s), {os.cpu_count()} CPU(s)")
+    print(f"{'cost':>4} {'p50 ms':>8} {'p95 ms':>8} {'logins/s/core':>14} "
+          f"{'pool logins/s':>14} {'rejected':>9}")
+    for rounds in args.rounds:
+        timings = measureSingleCore(rounds, args.duration)
+        p50 = statistics.median(timings) * 1000
+        p95 = statistics.quantiles(timings, n=20, method='inclusive')[-1] * 1000 if len(timings) >= 2 else p50
+        perCore = len(timings) / sum(timings)
+
+        completed, rejected, elapsed = measurePool(rounds, args.duration, args.workers, clients)
+        print(f"{rounds:>4} {p50:>8.1f} {p95:>8.1f} {perCore:>14.1f} "
+              f"{completed / elapsed:>14.1f} {rejected:>9}")
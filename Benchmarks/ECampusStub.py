@@ -0,0 +1,227 @@
+import argparse
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Student Login</title></head>
+<body>
+<form method="post" action="./" id="form1">
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{viewstate}" />
+<input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="C2EE9ABB" />
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{eventvalidation}" />
+<h2>Student Login</h2>
+<input name="txtusercheck" type="text" id="txtusercheck" />
+<input name="txtpwdcheck" type="password" id="txtpwdcheck" />
+<input type="submit" name="abcd3" value="Login" id="abcd3" />
+</form>
+</body>
+</html>"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Student Home</title></head>
+<body><h2>Welcome, {rollNo}</h2></body>
+</html>"""
+
+class ECampusStubHandler(BaseHTTPRequestHandler):
+    """
+    Mimics the eCampus ASP.NET login form: GET serves the form with fresh hidden fields and a session cookie,
+    POST accepts the configured password for any roll number and otherwise serves the login form again.
+    """
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real server
+
+    def do_GET(self):
+        if self._simulateUpstream():
+            return
+
+        viewstate = secrets.token_urlsafe(32)
+        with self.server.lock:
+            self.server.viewstates.add(viewstate)
+        page = LOGIN_PAGE.format(viewstate=viewstate, eventvalidation=secrets.token_urlsafe(16))
+        self._send(200, page, {'Set-Cookie': f"ASP.NET_SessionId={secrets.token_hex(12)}; path=/; HttpOnly"})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        if self._simulateUpstream():
+            return
+
+        with self.server.lock:
+            validState = form.get('__VIEWSTATE') in self.server.viewstates
+            self.server.viewstates.discard(form.get('__VIEWSTATE'))
+
+        if validState and 'ASP.NET_SessionId' in self.headers.get('Cookie', '') \
+                and form.get('txtpwdcheck') == self.server.password:
+            self._send(200, HOME_PAGE.format(rollNo=form.get('txtusercheck')))
+        else:
+            self._send(200, LOGIN_PAGE.format(viewstate=secrets.token_urlsafe(32),
+                                              eventvalidation=secrets.token_urlsafe(16)))
+
+    def _simulateUpstream(self):
+        """
+        Applies the configured latency and failure rate.
+
+        Returns:
+            bool: True if a failure response was sent and the request is finished.
+        """
+
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if random.random() < self.server.failRate:
+            self._send(503, "Service Unavailable")
+            return True
+        return False
+
+    def _send(self, status, body, headers=None):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class ECampusStubServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up before the delayed response is written; that is expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def startStub(port=0, password='Student@123', delay=0.0, failRate=0.0):
+    """
+    Starts the stub server on a background thread.
+
+    Args:
+        port (int): The port to listen on. 0 picks a free port.
+        password (str): The password accepted for every roll number.
+        delay (float): Seconds to wait before answering each request.
+        failRate (float): Fraction of requests answered with 503.
+
+    Returns:
+        ECampusStubServer: The running server. Its login URL is http://127.0.0.1:<server_port>/studzone2/.
+    """
+
+    server = ECampusStubServer(('127.0.0.1', port), ECampusStubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.viewstates = set()
+    server.requests = 0
+    server.password = password
+    server.delay = delay
+    server.failRate = failRate
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def runChecks():
+    """
+    Runs ECampusClient against the stub in a few scenarios and prints the outcome of each.
+
+    Returns:
+        bool: True if every scenario behaved as expected.
+    """
+
+    from ECampusClient import ECampusClient, ECampusUnavailableError
+
+    server = startStub()
+    url = f"http://127.0.0.1:{server.server_port}/studzone2/"
+    results = []
+
+    def check(name, passed):
+        results.append(passed)
+        print(f"{'OK  ' if passed else 'FAIL'} {name}")
+
+    client = ECampusClient(url, retries=0)
+    check("valid credentials are accepted", client.login('21z201', 'Student@123') is True)
+    check("invalid credentials are rejected", client.login('21z201', 'wrong') is False)
+
+    # Keep-alive: two logins are four requests, which should reuse pooled connections
+    poolManager = client.adapter.poolmanager
+    pools = [poolManager.pools[key] for key in poolManager.pools.keys()]
+    check("connections are pooled", len(pools) == 1 and pools[0].num_connections == 1 and pools[0].num_requests == 4)
+
+    server.delay = 0.5
+    slowClient = ECampusClient(url, readTimeout=0.1, retries=1, backoff=0.01, breakerThreshold=2, breakerReset=60)
+    started = time.monotonic()
+    try:
+        slowClient.login('21z201', 'Student@123')
+        check("slow upstream times out", False)
+    except ECampusUnavailableError:
+        check("slow upstream times out", time.monotonic() - started < 1.5)
+
+    try:
+        slowClient.login('21z201', 'Student@123')
+    except ECampusUnavailableError:
+        pass
+    requestsBefore = server.requests
+    try:
+        slowClient.login('21z201', 'Student@123')
+        check("open circuit fails fast", False)
+    except ECampusUnavailableError:
+        check("open circuit fails fast", slowClient.breaker.state == 'open' and server.requests == requestsBefore)
+
+    server.delay = 0.3
+    boundedClient = ECampusClient(url, maxConcurrency=1, queueTimeout=0.05, retries=0)
+    outcomes = []
+
+    def attempt():
+        try:
+            outcomes.append(boundedClient.login('21z201', 'Student@123'))
+        except ECampusUnavailableError:
+            outcomes.append('rejected')
+
+    threads = [threading.Thread(target=attempt) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check("concurrency is bounded", outcomes.count(True) == 1 and outcomes.count('rejected') == 2)
+
+    server.delay = 0
+    server.failRate = 1.0
+    retryClient = ECampusClient(url, retries=2, backoff=0.01)
+    requestsBefore = server.requests
+    try:
+        retryClient.login('21z201', 'Student@123')
+    except ECampusUnavailableError:
+        pass
+    check("failed requests are retried", server.requests - requestsBefore == 3)
+
+    server.shutdown()
+    return all(results)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="A local stand-in for the eCampus student login form.")
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--password', default='Student@123', help="Password accepted for every roll number")
+    parser.add_argument('--delay', type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--check', action='store_true', help="Run ECampusClient against the stub and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if runChecks() else 1)
+
+    server = startStub(args.port, args.password, args.delay, args.fail_rate)
+    print(f"eCampus stub listening on http://127.0.0.1:{server.server_port}/studzone2/")
+    print(f"Set VENUESCOPE_ECAMPUS_URL to that URL to log in with password {args.password!r}.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
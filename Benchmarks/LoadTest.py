@@ -0,0 +1,502 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import bcrypt
+import mysql.connector
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'DB_Init'))
+
+from ConnectionPool import loadDBConfig
+from PasswordHasher import loadPasswordHasherConfig
+from Migrate import migrate, splitStatements
+
+# Scratch database used when --database is not given, per backend; the harness drops and recreates it
+DEFAULT_DATABASE = 'VenueScope_LoadTest'
+DEFAULT_SQLITE_DATABASE = 'VenueScope_LoadTest.sqlite3'
+
+# The application databases, which the harness refuses to seed
+APPLICATION_DATABASES = ('VenueScope', 'VenueScope.sqlite3')
+
+MEMBER_PASSWORD = 'LoadTest@123'
+
+# Relative weight of each user journey when --mix is not given
+DEFAULT_MIX = {'member': 1, 'student': 3}
+
+def useBackend(backend, database):
+    """
+    Points the storage settings of this process, and so of the in-process app, at the scratch database.
+
+    Args:
+        backend (str): 'mysql' or 'sqlite'.
+        database (str): The scratch MySQL database name, or the SQLite file (':memory:' for an in-memory database).
+    """
+
+    os.environ['VENUESCOPE_DB_BACKEND'] = backend
+    if backend == 'sqlite':
+        os.environ['VENUESCOPE_SQLITE_PATH'] = database
+    else:
+        os.environ['VENUESCOPE_DB_NAME'] = database
+
+def createScratchDatabase(backend, config, database):
+    """
+    Drops and recreates the scratch database with the VenueScope schema.
+
+    Args:
+        backend (str): 'mysql' or 'sqlite'.
+        config (dict): MySQL connection settings, as returned by loadDBConfig.
+        database (str): The scratch database, as passed to useBackend.
+
+    Returns:
+        A connection to the new, empty database.
+    """
+
+    if backend == 'sqlite':
+        if database != ':memory:':
+            for path in (database, f"{database}-wal", f"{database}-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+        from Storage import getStorage
+        # The storage backend creates the schema when it opens a new database
+        return getStorage().getConnection()
+
+    settings = dict(config)
+    settings.pop('database', None)
+    connection = mysql.connector.connect(**settings)
+    cursor = connection.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+    cursor.execute(f"CREATE DATABASE `{database}`")
+    cursor.execute(f"USE `{database}`")
+
+    with open(os.path.join(ROOT, 'DB_Init', 'create_table.sql')) as file:
+        for statement in splitStatements(file.read()):
+            cursor.execute(statement)
+    cursor.close()
+    migrate(connection)
+    return connection
+
+def connectScratchDatabase(backend, config, database):
+    """
+    Opens a connection to the scratch database.
+
+    Returns:
+        A MySQL connection, or a connection checked out of the SQLite storage backend.
+    """
+
+    if backend == 'sqlite':
+        from Storage import getStorage
+        return getStorage().getConnection()
+    return mysql.connector.connect(**dict(config, database=database))
+
+def seedDatabase(backend, config, database, venues, clubs, bookings, days, seed=0):
+    """
+    Drops and recreates a scratch database with the VenueScope schema and a generated dataset.
+
+    Args:
+        backend (str): 'mysql' or 'sqlite'.
+        config (dict): MySQL connection settings, as returned by loadDBConfig.
+        database (str): The scratch database name or SQLite file. It must not be the application database.
+        venues (int): Number of venues.
+        clubs (int): Number of clubs, each with one club head.
+        bookings (int): Number of existing bookings, spread over the next days.
+        days (int): Number of days, starting today, that bookings are spread over.
+        seed (int): Random seed, so every run starts from the same dataset.
+
+    Returns:
+        list[dict]: The club heads, with 'email' and 'club_name'.
+    """
+
+    if os.path.basename(database) in APPLICATION_DATABASES:
+        raise ValueError("Refusing to seed the application database; pass a scratch --database name")
+
+    connection = createScratchDatabase(backend, config, database)
+    cursor = connection.cursor()
+
+    rng = random.Random(seed)
+    hashedPassword = bcrypt.hashpw(MEMBER_PASSWORD.encode('utf-8'),
+                                   bcrypt.gensalt(loadPasswordHasherConfig()['rounds'])).decode('utf-8')
+
+    members = []
+    for clubId in range(1, clubs + 1):
+        email = f"head{clubId}@loadtest.example"
+        members.append({'email': email, 'club_name': f"Load Test Club {clubId}"})
+    cursor.executemany("INSERT INTO club_list (club_id, club_name) VALUES (%s, %s)",
+                       [(clubId, member['club_name']) for clubId, member in enumerate(members, start=1)])
+    cursor.executemany("INSERT INTO club_head_details (head_id, club_head, phone_number, password, email) "
+                       "VALUES (%s, %s, %s, %s, %s)",
+                       [(clubId, f"Head {clubId}", '9876543210', hashedPassword, member['email'])
+                        for clubId, member in enumerate(members, start=1)])
+    cursor.executemany("INSERT INTO club_head (club_id, head_id) VALUES (%s, %s)",
+                       [(clubId, clubId) for clubId in range(1, clubs + 1)])
+    cursor.executemany("INSERT INTO venue_list (venue_id, venue_name) VALUES (%s, %s)",
+                       [(venueId, f"Load Test Venue {venueId}") for venueId in range(1, venues + 1)])
+
+    # Hour-long bookings on free hourly slots between 08:00 and 20:00, so the seed itself has no clashes
+    slots = [(venueId, offset, hour) for venueId in range(1, venues + 1)
+             for offset in range(days) for hour in range(8, 20)]
+    rows = []
+    for venueId, offset, hour in rng.sample(slots, min(bookings, len(slots))):
+        rows.append((venueId, rng.randint(1, clubs), date.today() + timedelta(days=offset),
+                     f"{hour:02d}:00:00", f"{hour + 1:02d}:00:00", 'https://example.com'))
+    for start in range(0, len(rows), 1000):
+        cursor.executemany("INSERT INTO booked_venue (venue_id, club_id, date, from_time, end_time, venue_link) "
+                           "VALUES (%s, %s, %s, %s, %s, %s)", rows[start:start + 1000])
+
+    connection.commit()
+    cursor.close()
+    connection.close()
+    return members
+
+def countDoubleBookings(backend, config, database):
+    """
+    Counts pairs of bookings for the same venue and date whose times overlap.
+
+    Args:
+        backend (str): 'mysql' or 'sqlite'.
+        config (dict): MySQL connection settings.
+        database (str): The scratch database.
+
+    Returns:
+        int: The number of overlapping pairs; anything but 0 is a correctness bug.
+    """
+
+    connection = connectScratchDatabase(backend, config, database)
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM booked_venue a
+        JOIN booked_venue b
+          ON a.venue_id = b.venue_id AND a.date = b.date AND a.booking_id < b.booking_id
+         AND a.from_time < b.end_time AND a.end_time > b.from_time
+    """)
+    count = cursor.fetchone()[0]
+    cursor.close()
+    connection.close()
+    return count
+
+def startApp(port):
+    """
+    Imports the Flask app and serves it with a threaded WSGI server on a background thread.
+
+    The storage settings must already point at the scratch database (see useBackend).
+
+    Args:
+        port (int): The port to listen on.
+
+    Returns:
+        werkzeug.serving.BaseWSGIServer: The running server.
+    """
+
+    from werkzeug.serving import make_server
+
+    # Every virtual user logs in from this machine, and again on every journey
+    os.environ.setdefault('VENUESCOPE_RATE_LIMIT_LOGIN_IP', 'off')
+    os.environ.setdefault('VENUESCOPE_RATE_LIMIT_LOGIN_ACCOUNT', 'off')
+
+    import app
+
+    server = make_server('127.0.0.1', port, app.createApp(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+class Recorder:
+    """
+    Collects the latency and outcome of every request made by the virtual users.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.bookings = {'booked': 0, 'conflicts': 0, 'failed': 0, 'deleted': 0, 'rescheduled': 0}
+
+    def record(self, route, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def count(self, outcome):
+        with self._lock:
+            self.bookings[outcome] += 1
+
+    def summary(self, elapsed):
+        """
+        Summarises the recorded requests.
+
+        Args:
+            elapsed (float): The length of the measured run in seconds.
+
+        Returns:
+            dict: Per-route and overall request counts, errors, throughput and latency percentiles in milliseconds.
+        """
+
+        def describe(timings, errors):
+            if len(timings) >= 2:
+                # The inclusive method interpolates between measured samples, so p99 never exceeds the slowest request
+                cuts = statistics.quantiles(timings, n=100, method='inclusive')
+                p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+            else:
+                p50 = p95 = p99 = timings[0] if timings else 0.0
+            return {
+                'requests': len(timings),
+                'errors': errors,
+                'throughput': round(len(timings) / elapsed, 2),
+                'p50_ms': round(p50 * 1000, 2),
+                'p95_ms': round(p95 * 1000, 2),
+                'p99_ms': round(p99 * 1000, 2),
+                'max_ms': round(max(timings, default=0.0) * 1000, 2),
+            }
+
+        with self._lock:
+            routes = {route: describe(timings, self.errors.get(route, 0))
+                      for route, timings in sorted(self.latencies.items())}
+            everything = [seconds for timings in self.latencies.values() for seconds in timings]
+            total = describe(everything, sum(self.errors.values()))
+            return {'routes': routes, 'total': total, 'bookings': dict(self.bookings)}
+
+class VirtualUser:
+    """
+    One simulated browser, with its own cookie jar, following the member or student journeys.
+    """
+
+    def __init__(self, baseUrl, recorder, members, venues, days, rng):
+        self.baseUrl = baseUrl
+        self.recorder = recorder
+        self.members = members
+        self.venues = venues
+        self.days = days
+        self.rng = rng
+        self.session = requests.Session()
+
+    def request(self, method, route, expected, **kwargs):
+        """
+        Sends one request and records its latency.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The path, also used as the reporting key.
+            expected (tuple[int]): Status codes that count as a success.
+
+        Returns:
+            requests.Response or None: The response, or None if the request failed outright.
+        """
+
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.baseUrl + route, allow_redirects=False, timeout=30, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(route, time.perf_counter() - started, False)
+            return None
+        self.recorder.record(route, time.perf_counter() - started, response.status_code in expected)
+        return response
+
+    def memberJourney(self):
+        """
+        Logs in as a club head, opens the dashboard, books a random slot, and sometimes moves it an hour later or deletes it again.
+        """
+
+        member = self.rng.choice(self.members)
+        self.session.cookies.clear()
+        if self.request('POST', '/memberLogin', (302,),
+                        data={'email': member['email'], 'password': MEMBER_PASSWORD}) is None:
+            return
+        self.request('GET', '/mainMember', (200,))
+
+        day = date.today() + timedelta(days=self.rng.randint(1, self.days))
+        hour = self.rng.randint(8, 19)
+        minute = self.rng.choice((0, 30))
+        fromTime = f"{hour:02d}:{minute:02d}"
+        endTime = f"{hour + 1:02d}:{minute:02d}"
+        venue = self.rng.choice(self.venues)
+
+        response = self.request('POST', '/book_venue', (200, 400), json={
+            'date': day.isoformat(), 'from_time': fromTime, 'end_time': endTime,
+            'venue_name': venue, 'link': 'https://example.com',
+        })
+        if response is None or response.status_code != 200:
+            if response is not None and response.status_code == 400 and 'conflict' in response.json():
+                self.recorder.count('conflicts')
+            else:
+                self.recorder.count('failed')
+            return
+        self.recorder.count('booked')
+
+        bookingId = response.json()['booking_id']
+        if self.rng.random() < 0.25 and hour < 19:
+            # Move the booking an hour later, which may clash like a new booking
+            response = self.request('POST', '/reschedule_booking', (200, 400), json={
+                'booking_id': bookingId, 'date': day.isoformat(), 'from_time': f"{hour + 1:02d}:{minute:02d}",
+                'end_time': f"{hour + 2:02d}:{minute:02d}", 'venue_name': venue,
+            })
+            if response is not None and response.status_code == 200:
+                self.recorder.count('rescheduled')
+
+        if self.rng.random() < 0.5:
+            response = self.request('POST', '/delete_booking', (302,), data={'booking_id': bookingId})
+            if response is not None and response.status_code == 302:
+                self.recorder.count('deleted')
+
+    def studentJourney(self):
+        """
+        Opens the student dashboard and polls the bookings feed, like an open dashboard tab.
+        """
+
+        self.request('GET', '/mainStudent', (200,))
+        response = self.request('GET', '/api/bookings', (200,))
+        if response is not None and response.headers.get('ETag'):
+            self.request('GET', '/api/bookings', (200, 304), headers={'If-None-Match': response.headers['ETag']})
+
+def parseMix(value):
+    """
+    Parses a journey mix such as 'member=1,student=3'.
+
+    Returns:
+        dict: Journey name to relative weight.
+
+    Raises:
+        argparse.ArgumentTypeError: If a journey is unknown or a weight is not a number.
+    """
+
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown journey: {name}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for {name}: {weight}")
+    return mix
+
+def runLoad(baseUrl, recorder, members, venues, days, users, duration, mix, seed):
+    """
+    Runs the virtual users until the duration has passed.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+
+    journeys = list(mix)
+    weights = [mix[name] for name in journeys]
+    deadline = time.monotonic() + duration
+
+    def loop(index):
+        rng = random.Random(seed + index)
+        user = VirtualUser(baseUrl, recorder, members, venues, days, rng)
+        while time.monotonic() < deadline:
+            getattr(user, rng.choices(journeys, weights)[0] + 'Journey')()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=loop, args=(index,)) for index in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.monotonic() - started
+
+def printSummary(results, baseline=None):
+    """
+    Prints the per-route results, with the change against a previous run if one is given.
+    """
+
+    print(f"{'route':<20} {'req':>7} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, stats in list(results['routes'].items()) + [('TOTAL', results['total'])]:
+        line = (f"{route:<20} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput']:>8.1f} "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+        if baseline is None:
+            previous = None
+        elif route == 'TOTAL':
+            previous = baseline.get('total')
+        else:
+            previous = baseline.get('routes', {}).get(route)
+        if previous and previous['p95_ms']:
+            line += (f"   p95 {100 * (stats['p95_ms'] / previous['p95_ms'] - 1):+.0f}%"
+                     f"  req/s {100 * (stats['throughput'] / previous['throughput'] - 1):+.0f}%")
+        print(line)
+    print(f"bookings: {results['bookings']}  double bookings: {results['doubleBookings']}")
+
+def gitRevision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test the VenueScope routes against a seeded scratch database.")
+    parser.add_argument('--backend', choices=('mysql', 'sqlite'), default=os.environ.get('VENUESCOPE_DB_BACKEND', 'mysql'),
+                        help="Storage backend to test")
+    parser.add_argument('--database', help=f"Scratch database to (re)create and seed: a MySQL database name (default "
+                                           f"{DEFAULT_DATABASE}) or a SQLite file (default {DEFAULT_SQLITE_DATABASE}, "
+                                           f"':memory:' for in-memory)")
+    parser.add_argument('--venues', type=int, default=40)
+    parser.add_argument('--clubs', type=int, default=30)
+    parser.add_argument('--bookings', type=int, default=5000, help="Bookings seeded before the run")
+    parser.add_argument('--days', type=int, default=30, help="Days ahead that bookings are spread over")
+    parser.add_argument('--users', type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument('--duration', type=float, default=60, help="Seconds to run")
+    parser.add_argument('--mix', type=parseMix, default=DEFAULT_MIX, help="Journey weights, e.g. member=1,student=3")
+    parser.add_argument('--port', type=int, default=5055, help="Port for the in-process app server")
+    parser.add_argument('--url', help="Test an already running server instead (it must use --database)")
+    parser.add_argument('--no-seed', action='store_true', help="Reuse the scratch database from a previous run")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the dataset and the users")
+    parser.add_argument('--output', default='loadtest-results.json', help="Where to write the JSON results")
+    parser.add_argument('--compare', help="A previous results file to compare against")
+    args = parser.parse_args()
+
+    if args.database is None:
+        args.database = DEFAULT_SQLITE_DATABASE if args.backend == 'sqlite' else DEFAULT_DATABASE
+    if args.database == ':memory:' and (args.url or args.no_seed):
+        parser.error("an in-memory SQLite database only exists inside this process; drop --url and --no-seed")
+
+    config = loadDBConfig()
+    useBackend(args.backend, args.database)
+    if not args.no_seed:
+        print(f"Seeding {args.database} ({args.backend}) ...")
+        members = seedDatabase(args.backend, config, args.database, args.venues, args.clubs, args.bookings, args.days,
+                               args.seed)
+    else:
+        members = [{'email': f"head{clubId}@loadtest.example", 'club_name': f"Load Test Club {clubId}"}
+                   for clubId in range(1, args.clubs + 1)]
+    venues = [f"Load Test Venue {venueId}" for venueId in range(1, args.venues + 1)]
+
+    baseUrl = args.url
+    if baseUrl is None:
+        startApp(args.port)
+        baseUrl = f"http://127.0.0.1:{args.port}"
+
+    print(f"Running {args.users} users against {baseUrl} for {args.duration:g}s ...")
+    recorder = Recorder()
+    elapsed = runLoad(baseUrl.rstrip('/'), recorder, members, venues, args.days, args.users, args.duration,
+                      args.mix, args.seed)
+
+    results = recorder.summary(elapsed)
+    results['doubleBookings'] = countDoubleBookings(args.backend, config, args.database)
+    results['run'] = {
+        'finishedAt': datetime.now().isoformat(timespec='seconds'),
+        'revision': gitRevision(),
+        'elapsed': round(elapsed, 2),
+        'options': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+    }
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2, default=str)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    printSummary(results, baseline)
+    print(f"Results written to {args.output}")
+
+    sys.exit(1 if results['doubleBookings'] else 0)
@@ -0,0 +1,114 @@
+import argparse
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+# Seconds between two runs of the archive job in each process; 0 turns the background job off
+ARCHIVE_INTERVAL = float(os.environ.get('VENUESCOPE_ARCHIVE_INTERVAL', '3600'))
+
+# Past days whose bookings stay in booked_venue; with 0, every booking dated before today is archived
+ARCHIVE_KEEP_DAYS = int(os.environ.get('VENUESCOPE_ARCHIVE_KEEP_DAYS', '0'))
+
+def archiveCutoff(keepDays=ARCHIVE_KEEP_DAYS, today=None):
+    """
+    Returns the first date whose bookings are kept in booked_venue.
+
+    Args:
+        keepDays (int): Past days to keep; a negative number counts as 0, since today's bookings are never archived.
+        today (datetime.date, optional): The current date. Defaults to today.
+
+    Returns:
+        str: The date, in 'YYYY-MM-DD' format.
+    """
+
+    return ((today or date.today()) - timedelta(days=max(0, keepDays))).isoformat()
+
+class ArchiveJob:
+    """
+    Archives past bookings on a background thread: once when started, and then every interval seconds.
+    The booking change-log entries made before the archive cutoff are trimmed in the same run, so neither
+    hot table keeps growing with the history.
+
+    Every worker process runs the job. The archive lock lets only one of them move bookings at a time,
+    and the others find nothing left to archive, so no external scheduler is needed.
+    """
+
+    def __init__(self, venueManagement, interval=ARCHIVE_INTERVAL, keepDays=ARCHIVE_KEEP_DAYS):
+        """
+        Initializes a job that has not been started.
+
+        Args:
+            venueManagement (VenueManagement): The service whose bookings are archived.
+            interval (float): Seconds between runs; 0 or less disables start().
+            keepDays (int): Past days whose bookings stay in booked_venue.
+        """
+
+        self.venueManagement = venueManagement
+        self.interval = interval
+        self.keepDays = keepDays
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def runOnce(self):
+        """
+        Archives the bookings dated before the cutoff, then trims the change-log entries made before it.
+        The process that found the archive lock taken leaves the trimming to the one holding it.
+
+        Returns:
+            int or None: The number of bookings archived, or None if the run was skipped or failed.
+        """
+
+        cutoff = archiveCutoff(self.keepDays)
+        archived = self.venueManagement.archiveBookings(cutoff)
+        if archived:
+            print(f"Archived {archived} past bookings")
+
+        if archived is not None:
+            # Entries are trimmed up to the start of the cutoff day, local time, like the booking dates
+            pruned = self.venueManagement.pruneBookingChangeLog(time.mktime(date.fromisoformat(cutoff).timetuple()))
+            if pruned:
+                print(f"Pruned {pruned} booking change-log entries")
+        return archived
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.runOnce()
+            except Exception as e:
+                # The job must keep running, and try again at the next interval
+                print(f"Error in the booking archive job: {e}")
+            self._stopped.wait(self.interval)
+
+    def start(self):
+        """
+        Starts the background thread, unless the job is disabled or already running in this process.
+        A process forked from one running the job has no thread, and starts its own.
+        """
+
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='booking-archive', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread after the batch in progress, if any.
+        """
+
+        self._stopped.set()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Move past bookings from booked_venue to booked_venue_archive.")
+    parser.add_argument('--keep-days', type=int, default=ARCHIVE_KEEP_DAYS,
+                        help="Past days whose bookings stay in booked_venue (default: %(default)s)")
+    args = parser.parse_args()
+
+    from VenueManagement import VenueManagement
+
+    archived = ArchiveJob(VenueManagement(), keepDays=args.keep_days).runOnce()
+    if archived is None:
+        print("Nothing was archived: another process is archiving, or the database could not be reached.")
+    elif archived == 0:
+        print("No bookings to archive.")
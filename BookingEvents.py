@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Most dashboards that may hold an event stream open at once in one process
+SSE_MAX_CLIENTS = int(os.environ.get('VENUESCOPE_SSE_MAX_CLIENTS', '100'))
+
+# Seconds between comment lines sent on an idle stream, so proxies do not close it
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get('VENUESCOPE_SSE_HEARTBEAT_INTERVAL', '15'))
+
+# Recent events kept for clients that reconnect with a Last-Event-ID
+SSE_BUFFER_SIZE = 1000
+
+# Milliseconds a disconnected EventSource waits before reconnecting
+SSE_RETRY_MS = 3000
+
+def formatEvent(eventType, data, eventId=None):
+    """
+    Formats one Server-Sent Event.
+
+    Args:
+        eventType (str): The event name, e.g. 'insert'.
+        data: The payload; serialized as JSON on one line.
+        eventId (int, optional): The event id, which the browser sends back as Last-Event-ID when it reconnects.
+
+    Returns:
+        str: The event, ending with a blank line.
+    """
+
+    lines = [f"id: {eventId}"] if eventId is not None else []
+    lines.append(f"event: {eventType}")
+    lines.append(f"data: {json.dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+class BookingEventBroker:
+    """
+    Broadcasts booking inserts, updates and deletes to the dashboards of this process as Server-Sent Events.
+
+    The broker is fed by the booking change listener, so it sees every change the booking index applies,
+    whichever worker made it. Event ids are change-log ids, which are the same in every worker, so a browser
+    can reconnect to any worker with its Last-Event-ID. Waiting streams also poll the change log, at most once
+    per sync interval between them, so changes made by other workers reach idle dashboards.
+
+    A client that missed events no longer in the buffer, or that was connected while the index was reloaded,
+    is sent a 'reload' event and should fetch its listing again.
+    """
+
+    def __init__(self, describe, poll, position, pollInterval=1.0, maxClients=SSE_MAX_CLIENTS,
+                 heartbeatInterval=SSE_HEARTBEAT_INTERVAL, bufferSize=SSE_BUFFER_SIZE):
+        """
+        Initializes a broker with no clients.
+
+        Args:
+            describe (Callable[[list[dict]], list[dict]]): Turns change-log rows into events with 'id', 'type'
+                and 'booking' keys, e.g. VenueManagement.describeBookingChanges.
+            poll (Callable[[], bool]): Applies new change-log entries, e.g. VenueManagement.syncBookingIndex.
+            position (Callable[[], int]): Returns the last change-log id applied to the booking index.
+            pollInterval (float): Seconds a waiting stream sleeps between polls.
+            maxClients (int): Streams allowed at once; more are refused.
+            heartbeatInterval (float): Seconds of silence after which a stream sends a comment line.
+            bufferSize (int): Events kept for reconnecting clients.
+        """
+
+        self.describe = describe
+        self.poll = poll
+        self.position = position
+        self.pollInterval = pollInterval
+        self.maxClients = maxClients
+        self.heartbeatInterval = heartbeatInterval
+        self.bufferSize = bufferSize
+
+        self._condition = threading.Condition()
+        self._events = deque()
+        self._sequence = 0
+        # Events up to these positions are no longer buffered
+        self._floorSequence = 0
+        self._floorChangeId = position()
+        self._clients = 0
+        self.closing = False
+
+    @property
+    def clientCount(self):
+        return self._clients
+
+    def onBookingChange(self, changes):
+        """
+        Publishes the events for a batch of applied changes. Registered with VenueManagement.addBookingChangeListener.
+
+        Args:
+            changes (list[dict] or None): The applied change-log rows, or None after the index was reloaded.
+        """
+
+        if changes is None:
+            self._reset()
+            return
+
+        events = self.describe(changes)
+        with self._condition:
+            for event in events:
+                self._sequence += 1
+                self._events.append((self._sequence, event['id'], formatEvent(event['type'], event['booking'], event['id'])))
+                if len(self._events) > self.bufferSize:
+                    self._floorSequence, self._floorChangeId, _ = self._events.popleft()
+            self._condition.notify_all()
+
+    def _reset(self):
+        # Which bookings changed across a reload is unknown, so every client must reload
+        position = self.position()
+        with self._condition:
+            self._events.clear()
+            self._sequence += 1
+            self._floorSequence = self._sequence
+            self._floorChangeId = position
+            self._condition.notify_all()
+
+    def subscribe(self, lastEventId=None):
+        """
+        Opens an event stream for one client.
+
+        Args:
+            lastEventId (str, optional): The change-log id of the last event the client has seen, e.g. the
+                Last-Event-ID header of a reconnecting browser. Without it, the stream starts with the next event.
+
+        Returns:
+            EventSubscription or None: The stream, or None if maxClients streams are already open or the broker is shutting down.
+        """
+
+        with self._condition:
+            if self.closing or self._clients >= self.maxClients:
+                return None
+            self._clients += 1
+
+            try:
+                lastChangeId = int(lastEventId) if lastEventId else None
+            except ValueError:
+                lastChangeId = None
+
+            if lastChangeId is None:
+                sequence = self._sequence
+            elif lastChangeId < self._floorChangeId:
+                # Some of the missed events are gone, so the client must reload
+                sequence = self._floorSequence - 1
+            else:
+                sequence = next((entry[0] - 1 for entry in self._events if entry[1] > lastChangeId), self._sequence)
+        return EventSubscription(self, sequence)
+
+    def _eventsAfter(self, sequence):
+        """
+        Returns the buffered events after a stream position.
+
+        Args:
+            sequence (int): The position of the last event the stream sent.
+
+        Returns:
+            tuple: (events, sequence, reload), where events is the formatted text to send, sequence the new
+                   position, and reload whether the stream must first be sent a 'reload' event.
+        """
+
+        with self._condition:
+            if sequence < self._floorSequence:
+                return [entry[2] for entry in self._events], self._sequence, True
+            return [entry[2] for entry in self._events if entry[0] > sequence], self._sequence, False
+
+    def _wait(self, sequence, timeout):
+        with self._condition:
+            self._condition.wait_for(lambda: self.closing or self._sequence > sequence, timeout=timeout)
+
+    def shutdown(self):
+        """
+        Ends every open stream, so a worker that is shutting down is not kept busy by dashboards that never
+        disconnect. Their browsers reconnect to another worker, and no new streams are accepted.
+        """
+
+        with self._condition:
+            self.closing = True
+            self._condition.notify_all()
+
+    def _release(self):
+        with self._condition:
+            self._clients -= 1
+
+class EventSubscription:
+    """
+    One client's event stream. Iterating over events() blocks between events; close() ends the stream
+    and frees its place, and is safe to call more than once.
+    """
+
+    def __init__(self, broker, sequence):
+        self.broker = broker
+        self.sequence = sequence
+        self.closed = False
+
+    def events(self):
+        """
+        Generates the text of the event stream until the stream is closed.
+
+        Yields:
+            str: Events, reload notices and heartbeat comments.
+        """
+
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        lastSent = time.monotonic()
+        while not self.closed and not self.broker.closing:
+            events, self.sequence, reload = self.broker._eventsAfter(self.sequence)
+            if reload:
+                events.insert(0, formatEvent('reload', {}))
+            if events:
+                yield ''.join(events)
+                lastSent = time.monotonic()
+                continue
+
+            # Picks up changes made by other workers; a no-op until the index's sync interval has passed
+            self.broker.poll()
+            self.broker._wait(self.sequence, self.broker.pollInterval)
+
+            if time.monotonic() - lastSent >= self.broker.heartbeatInterval:
+                yield ": keepalive\n\n"
+                lastSent = time.monotonic()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker._release()
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+from ConnectionPool import DatabaseError
+
+# The columns of an exported booking, in CSV column order
+EXPORT_COLUMNS = ('booking_id', 'date', 'from_time', 'end_time', 'venue_name', 'club_name', 'venue_link')
+
+# Rows read from the database per round trip, and rows encoded into one chunk of the HTTP response
+EXPORT_BATCH_SIZE = 500
+
+class BookingStream:
+    """
+    Iterates over the rows of an export query, reading them from an unbuffered cursor one batch at a time,
+    so at most one batch of bookings is held in memory however many the query returns.
+
+    Further queries can follow the first one, e.g. the current bookings after the archived ones. Each runs
+    on the same connection once the rows of the previous one have run out.
+
+    The stream holds its pooled connection until the rows run out or close() is called. A stream that is
+    closed early discards the connection instead of returning it to the pool, because reading the unread
+    rest of the result could take as long as the export itself.
+    """
+
+    def __init__(self, connection, cursor, formatRow, batchSize=EXPORT_BATCH_SIZE, following=()):
+        """
+        Initializes a stream over a query that has already been executed.
+
+        Args:
+            connection (PooledConnection): The connection the query runs on.
+            cursor: The unbuffered dictionary cursor holding the result.
+            formatRow (Callable[[dict], dict]): Turns a result row into an exported booking.
+            batchSize (int): Rows fetched per round trip.
+            following (Iterable[tuple[str, tuple]]): (query, params) pairs whose rows follow, in order.
+        """
+
+        self._connection = connection
+        self._cursor = cursor
+        self._formatRow = formatRow
+        self._batchSize = batchSize
+        self._following = list(following)
+        self._batch = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._batch, None)
+        if row is None:
+            if self._cursor is None:
+                raise StopIteration
+            try:
+                rows = self._cursor.fetchmany(self._batchSize)
+            except DatabaseError as e:
+                print(f"Error exporting bookings: {e}")
+                self.close()
+                # Raising cuts the response off, so the client can tell the export is incomplete
+                raise
+            if not rows:
+                cursor, self._cursor = self._cursor, None
+                cursor.close()
+                if self._following:
+                    self._execute(*self._following.pop(0))
+                    return next(self)
+                self._connection.close()
+                raise StopIteration
+            self._batch = iter(rows)
+            row = next(self._batch)
+        return self._formatRow(row)
+
+    def _execute(self, query, params):
+        cursor = self._connection.cursor(dictionary=True, buffered=False)
+        try:
+            cursor.execute(query, params)
+        except DatabaseError as e:
+            print(f"Error exporting bookings: {e}")
+            cursor.close()
+            self._connection.discard()
+            raise
+        self._cursor = cursor
+
+    def close(self):
+        """
+        Abandons the rest of the result. Calling close() after the rows ran out is harmless.
+        """
+
+        if self._cursor is not None:
+            self._cursor = None
+            self._connection.discard()
+
+def encodeCsv(bookings, chunkRows=EXPORT_BATCH_SIZE):
+    """
+    Encodes exported bookings as CSV with a header row, in chunks of up to chunkRows rows.
+
+    Args:
+        bookings (Iterable[dict]): The bookings, with the EXPORT_COLUMNS keys.
+        chunkRows (int): Rows per chunk.
+
+    Yields:
+        str: The next chunk of CSV text.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, booking in enumerate(bookings, 1):
+        writer.writerow([booking[column] for column in EXPORT_COLUMNS])
+        if count % chunkRows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def encodeJsonLines(bookings, chunkRows=EXPORT_BATCH_SIZE):
+    """
+    Encodes exported bookings as JSON lines, one object per booking, in chunks of up to chunkRows lines.
+
+    Args:
+        bookings (Iterable[dict]): The bookings, with the EXPORT_COLUMNS keys.
+        chunkRows (int): Lines per chunk.
+
+    Yields:
+        str: The next chunk of JSON lines.
+    """
+
+    lines = []
+    for booking in bookings:
+        lines.append(json.dumps({column: booking[column] for column in EXPORT_COLUMNS}) + '\n')
+        if len(lines) == chunkRows:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
@@ -0,0 +1,330 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date as dateType, time as timeType, timedelta
+
+def toSeconds(value):
+    """
+    Converts a time of day to the number of seconds since midnight.
+
+    Args:
+        value (datetime.timedelta or datetime.time or str): A MySQL TIME value, a time object,
+            or a string in 'HH:MM' or 'HH:MM:SS' format.
+
+    Returns:
+        int: Seconds since midnight.
+    """
+
+    if isinstance(value, timedelta):
+        return int(value.total_seconds())
+    if isinstance(value, timeType):
+        return value.hour * 3600 + value.minute * 60 + value.second
+    parts = [int(part) for part in str(value).split(':')]
+    while len(parts) < 3:
+        parts.append(0)
+    return parts[0] * 3600 + parts[1] * 60 + parts[2]
+
+def toDateKey(value):
+    """
+    Converts a date to the 'YYYY-MM-DD' string used as part of the index key.
+
+    Args:
+        value (datetime.date or str): A date object or a date string in 'YYYY-MM-DD' format.
+
+    Returns:
+        str: The date in 'YYYY-MM-DD' format.
+    """
+
+    if isinstance(value, dateType):
+        return value.isoformat()
+    return str(value)
+
+class VenueDayIntervals:
+    """
+    The bookings of one venue on one day, kept as parallel arrays sorted by start time.
+
+    A running maximum of the end times lets an overlap query be answered with one binary search,
+    even if the stored bookings overlap each other.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.bookingIds = []
+        self.maxEnds = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, bookingId, start, end):
+        """
+        Inserts a booking, keeping the arrays sorted by start time.
+
+        Args:
+            bookingId (int): The booking id.
+            start (int): The start time in seconds since midnight.
+            end (int): The end time in seconds since midnight.
+        """
+
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.bookingIds.insert(position, bookingId)
+        self.maxEnds.insert(position, 0)
+        self._updateMaxEnds(position)
+
+    def remove(self, bookingId, start):
+        """
+        Removes a booking.
+
+        Args:
+            bookingId (int): The booking id.
+            start (int): The start time the booking was added with.
+
+        Returns:
+            bool: True if the booking was found and removed.
+        """
+
+        position = bisect_left(self.starts, start)
+        while position < len(self.starts) and self.starts[position] == start:
+            if self.bookingIds[position] == bookingId:
+                del self.starts[position]
+                del self.ends[position]
+                del self.bookingIds[position]
+                del self.maxEnds[position]
+                self._updateMaxEnds(position)
+                return True
+            position += 1
+        return False
+
+    def findOverlap(self, start, end):
+        """
+        Finds a booking that overlaps the given time range. Two ranges overlap when each one starts before the other ends.
+
+        Args:
+            start (int): The start time in seconds since midnight.
+            end (int): The end time in seconds since midnight.
+
+        Returns:
+            int or None: The id of an overlapping booking, or None if the range is free.
+        """
+
+        # Only bookings that start before the requested end can overlap
+        candidates = bisect_left(self.starts, end)
+
+        # maxEnds never decreases, so the first booking whose running maximum passes the requested start
+        # is the first one that ends after it
+        position = bisect_right(self.maxEnds, start)
+        if position < candidates:
+            return self.bookingIds[position]
+        return None
+
+    def _updateMaxEnds(self, position):
+        """
+        Recomputes the running maximum of the end times from the given position onwards.
+
+        Args:
+            position (int): The first position whose running maximum may have changed.
+        """
+
+        previous = self.maxEnds[position - 1] if position > 0 else 0
+        for index in range(position, len(self.ends)):
+            previous = max(previous, self.ends[index])
+            self.maxEnds[index] = previous
+
+class BookingIndex:
+    """
+    An in-process index of bookings keyed by (venue_id, date), kept in sync by tailing the booking_change_log table.
+
+    The index is an accelerator, not the source of truth: bookings are still inserted through the database's
+    conflict check, and callers confirm a reported clash against the database before acting on it.
+    """
+
+    def __init__(self, syncInterval=1.0, gapTimeout=30.0):
+        """
+        Initializes an empty, cold index.
+
+        Args:
+            syncInterval (float): Minimum number of seconds between two change-log polls.
+            gapTimeout (float): Seconds to keep waiting for a change id that was skipped,
+                                which happens while the transaction that allocated it is still open.
+        """
+
+        self.syncInterval = syncInterval
+        self.gapTimeout = gapTimeout
+
+        self._lock = threading.RLock()
+        self._days = {}
+        self._bookings = {}
+        self._pendingGaps = {}
+        self.lastChangeId = 0
+        self.lastModified = None
+        self.horizon = None
+        self.isWarm = False
+        self._lastSync = 0.0
+
+    def load(self, bookings, lastChangeId, horizon, lastModified=None):
+        """
+        Replaces the contents of the index with a fresh snapshot of booked_venue.
+
+        Args:
+            bookings (Iterable[dict]): Rows with booking_id, venue_id, date, from_time and end_time.
+            lastChangeId (int): The highest change_id visible in the same snapshot.
+            horizon (datetime.date or str): The earliest date included in the snapshot.
+            lastModified (float, optional): Unix time of the latest change in the snapshot. Defaults to now.
+        """
+
+        with self._lock:
+            self._days = {}
+            self._bookings = {}
+            self._pendingGaps = {}
+            for booking in bookings:
+                self._add(booking)
+            self.lastChangeId = lastChangeId or 0
+            self.lastModified = float(lastModified) if lastModified is not None else time.time()
+            self.horizon = toDateKey(horizon)
+            self.isWarm = True
+            self._lastSync = time.monotonic()
+
+    def invalidate(self):
+        """
+        Drops the contents of the index so that it is rebuilt from the database on next use.
+        """
+
+        with self._lock:
+            self._days = {}
+            self._bookings = {}
+            self._pendingGaps = {}
+            self.isWarm = False
+
+    def needsSync(self):
+        """
+        Checks whether the change log should be polled again.
+
+        Returns:
+            bool: True if the index is warm and the sync interval has elapsed.
+        """
+
+        return self.isWarm and time.monotonic() - self._lastSync >= self.syncInterval
+
+    def syncWatermark(self):
+        """
+        Returns the change id after which the change log must be read on the next sync.
+
+        Skipped change ids that may still be committed are read again until they arrive or time out.
+
+        Returns:
+            int: The exclusive lower bound for the next change-log query.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._pendingGaps = {changeId: seenAt for changeId, seenAt in self._pendingGaps.items()
+                                 if now - seenAt < self.gapTimeout}
+            if self._pendingGaps:
+                return min(self._pendingGaps) - 1
+            return self.lastChangeId
+
+    def applyChanges(self, changes):
+        """
+        Applies rows read from booking_change_log, in change_id order. Applying a change twice is harmless.
+
+        Args:
+            changes (Iterable[dict]): Rows with change_id, operation, booking_id, venue_id, date, from_time, end_time
+                                      and changed_at (Unix time).
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            for change in changes:
+                changeId = change['change_id']
+                self._pendingGaps.pop(changeId, None)
+
+                # Remember ids skipped by this batch; their transactions may not have committed yet
+                for missingId in range(self.lastChangeId + 1, changeId):
+                    self._pendingGaps.setdefault(missingId, now)
+                self.lastChangeId = max(self.lastChangeId, changeId)
+                if change.get('changed_at') is not None:
+                    self.lastModified = max(self.lastModified or 0, float(change['changed_at']))
+
+                self._remove(change['booking_id'])
+                if change['operation'] != 'D':
+                    self._add(change)
+
+            self._lastSync = now
+
+    def versionTag(self):
+        """
+        Returns a tag that changes whenever the indexed bookings change.
+
+        The tag is derived from the change-log position and the number of change ids still awaited,
+        so two workers that have applied the same changes report the same tag.
+
+        Returns:
+            str: The version tag.
+        """
+
+        with self._lock:
+            return f"{self.lastChangeId}.{len(self._pendingGaps)}"
+
+    def findConflict(self, venueId, date, fromTime, endTime):
+        """
+        Finds an indexed booking that overlaps the requested slot.
+
+        Args:
+            venueId (int): The venue id.
+            date (datetime.date or str): The booking date.
+            fromTime: The start time (see toSeconds for accepted formats).
+            endTime: The end time (see toSeconds for accepted formats).
+
+        Returns:
+            int or None: The id of a clashing booking, or None if the slot is free.
+        """
+
+        with self._lock:
+            intervals = self._days.get((venueId, toDateKey(date)))
+            if not intervals:
+                return None
+            return intervals.findOverlap(toSeconds(fromTime), toSeconds(endTime))
+
+    def covers(self, date):
+        """
+        Checks whether the index holds every booking for the given date.
+
+        Args:
+            date (datetime.date or str): The date being queried.
+
+        Returns:
+            bool: True if the index is warm and the date is not before the snapshot horizon.
+        """
+
+        return self.isWarm and toDateKey(date) >= self.horizon
+
+    def discard(self, bookingId):
+        """
+        Removes a single booking, for example one that the database reports as no longer existing.
+
+        Args:
+            bookingId (int): The booking id.
+        """
+
+        with self._lock:
+            self._remove(bookingId)
+
+    def _add(self, booking):
+        key = (booking['venue_id'], toDateKey(booking['date']))
+        start = toSeconds(booking['from_time'])
+        end = toSeconds(booking['end_time'])
+        self._days.setdefault(key, VenueDayIntervals()).add(booking['booking_id'], start, end)
+        self._bookings[booking['booking_id']] = (key, start)
+
+    def _remove(self, bookingId):
+        entry = self._bookings.pop(bookingId, None)
+        if entry is None:
+            return
+        key, start = entry
+        intervals = self._days.get(key)
+        if intervals is not None:
+            intervals.remove(bookingId, start)
+            if not intervals:
+                del self._days[key]
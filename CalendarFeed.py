@@ -0,0 +1,180 @@
+import os
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from BookingIndex import toSeconds
+
+# The time zone booking dates and times are recorded in; feeds give event times in UTC
+CALENDAR_TIMEZONE = os.environ.get('VENUESCOPE_CALENDAR_TIMEZONE', 'Asia/Kolkata')
+
+# Days of past bookings kept in a feed, so calendars still show recent events
+CALENDAR_PAST_DAYS = int(os.environ.get('VENUESCOPE_CALENDAR_PAST_DAYS', '30'))
+
+# How often calendar clients are asked to poll a feed
+CALENDAR_REFRESH_INTERVAL = 'PT15M'
+
+# Longest content line allowed by RFC 5545, in octets, excluding the line break
+MAX_LINE_OCTETS = 75
+
+def escapeText(value):
+    """
+    Escapes a TEXT property value for iCalendar.
+
+    Args:
+        value: The value; converted to a string.
+
+    Returns:
+        str: The value with backslashes, semicolons, commas and line breaks escaped.
+    """
+
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def foldLine(line):
+    """
+    Folds a content line into lines of at most 75 octets, continuing each with a leading space,
+    without splitting a UTF-8 character.
+
+    Args:
+        line (str): The unfolded content line.
+
+    Returns:
+        str: The folded line, with CRLF line breaks and no trailing break.
+    """
+
+    if len(line.encode()) <= MAX_LINE_OCTETS:
+        return line
+
+    parts = []
+    current, size, limit = [], 0, MAX_LINE_OCTETS
+    for character in line:
+        octets = len(character.encode())
+        if size + octets > limit:
+            parts.append(''.join(current))
+            # Continuation lines start with a space, which counts towards their length
+            current, size, limit = [], 0, MAX_LINE_OCTETS - 1
+        current.append(character)
+        size += octets
+    parts.append(''.join(current))
+    return '\r\n '.join(parts)
+
+def formatUtc(moment):
+    """
+    Formats an aware datetime as an iCalendar UTC DATE-TIME, e.g. '20240101T043000Z'.
+
+    Args:
+        moment (datetime.datetime): The time, in any time zone.
+
+    Returns:
+        str: The time in UTC.
+    """
+
+    return moment.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def renderCalendar(name, bookings, stamp, timeZone=CALENDAR_TIMEZONE):
+    """
+    Renders bookings as an iCalendar (RFC 5545) feed with one event per booking.
+
+    Args:
+        name (str): The calendar name shown by calendar apps, e.g. 'G - 301 bookings'.
+        bookings (Iterable[dict]): Bookings with booking_id, date, from_time, end_time, venue_name,
+                                   club_name and venue_link.
+        stamp (float): The Unix time the bookings were last changed, used as every event's DTSTAMP.
+        timeZone (str): The IANA time zone the booking dates and times are in.
+
+    Returns:
+        str: The feed, with CRLF line breaks.
+    """
+
+    zone = ZoneInfo(timeZone)
+    dtstamp = formatUtc(datetime.fromtimestamp(stamp, timezone.utc))
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//VenueScope//Venue Bookings//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escapeText(name)}',
+        f'X-WR-TIMEZONE:{timeZone}',
+        f'X-PUBLISHED-TTL:{CALENDAR_REFRESH_INTERVAL}',
+        f'REFRESH-INTERVAL;VALUE=DURATION:{CALENDAR_REFRESH_INTERVAL}',
+    ]
+
+    for booking in bookings:
+        day = datetime.combine(booking['date'], datetime.min.time(), zone)
+        start = toSeconds(booking['from_time'])
+        end = toSeconds(booking['end_time'])
+        lines.extend([
+            'BEGIN:VEVENT',
+            f"UID:booking-{booking['booking_id']}@venuescope",
+            f'DTSTAMP:{dtstamp}',
+            f"DTSTART:{formatUtc(day.replace(hour=start // 3600, minute=start % 3600 // 60, second=start % 60))}",
+            f"DTEND:{formatUtc(day.replace(hour=end // 3600, minute=end % 3600 // 60, second=end % 60))}",
+            f"SUMMARY:{escapeText(booking['club_name'])} @ {escapeText(booking['venue_name'])}",
+            f"LOCATION:{escapeText(booking['venue_name'])}",
+            f"DESCRIPTION:{escapeText(booking['venue_link'])}",
+            'END:VEVENT',
+        ])
+
+    lines.append('END:VCALENDAR')
+    return ''.join(foldLine(line) + '\r\n' for line in lines)
+
+class FeedVersions:
+    """
+    Tracks a version for every venue and club feed, so a feed's ETag only changes when one of its bookings does.
+
+    A feed's version is the booking index version tag at the last change that touched the venue or club.
+    Feeds not touched since the index was loaded share the tag the index was loaded at. Tags never repeat,
+    so a feed never returns to an earlier version, and workers that applied the same changes agree on it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._floor = None
+
+    def reset(self, tag):
+        """
+        Forgets every feed version, after the booking index was reloaded.
+
+        Args:
+            tag (str): The index version tag after the reload.
+        """
+
+        with self._lock:
+            self._versions = {}
+            self._floor = tag
+
+    def bump(self, changes, tag):
+        """
+        Moves the feeds of the venues and clubs touched by a batch of changes to a new version.
+
+        Args:
+            changes (list[dict]): The applied change-log rows.
+            tag (str): The index version tag after the changes.
+        """
+
+        with self._lock:
+            # The change log records only the new row of an update, so the feeds it moved the booking out of are unknown
+            if any(change['operation'] == 'U' for change in changes):
+                self._versions = {}
+                self._floor = tag
+                return
+            for change in changes:
+                self._versions[('venue', change['venue_id'])] = tag
+                self._versions[('club', change['club_id'])] = tag
+
+    def get(self, kind, key):
+        """
+        Returns the version of a feed.
+
+        Args:
+            kind (str): 'venue' or 'club'.
+            key (int): The venue or club id.
+
+        Returns:
+            str or None: The version, or None before the booking index has been loaded.
+        """
+
+        with self._lock:
+            return self._versions.get((kind, key), self._floor)
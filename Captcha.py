@@ -1,61 +1,167 @@
+import hashlib
+import hmac
 import os
 import re
 import random
+import secrets
+import threading
+import time
+from itsdangerous import URLSafeTimedSerializer, BadData
+
+CAPTCHA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'assets', 'CAPTCHA')
+
+# Seconds a CAPTCHA challenge stays valid after it was issued
+CAPTCHA_MAX_AGE = int(os.environ.get('VENUESCOPE_CAPTCHA_MAX_AGE', '300'))
+
+# Minimum number of seconds between two checks of the CAPTCHA folder for added or removed images; 0 disables reloading
+CAPTCHA_RELOAD_INTERVAL = float(os.environ.get('VENUESCOPE_CAPTCHA_RELOAD_INTERVAL', '60'))
 
 class Captcha:
     """
-    A class to handle CAPTCHA functionalities including selecting a random image and validating CAPTCHA solutions and passwords.
+    A class to handle CAPTCHA functionalities including issuing image challenges and validating CAPTCHA solutions and passwords.
+
+    The image catalog is indexed once and shared by all requests. Each challenge is a signed token naming an image by an
+    opaque id, so the service keeps no per-user state and any thread or worker sharing the secret key can validate it.
     """
     
-    def __init__(self):
+    def __init__(self, secretKey, folderPath=CAPTCHA_FOLDER, maxAge=CAPTCHA_MAX_AGE, reloadInterval=CAPTCHA_RELOAD_INTERVAL):
         """
-        Initializes the Captcha object, setting the folder path for CAPTCHA images and initializing attributes for selected image and solution.
+        Initializes the Captcha object and indexes the CAPTCHA images.
+
+        Args:
+            secretKey (str): The key used to sign challenge tokens and derive image ids. Every worker must use the same key.
+            folderPath (str, optional): The folder holding the CAPTCHA images, named after their solutions.
+            maxAge (int, optional): Seconds a challenge stays valid.
+            reloadInterval (float, optional): Minimum seconds between checks of the folder for changes. 0 disables reloading.
+
+        Raises:
+            FileNotFoundError: If no JPEG files are found in the CAPTCHA folder.
         """
-        CAPTCHA_FOLDER = 'static/assets/CAPTCHA'
-        self.folderPath = CAPTCHA_FOLDER
-        self.selectedImage = None
-        self.solution = None
 
-    def selectRandomImage(self):
+        self.folderPath = folderPath
+        self.maxAge = maxAge
+        self.reloadInterval = reloadInterval
+        self._secretKey = secretKey.encode('utf-8')
+        self._serializer = URLSafeTimedSerializer(secretKey, salt='venuescope.captcha')
+
+        self._lock = threading.Lock()
+        self._images = {}
+        self._imageIds = []
+        self._folderModified = None
+        self._lastCheck = 0.0
+
+        self.loadCatalog()
+
+    def loadCatalog(self):
         """
-        Selects a random JPEG image from the CAPTCHA folder and sets it as the selected image.
-        
-        Returns:
-            str: The filename of the selected image.
-        
+        Indexes the JPEG images in the CAPTCHA folder.
+
         Raises:
             FileNotFoundError: If no JPEG files are found in the CAPTCHA folder.
         """
 
-        # Initialize an empty list to store valid jpg files
-        jpg_files = []
-
-        # Iterate over the files and collect only jpg files
+        folderModified = os.stat(self.folderPath).st_mtime
+        images = {}
         for file in os.listdir(self.folderPath):
             if file.endswith('.jpg'):
-                jpg_files.append(file)
-        
-        # Check if any jpg files are found and pick a random one
-        if jpg_files:
-            self.selectedImage = random.choice(jpg_files)
-            self.solution = os.path.splitext(self.selectedImage)[0]
-            return self.selectedImage
-        else:
+                images[self._imageId(file)] = file
+
+        if not images:
             raise FileNotFoundError("No valid CAPTCHA images found in the folder")
 
-    def validateCaptcha(self, userInput):
+        with self._lock:
+            self._images = images
+            self._imageIds = sorted(images)
+            self._folderModified = folderModified
+            self._lastCheck = time.monotonic()
+
+    def reloadIfChanged(self):
+        """
+        Re-indexes the CAPTCHA folder if its contents changed, checking at most once per reload interval.
+        An empty or unreadable folder keeps the current catalog.
+        """
+
+        if not self.reloadInterval or time.monotonic() - self._lastCheck < self.reloadInterval:
+            return
+
+        self._lastCheck = time.monotonic()
+        try:
+            if os.stat(self.folderPath).st_mtime != self._folderModified:
+                self.loadCatalog()
+        except OSError as e:
+            # Also covers an emptied folder (FileNotFoundError from loadCatalog)
+            print(f"Error: {e}")
+
+    def createChallenge(self):
+        """
+        Picks a random CAPTCHA image and issues a signed challenge for it.
+
+        Returns:
+            tuple[str, str]: The image id to display and the token to submit along with the answer.
+        """
+
+        self.reloadIfChanged()
+        with self._lock:
+            imageId = random.choice(self._imageIds)
+
+        # The nonce makes two challenges for the same image distinguishable
+        token = self._serializer.dumps({'image': imageId, 'nonce': secrets.token_urlsafe(8)})
+        return imageId, token
+
+    def getImageFile(self, imageId):
+        """
+        Looks up the file behind an image id.
+
+        Args:
+            imageId (str): The image id from a challenge.
+
+        Returns:
+            str or None: The filename in the CAPTCHA folder, or None if the id is unknown.
         """
-        Validates the user's CAPTCHA input against the solution.
+
+        with self._lock:
+            return self._images.get(imageId)
+
+    def validateCaptcha(self, userInput, token):
+        """
+        Validates the user's CAPTCHA input against the solution of the challenge it answers.
         
         Args:
             userInput (str): The CAPTCHA input provided by the user.
+            token (str): The challenge token issued by createChallenge.
         
         Returns:
-            bool: True if the user input matches the solution, False otherwise.
+            bool: True if the token is authentic and unexpired and the user input matches its solution, False otherwise.
+        """
+
+        if not userInput or not token:
+            return False
+
+        try:
+            challenge = self._serializer.loads(token, max_age=self.maxAge)
+        except BadData:
+            return False
+
+        file = self.getImageFile(challenge.get('image'))
+        if file is None:
+            return False
+
+        solution = os.path.splitext(file)[0]
+        return hmac.compare_digest(userInput.encode('utf-8'), solution.encode('utf-8'))
+
+    def _imageId(self, file):
+        """
+        Derives an opaque id for an image, so the page never reveals the filename and with it the solution.
+        The id depends only on the secret key and the filename, so every worker derives the same one.
+
+        Args:
+            file (str): The image filename.
+
+        Returns:
+            str: The image id.
         """
 
-        print(userInput, self.solution)
-        return userInput == self.solution
+        return hmac.new(self._secretKey, file.encode('utf-8'), hashlib.sha256).hexdigest()[:24]
     
     def validatePassword(self, newPassword, reEnterPassword):
         """
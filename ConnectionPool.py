@@ -0,0 +1,400 @@
+import os
+import queue
+import threading
+import sqlite3
+import time
+from mysql.connector import Error
+
+# Base error classes of every supported database driver, for use in except clauses
+DatabaseError = (Error, sqlite3.Error)
+
+class PoolTimeoutError(Error):
+    """
+    Raised when no pooled connection becomes available within the checkout timeout.
+    """
+
+def loadDBConfig():
+    """
+    Reads the MySQL connection parameters from the environment.
+
+    Environment variables:
+        VENUESCOPE_DB_HOST (default 'localhost')
+        VENUESCOPE_DB_PORT (default 3306)
+        VENUESCOPE_DB_USER (default 'root')
+        VENUESCOPE_DB_PASSWORD (default 'root')
+        VENUESCOPE_DB_NAME (default 'VenueScope')
+
+    Returns:
+        dict: The keyword arguments passed to mysql.connector.connect().
+    """
+
+    return {
+        'host': os.environ.get('VENUESCOPE_DB_HOST', 'localhost'),
+        'port': int(os.environ.get('VENUESCOPE_DB_PORT', '3306')),
+        'user': os.environ.get('VENUESCOPE_DB_USER', 'root'),
+        'password': os.environ.get('VENUESCOPE_DB_PASSWORD', 'root'),
+        'database': os.environ.get('VENUESCOPE_DB_NAME', 'VenueScope'),
+    }
+
+def loadPoolConfig():
+    """
+    Reads the connection pool settings from the environment.
+
+    Environment variables:
+        VENUESCOPE_DB_POOL_SIZE (default 5): Connections kept open while idle.
+        VENUESCOPE_DB_POOL_MAX_OVERFLOW (default 10): Extra connections opened under load and closed when returned.
+        VENUESCOPE_DB_POOL_RECYCLE (default 3600): Seconds after which a connection is replaced.
+        VENUESCOPE_DB_POOL_PING_AFTER (default 5): Idle seconds after which a connection is pinged on checkout.
+        VENUESCOPE_DB_POOL_TIMEOUT (default 30): Seconds to wait for a free connection.
+
+    Returns:
+        dict: The keyword arguments passed to ConnectionPool().
+    """
+
+    return {
+        'size': int(os.environ.get('VENUESCOPE_DB_POOL_SIZE', '5')),
+        'maxOverflow': int(os.environ.get('VENUESCOPE_DB_POOL_MAX_OVERFLOW', '10')),
+        'recycle': float(os.environ.get('VENUESCOPE_DB_POOL_RECYCLE', '3600')),
+        'pingAfter': float(os.environ.get('VENUESCOPE_DB_POOL_PING_AFTER', '5')),
+        'timeout': float(os.environ.get('VENUESCOPE_DB_POOL_TIMEOUT', '30')),
+    }
+
+class PooledConnection:
+    """
+    A thin proxy around a pooled database connection.
+
+    Every attribute is delegated to the underlying connection, except close(), which hands the
+    connection back to the pool instead of tearing it down. Existing code that calls
+    connection.close() therefore keeps working unchanged. Cursors are passed through the pool's
+    cursor hook, if it has one.
+    """
+
+    def __init__(self, pool, record):
+        self._pool = pool
+        self._record = record
+
+    def __getattr__(self, name):
+        if self._record is None:
+            raise Error("Connection has already been returned to the pool")
+        return getattr(self._record['connection'], name)
+
+    def cursor(self, *args, **kwargs):
+        """
+        Opens a cursor on the underlying connection.
+
+        Returns:
+            The driver's cursor, or the cursor returned by the pool's cursor hook.
+        """
+
+        if self._record is None:
+            raise Error("Connection has already been returned to the pool")
+
+        connection = self._record['connection']
+        cursor = connection.cursor(*args, **kwargs)
+        if self._pool.cursorHook is not None:
+            return self._pool.cursorHook(cursor, connection)
+        return cursor
+
+    def close(self):
+        """
+        Returns the connection to the pool. Calling close() more than once is harmless.
+        """
+
+        if self._record is not None:
+            record, self._record = self._record, None
+            self._pool._release(record)
+
+    def discard(self):
+        """
+        Closes the connection instead of returning it to the pool, e.g. to abandon an unbuffered result
+        without reading the rest of it. Calling discard() after close() is harmless.
+        """
+
+        if self._record is not None:
+            record, self._record = self._record, None
+            self._pool._release(record, discard=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+        return False
+
+class ConnectionPool:
+    """
+    A thread-safe pool of database connections shared by every service in the process.
+
+    The pool is independent of the database engine: it opens connections with the factory it is given,
+    and expects them to offer the mysql-connector connection methods (ping, rollback, in_transaction, ...).
+    """
+
+    def __init__(self, connect, size=5, maxOverflow=10, recycle=3600, pingAfter=5, timeout=30):
+        """
+        Initializes an empty pool. Connections are opened lazily on first checkout.
+
+        Args:
+            connect (Callable[[], object]): Opens a new connection, e.g. a call to mysql.connector.connect().
+            size (int): Number of idle connections kept open.
+            maxOverflow (int): Number of additional connections allowed while the pool is exhausted.
+            recycle (float): Maximum age of a connection in seconds before it is replaced.
+            pingAfter (float): Idle seconds after which a connection is health-checked on checkout.
+            timeout (float): Seconds to wait for a connection before raising PoolTimeoutError.
+        """
+
+        self.connect = connect
+        self.cursorHook = None  # Called with (cursor, connection) for every new cursor, e.g. to profile it
+        self.size = size
+        self.maxOverflow = maxOverflow
+        self.recycle = recycle
+        self.pingAfter = pingAfter
+        self.timeout = timeout
+
+        self._idle = queue.LifoQueue()  # LIFO keeps the most recently used connections warm
+        self._lock = threading.Lock()
+        self._open = 0
+        self._checkedOut = 0
+        self._counters = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'recycled': 0,
+            'healthCheckFailures': 0,
+        }
+
+    def getConnection(self):
+        """
+        Checks a connection out of the pool, opening a new one if the pool has spare capacity.
+
+        Returns:
+            PooledConnection: A proxy whose close() returns the connection to the pool.
+
+        Raises:
+            PoolTimeoutError: If no connection became available within the timeout.
+            mysql.connector.Error or sqlite3.Error: If a new connection could not be opened.
+        """
+
+        record = self._takeIdle()
+        if record is None:
+            record = self._openOrWait()
+
+        with self._lock:
+            self._checkedOut += 1
+            self._counters['checkouts'] += 1
+
+        return PooledConnection(self, record)
+
+    def _takeIdle(self):
+        """
+        Pops idle connections until a healthy one is found.
+
+        Returns:
+            dict or None: The connection record, or None if no idle connection is usable.
+        """
+
+        while True:
+            try:
+                record = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+
+            record = self._validate(record)
+            if record is not None:
+                return record
+
+    def _openOrWait(self):
+        """
+        Opens a new connection if the size and overflow limits allow it, otherwise waits for one to be returned.
+
+        Returns:
+            dict: The connection record.
+        """
+
+        waited = False
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._lock:
+                canOpen = self._open < self.size + self.maxOverflow
+                if canOpen:
+                    self._open += 1
+                elif not waited:
+                    self._counters['waits'] += 1
+                    waited = True
+
+            if canOpen:
+                try:
+                    return self._connect()
+                except DatabaseError:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    self._counters['timeouts'] += 1
+                raise PoolTimeoutError(f"No database connection available within {self.timeout} seconds")
+
+            # Wake up periodically so a slot freed by a discarded connection is noticed
+            try:
+                record = self._idle.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                continue
+
+            record = self._validate(record)
+            if record is not None:
+                return record
+
+    def _connect(self):
+        """
+        Opens a new connection with the pool's connect factory.
+
+        Returns:
+            dict: A record holding the connection and its creation and last-use timestamps.
+        """
+
+        connection = self.connect()
+        now = time.monotonic()
+        with self._lock:
+            self._counters['created'] += 1
+        return {'connection': connection, 'createdAt': now, 'lastUsed': now}
+
+    def _validate(self, record):
+        """
+        Recycles connections that are too old and pings connections that have been idle for a while.
+
+        Args:
+            record (dict): The connection record taken from the idle queue.
+
+        Returns:
+            dict or None: The record if the connection is usable, or None if it was discarded.
+        """
+
+        now = time.monotonic()
+
+        if now - record['createdAt'] > self.recycle:
+            with self._lock:
+                self._counters['recycled'] += 1
+            self._discard(record)
+            return None
+
+        if now - record['lastUsed'] > self.pingAfter:
+            try:
+                record['connection'].ping(reconnect=False)
+            except DatabaseError:
+                with self._lock:
+                    self._counters['healthCheckFailures'] += 1
+                self._discard(record)
+                return None
+
+        return record
+
+    def _release(self, record, discard=False):
+        """
+        Returns a connection to the idle queue, or closes it if the pool is already full or the connection is unusable.
+
+        Args:
+            record (dict): The connection record being returned.
+            discard (bool): Close the connection whatever its state.
+        """
+
+        connection = record['connection']
+        with self._lock:
+            self._checkedOut -= 1
+
+        if discard:
+            self._discard(record)
+            return
+
+        try:
+            # Leave no open transaction or pending result behind for the next borrower
+            if connection.unread_result:
+                connection.consume_results()
+            if connection.in_transaction:
+                connection.rollback()
+        except DatabaseError:
+            self._discard(record)
+            return
+
+        record['lastUsed'] = time.monotonic()
+        if self._idle.qsize() >= self.size:
+            self._discard(record)
+        else:
+            self._idle.put(record)
+
+    def _discard(self, record):
+        """
+        Closes a connection and frees its slot in the pool.
+
+        Args:
+            record (dict): The connection record to close.
+        """
+
+        try:
+            record['connection'].close()
+        except DatabaseError:
+            pass
+
+        with self._lock:
+            self._open -= 1
+            self._counters['closed'] += 1
+
+    def closeAll(self):
+        """
+        Closes every idle connection. Connections that are currently checked out are unaffected.
+        """
+
+        while True:
+            try:
+                record = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(record)
+
+    def reset(self):
+        """
+        Forgets every connection without closing it and starts over with an empty pool.
+
+        Called in a freshly forked worker process: connections inherited from the parent share their sockets
+        with it, so the worker must neither use nor close them. The parent should closeAll() before forking,
+        so there is nothing left to forget.
+        """
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._checkedOut = 0
+        self._counters = dict.fromkeys(self._counters, 0)
+
+    def stats(self):
+        """
+        Reports the current state of the pool.
+
+        Returns:
+            dict: The pool limits, the number of open, idle and checked-out connections,
+                  and cumulative counters for creations, checkouts, waits, timeouts and health-check failures.
+        """
+
+        with self._lock:
+            stats = {
+                'size': self.size,
+                'maxOverflow': self.maxOverflow,
+                'open': self._open,
+                'idle': self._idle.qsize(),
+                'checkedOut': self._checkedOut,
+            }
+            stats.update(self._counters)
+        return stats
+
+def getConnectionPool():
+    """
+    Returns the connection pool of the process-wide storage backend, creating it from the environment on first use.
+
+    Returns:
+        ConnectionPool: The shared pool.
+    """
+
+    from Storage import getStorage
+    return getStorage().pool
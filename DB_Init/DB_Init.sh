@@ -27,6 +27,9 @@ SOURCE insert_venue_list.sql;
 SOURCE insert_club_head.sql;
 EOF
 
+# Apply the versioned schema migrations (connection settings come from the VENUESCOPE_DB_* variables)
+/usr/local/bin/python3 Migrate.py
+
 # Remove the .sql files created
 rm -f insert_club_list.sql
 rm -f insert_club_head_details.sql
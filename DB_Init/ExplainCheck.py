@@ -0,0 +1,335 @@
+import os
+import sys
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ConnectionPool import loadDBConfig
+
+# The hot queries issued by VenueManagement and UserAuthentication, with sample parameters and the
+# index each table reference is expected to use. Keep these in sync with the queries in those classes.
+HOT_QUERIES = [
+    {
+        'name': 'findIndexedConflict',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, club_id
+            FROM booked_venue
+            WHERE booking_id = %s AND venue_id = %s AND date = %s
+            AND from_time < %s AND end_time > %s
+        """,
+        'params': (1, 5, '2024-01-01', '11:00:00', '10:00:00'),
+        'expected': {'booked_venue': 'PRIMARY'},
+    },
+    {
+        'name': 'bookVenue',
+        'query': """
+            INSERT INTO booked_venue (venue_id, club_id, date, from_time, end_time, venue_link)
+            SELECT %s, %s, %s, %s, %s, %s
+            FROM DUAL
+            WHERE NOT EXISTS (
+                SELECT 1
+                FROM booked_venue bv
+                WHERE bv.venue_id = %s AND bv.date = %s
+                AND bv.from_time < %s AND bv.end_time > %s
+            )
+        """,
+        'params': (5, 21, '2024-01-01', '10:00:00', '11:00:00', 'https://example.com',
+                   5, '2024-01-01', '11:00:00', '10:00:00'),
+        'expected': {'bv': 'idx_booked_venue_conflict'},
+    },
+    {
+        'name': 'bookVenue conflict lookup',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, club_id
+            FROM booked_venue
+            WHERE venue_id = %s AND date = %s
+            AND from_time < %s AND end_time > %s
+            ORDER BY from_time
+            LIMIT 1
+        """,
+        'params': (5, '2024-01-01', '11:00:00', '10:00:00'),
+        'expected': {'booked_venue': 'idx_booked_venue_conflict'},
+    },
+    {
+        'name': 'bookVenueSeries conflict check',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, club_id
+            FROM booked_venue
+            WHERE venue_id = %s AND date IN (%s, %s, %s)
+            AND from_time < %s AND end_time > %s
+            ORDER BY date, from_time
+        """,
+        'params': (5, '2024-01-01', '2024-01-08', '2024-01-15', '11:00:00', '10:00:00'),
+        'expected': {'booked_venue': 'idx_booked_venue_conflict'},
+    },
+    {
+        'name': 'findAvailability',
+        'query': """
+            SELECT venue_id, date, TIME_TO_SEC(from_time), TIME_TO_SEC(end_time)
+            FROM booked_venue
+            WHERE date BETWEEN %s AND %s
+            ORDER BY date, venue_id, from_time
+        """,
+        'params': ('2024-01-01', '2024-01-31'),
+        'expected': {'booked_venue': 'idx_booked_venue_availability'},
+    },
+    {
+        'name': 'findAvailability for one venue',
+        'query': """
+            SELECT venue_id, date, TIME_TO_SEC(from_time), TIME_TO_SEC(end_time)
+            FROM booked_venue
+            WHERE venue_id = %s AND date BETWEEN %s AND %s
+            ORDER BY date, from_time
+        """,
+        'params': (5, '2024-01-01', '2024-01-31'),
+        'expected': {'booked_venue': 'idx_booked_venue_conflict'},
+    },
+    {
+        'name': 'fetchBookings',
+        'query': """
+            SELECT bv.booking_id, bv.date, bv.from_time, bv.end_time, bv.venue_link, bv.venue_id, bv.club_id
+            FROM booked_venue bv
+            WHERE bv.date >= COALESCE(%s, CURDATE())
+            AND (bv.date > %s OR (bv.date = %s AND (bv.from_time > %s
+                OR (bv.from_time = %s AND bv.booking_id > %s))))
+            ORDER BY bv.date, bv.from_time, bv.booking_id
+            LIMIT %s
+        """,
+        'params': (None, '2024-01-01', '2024-01-01', '10:00:00', '10:00:00', 0, 51),
+        'expected': {'bv': 'idx_booked_venue_schedule'},
+    },
+    {
+        'name': 'fetchCalendarBookings for a venue',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, venue_link, venue_id, club_id
+            FROM booked_venue
+            WHERE venue_id = %s AND date >= %s
+            ORDER BY date, from_time
+        """,
+        'params': (5, '2024-01-01'),
+        'expected': {'booked_venue': 'idx_booked_venue_conflict'},
+    },
+    {
+        'name': 'fetchCalendarBookings for a club',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, venue_link, venue_id, club_id
+            FROM booked_venue
+            WHERE club_id = %s AND date >= %s
+            ORDER BY date, from_time
+        """,
+        'params': (21, '2024-01-01'),
+        'expected': {'booked_venue': 'idx_booked_venue_club'},
+    },
+    {
+        'name': 'fetchBookings from the archive',
+        'query': """
+            SELECT bv.booking_id, bv.date, bv.from_time, bv.end_time, bv.venue_link, bv.venue_id, bv.club_id
+            FROM booked_venue_archive bv
+            WHERE bv.date >= %s
+            ORDER BY bv.date, bv.from_time, bv.booking_id
+            LIMIT %s
+        """,
+        'params': ('2024-01-01', 51),
+        'expected': {'bv': 'idx_booked_venue_archive_schedule'},
+    },
+    {
+        'name': 'fetchCalendarBookings from the archive for a venue',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, venue_link, venue_id, club_id
+            FROM booked_venue_archive
+            WHERE venue_id = %s AND date >= %s
+            ORDER BY date, from_time
+        """,
+        'params': (5, '2024-01-01'),
+        'expected': {'booked_venue_archive': 'idx_booked_venue_archive_venue'},
+    },
+    {
+        'name': 'fetchCalendarBookings from the archive for a club',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, venue_link, venue_id, club_id
+            FROM booked_venue_archive
+            WHERE club_id = %s AND date >= %s
+            ORDER BY date, from_time
+        """,
+        'params': (21, '2024-01-01'),
+        'expected': {'booked_venue_archive': 'idx_booked_venue_archive_club'},
+    },
+    {
+        'name': 'syncBookingIndex archived deletes',
+        'query': """
+            SELECT booking_id
+            FROM booked_venue_archive
+            WHERE booking_id IN (%s, %s)
+        """,
+        'params': (1, 2),
+        'expected': {'booked_venue_archive': 'PRIMARY'},
+    },
+    {
+        'name': 'archiveBookings',
+        'query': """
+            SELECT booking_id
+            FROM booked_venue
+            WHERE date < %s
+            ORDER BY date, from_time, booking_id
+            LIMIT %s
+        """,
+        'params': ('2024-01-01', 500),
+        'expected': {'booked_venue': 'idx_booked_venue_schedule'},
+    },
+    {
+        'name': 'deleteBooking',
+        'query': """
+            DELETE FROM booked_venue
+            WHERE booking_id = %s AND club_id = %s
+        """,
+        'params': (1, 21),
+        'expected': {'booked_venue': 'PRIMARY'},
+    },
+    {
+        'name': 'rescheduleBookingConflict',
+        'query': """
+            SELECT booking_id, date, from_time, end_time, club_id
+            FROM booked_venue
+            WHERE venue_id = %s AND date = %s
+            AND from_time < %s AND end_time > %s
+            AND booking_id <> %s
+            ORDER BY from_time
+            LIMIT 1
+        """,
+        'params': (5, '2024-01-01', '11:00:00', '10:00:00', 1),
+        'expected': {'booked_venue': 'idx_booked_venue_conflict'},
+    },
+    {
+        'name': 'rescheduleBooking',
+        'query': """
+            UPDATE booked_venue
+            SET venue_id = %s, date = %s, from_time = %s, end_time = %s, venue_link = %s
+            WHERE booking_id = %s AND club_id = %s
+        """,
+        'params': (5, '2024-01-01', '10:00:00', '11:00:00', 'https://example.com', 1, 21),
+        'expected': {'booked_venue': 'PRIMARY'},
+    },
+    {
+        'name': 'getClubByEmail',
+        'query': """
+            SELECT cl.club_id, cl.club_name
+            FROM club_head_details chd
+            JOIN club_head ch ON chd.head_id = ch.head_id
+            JOIN club_list cl ON ch.club_id = cl.club_id
+            WHERE chd.email = %s
+        """,
+        'params': ('radio_hub@random.com',),
+        'expected': {'chd': 'uq_club_head_details_email'},
+    },
+    {
+        'name': 'syncBookingIndex',
+        'query': """
+            SELECT change_id, operation, booking_id, venue_id, club_id, date, from_time, end_time
+            FROM booking_change_log
+            WHERE change_id > %s
+            ORDER BY change_id
+        """,
+        'params': (0,),
+        'expected': {'booking_change_log': 'PRIMARY'},
+    },
+    {
+        'name': 'loadBookingIndex last change',
+        'query': """
+            SELECT UNIX_TIMESTAMP(changed_at) AS last_modified
+            FROM booking_change_log
+            WHERE change_id = %s
+        """,
+        'params': (1,),
+        'expected': {'booking_change_log': 'PRIMARY'},
+    },
+    {
+        'name': 'syncBookingIndex pruned position',
+        'query': "SELECT version FROM data_version WHERE name = 'booking_change_log'",
+        'params': (),
+        'expected': {'data_version': 'PRIMARY'},
+    },
+    {
+        'name': 'pruneBookingChangeLog',
+        'query': """
+            SELECT MAX(change_id)
+            FROM booking_change_log
+            WHERE change_id <= %s AND UNIX_TIMESTAMP(changed_at) < %s
+        """,
+        'params': (1000, 0),
+        'expected': {'booking_change_log': 'PRIMARY'},
+    },
+    {
+        'name': 'getPasswordFromDB',
+        'query': "SELECT password FROM club_head_details WHERE email = %s",
+        'params': ('radio_hub@random.com',),
+        'expected': {'club_head_details': 'uq_club_head_details_email'},
+    },
+    {
+        'name': 'takeRateLimitToken',
+        'query': "SELECT tokens, updated_at FROM rate_limit_bucket WHERE bucket_key = %s",
+        'params': ('0' * 40,),
+        'expected': {'rate_limit_bucket': 'PRIMARY'},
+    },
+    {
+        'name': 'purgeRateLimitBuckets',
+        'query': "DELETE FROM rate_limit_bucket WHERE updated_at < %s",
+        'params': (0,),
+        'expected': {'rate_limit_bucket': 'idx_rate_limit_bucket_updated'},
+    },
+]
+
+def explain(cursor, query, params):
+    """
+    Runs EXPLAIN for a query and returns the plan rows.
+
+    Args:
+        cursor: An open MySQL dictionary cursor.
+        query (str): The SQL statement to explain.
+        params (tuple): Sample parameters for the statement.
+
+    Returns:
+        list[dict]: The EXPLAIN output, one row per table reference.
+    """
+
+    cursor.execute("EXPLAIN " + query, params)
+    return cursor.fetchall()
+
+def checkPlan(plan, expected):
+    """
+    Compares the index chosen for each table reference against the expected index.
+
+    Args:
+        plan (list[dict]): The EXPLAIN output.
+        expected (dict): A mapping of table alias to expected index name.
+
+    Returns:
+        list[str]: A description of every mismatch. Empty if the plan uses the expected indexes.
+    """
+
+    problems = []
+    chosen = {row['table']: row['key'] for row in plan}
+    for table, index in expected.items():
+        if table not in chosen:
+            problems.append(f"{table}: not present in the plan")
+        elif chosen[table] != index:
+            problems.append(f"{table}: uses {chosen[table] or 'a full scan'} instead of {index}")
+    return problems
+
+if __name__ == '__main__':
+    connection = mysql.connector.connect(**loadDBConfig())
+    cursor = connection.cursor(dictionary=True)
+
+    failures = 0
+    for hotQuery in HOT_QUERIES:
+        problems = checkPlan(explain(cursor, hotQuery['query'], hotQuery['params']), hotQuery['expected'])
+        if problems:
+            failures += 1
+            print(f"FAIL {hotQuery['name']}")
+            for problem in problems:
+                print(f"     {problem}")
+        else:
+            print(f"OK   {hotQuery['name']}")
+
+    cursor.close()
+    connection.close()
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,124 @@
+import os
+import re
+import sys
+import mysql.connector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ConnectionPool import loadDBConfig
+
+MIGRATIONS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^V(\d+)__(\w+)\.sql$')
+
+def listMigrations(folder):
+    """
+    Lists the migration scripts in the migrations folder, ordered by version.
+
+    Migration files are named 'V<version>__<description>.sql', for example 'V001__booked_venue_indexes.sql'.
+
+    Args:
+        folder (str): The folder containing the migration scripts.
+
+    Returns:
+        list[tuple]: A list of (version, name, path) tuples sorted by version.
+    """
+
+    migrations = []
+    for file in os.listdir(folder):
+        match = MIGRATION_FILE.match(file)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(folder, file)))
+    return sorted(migrations)
+
+def splitStatements(script):
+    """
+    Splits a SQL script into individual statements.
+
+    Comment lines are dropped and statements are expected to end with a semicolon at the end of a line.
+
+    Args:
+        script (str): The contents of the SQL script.
+
+    Returns:
+        list[str]: The statements in the order they appear in the script.
+    """
+
+    statements = []
+    current = []
+    for line in script.splitlines():
+        if line.strip().startswith('--') or not line.strip():
+            continue
+        current.append(line)
+        if line.rstrip().endswith(';'):
+            statements.append('\n'.join(current).rstrip().rstrip(';'))
+            current = []
+    if current:
+        statements.append('\n'.join(current))
+    return statements
+
+def getAppliedVersions(cursor):
+    """
+    Creates the schema_migrations bookkeeping table if needed and returns the versions already applied.
+
+    Args:
+        cursor: An open MySQL cursor.
+
+    Returns:
+        set[int]: The applied migration versions.
+    """
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+def migrate(connection, folder=MIGRATIONS_FOLDER):
+    """
+    Applies every pending migration in version order.
+
+    MySQL commits DDL statements implicitly, so a migration that fails halfway is not rolled back;
+    fix the cause and re-run the remaining statements by hand before running the migrations again.
+
+    Args:
+        connection: An open MySQL connection.
+        folder (str): The folder containing the migration scripts.
+
+    Returns:
+        list[int]: The versions applied by this run.
+    """
+
+    cursor = connection.cursor()
+    applied = getAppliedVersions(cursor)
+    newlyApplied = []
+
+    for version, name, path in listMigrations(folder):
+        if version in applied:
+            continue
+
+        print(f"Applying migration V{version:03d} {name}")
+        with open(path) as file:
+            for statement in splitStatements(file.read()):
+                cursor.execute(statement)
+
+        cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+        connection.commit()
+        newlyApplied.append(version)
+
+    cursor.close()
+    return newlyApplied
+
+if __name__ == '__main__':
+    connection = mysql.connector.connect(**loadDBConfig())
+    try:
+        applied = migrate(connection)
+    finally:
+        connection.close()
+
+    if applied:
+        print(f"Applied {len(applied)} migration(s).")
+    else:
+        print("Database schema is up to date.")
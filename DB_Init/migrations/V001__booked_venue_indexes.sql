@@ -0,0 +1,19 @@
+-- Surrogate key so a booking can be addressed by a single column
+ALTER TABLE booked_venue
+    ADD COLUMN booking_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST;
+
+-- Conflict check and delete: equality on venue and date, range on the times
+CREATE INDEX idx_booked_venue_conflict ON booked_venue (venue_id, date, from_time, end_time);
+
+-- Dashboard listing in chronological order
+CREATE INDEX idx_booked_venue_schedule ON booked_venue (date, from_time, booking_id);
+
+-- Per-club dashboard listing
+CREATE INDEX idx_booked_venue_club ON booked_venue (club_id, date, from_time);
+
+-- Login and club lookups by email
+CREATE UNIQUE INDEX uq_club_head_details_email ON club_head_details (email);
+
+-- Name to id lookups used by the booking queries
+CREATE UNIQUE INDEX uq_venue_list_name ON venue_list (venue_name);
+CREATE UNIQUE INDEX uq_club_list_name ON club_list (club_name);
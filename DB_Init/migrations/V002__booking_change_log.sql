@@ -0,0 +1,27 @@
+-- Append-only log of every change to booked_venue. Each worker tails it to keep its in-memory
+-- booking index in sync, so the log is the cross-worker invalidation channel.
+CREATE TABLE booking_change_log (
+    change_id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    operation CHAR(1) NOT NULL,
+    booking_id INT NOT NULL,
+    venue_id INT NOT NULL,
+    club_id INT NOT NULL,
+    date DATE NOT NULL,
+    from_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT check_operation CHECK (operation IN ('I', 'U', 'D'))
+);
+
+-- The triggers record the change in the same transaction as the booking write itself
+CREATE TRIGGER trg_booked_venue_insert AFTER INSERT ON booked_venue FOR EACH ROW
+    INSERT INTO booking_change_log (operation, booking_id, venue_id, club_id, date, from_time, end_time)
+    VALUES ('I', NEW.booking_id, NEW.venue_id, NEW.club_id, NEW.date, NEW.from_time, NEW.end_time);
+
+CREATE TRIGGER trg_booked_venue_update AFTER UPDATE ON booked_venue FOR EACH ROW
+    INSERT INTO booking_change_log (operation, booking_id, venue_id, club_id, date, from_time, end_time)
+    VALUES ('U', NEW.booking_id, NEW.venue_id, NEW.club_id, NEW.date, NEW.from_time, NEW.end_time);
+
+CREATE TRIGGER trg_booked_venue_delete AFTER DELETE ON booked_venue FOR EACH ROW
+    INSERT INTO booking_change_log (operation, booking_id, venue_id, club_id, date, from_time, end_time)
+    VALUES ('D', OLD.booking_id, OLD.venue_id, OLD.club_id, OLD.date, OLD.from_time, OLD.end_time);
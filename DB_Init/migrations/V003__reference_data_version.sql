@@ -0,0 +1,36 @@
+-- Version counters for cached data. Workers compare the stored version with the one they loaded
+-- to find out cheaply whether their cached copy is still current.
+CREATE TABLE data_version (
+    name VARCHAR(32) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO data_version (name, version) VALUES ('reference', 0);
+
+-- Any change to venues, clubs or club heads' club assignments bumps the reference data version
+CREATE TRIGGER trg_venue_list_insert AFTER INSERT ON venue_list FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_venue_list_update AFTER UPDATE ON venue_list FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_venue_list_delete AFTER DELETE ON venue_list FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_club_list_insert AFTER INSERT ON club_list FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_club_list_update AFTER UPDATE ON club_list FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_club_list_delete AFTER DELETE ON club_list FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_club_head_insert AFTER INSERT ON club_head FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_club_head_update AFTER UPDATE ON club_head FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+
+CREATE TRIGGER trg_club_head_delete AFTER DELETE ON club_head FOR EACH ROW
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
@@ -0,0 +1,3 @@
+-- Availability sweep across all venues: a range on date, read in (date, venue, start) order.
+-- The index covers every column the sweep reads, so the scan never touches the table rows.
+CREATE INDEX idx_booked_venue_availability ON booked_venue (date, venue_id, from_time, end_time);
@@ -0,0 +1,9 @@
+-- Token buckets of the rate limiter when it is shared through the database (VENUESCOPE_RATE_LIMIT_BACKEND=database).
+-- Each row is one bucket, for one rule and one client key. The key is stored as a SHA-1 digest, so the table
+-- holds no IP addresses or account names. updated_at is a Unix time; idle buckets are purged by it.
+CREATE TABLE rate_limit_bucket (
+    bucket_key CHAR(40) PRIMARY KEY,
+    tokens DOUBLE NOT NULL,
+    updated_at DOUBLE NOT NULL,
+    INDEX idx_rate_limit_bucket_updated (updated_at)
+);
@@ -0,0 +1,22 @@
+-- Past bookings, moved out of booked_venue by the archive job (BookingArchive.py), so booked_venue and its
+-- indexes only hold current and future bookings. Archived rows keep their booking_id. Booking ids must not be
+-- reused once archived, which MySQL 8.0 guarantees by persisting the AUTO_INCREMENT counter.
+CREATE TABLE booked_venue_archive (
+    booking_id INT NOT NULL PRIMARY KEY,
+    venue_id INT NOT NULL,
+    club_id INT NOT NULL,
+    date DATE NOT NULL,
+    from_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    venue_link TEXT NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (venue_id) REFERENCES venue_list(venue_id),
+    FOREIGN KEY (club_id) REFERENCES club_list(club_id)
+);
+
+-- History exports in chronological order
+CREATE INDEX idx_booked_venue_archive_schedule ON booked_venue_archive (date, from_time, booking_id);
+
+-- Past days of the venue and club calendar feeds
+CREATE INDEX idx_booked_venue_archive_venue ON booked_venue_archive (venue_id, date, from_time);
+CREATE INDEX idx_booked_venue_archive_club ON booked_venue_archive (club_id, date, from_time);
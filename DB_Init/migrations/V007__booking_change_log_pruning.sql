@@ -0,0 +1,3 @@
+-- The highest booking_change_log id that has been pruned. A worker whose index has not read that far
+-- can no longer catch up from the log, and reloads its index from booked_venue instead.
+INSERT INTO data_version (name, version) VALUES ('booking_change_log', 0);
@@ -0,0 +1,165 @@
+-- The VenueScope schema for the embedded SQLite backend (VENUESCOPE_DB_BACKEND=sqlite).
+-- It is equivalent to create_table.sql with every migration in migrations/ applied, and is created
+-- automatically on first use. A new migration must be mirrored here.
+-- Text columns compare case-insensitively, like MySQL's default collation.
+
+-- Contains details about the club heads
+CREATE TABLE club_head_details (
+    head_id INT PRIMARY KEY,
+    club_head VARCHAR(100) NOT NULL,
+    phone_number VARCHAR(10) NOT NULL,
+    password TEXT NOT NULL,
+    email VARCHAR(100) NOT NULL COLLATE NOCASE,
+    CONSTRAINT check_phone_number CHECK (length(phone_number) = 10 AND phone_number NOT GLOB '*[^0-9]*')
+);
+
+-- Contains the list of clubs from the website ( https://su.psgtech.ac.in/clubs.php )
+CREATE TABLE club_list (
+    club_id INT PRIMARY KEY,
+    club_name VARCHAR(100) NOT NULL COLLATE NOCASE
+);
+
+-- Contains the list of venues
+CREATE TABLE venue_list (
+    venue_id INT PRIMARY KEY,
+    venue_name VARCHAR(100) COLLATE NOCASE
+);
+
+-- Connects clubs to their heads
+CREATE TABLE club_head (
+    club_id INT,
+    head_id INT,
+    PRIMARY KEY (club_id, head_id),
+    FOREIGN KEY (club_id) REFERENCES club_list(club_id),
+    FOREIGN KEY (head_id) REFERENCES club_head_details(head_id)
+);
+
+-- Stores the booking details for venue. Dates are stored as 'YYYY-MM-DD' and times as 'HH:MM:SS' text.
+CREATE TABLE booked_venue (
+    booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    venue_id INT NOT NULL,
+    club_id INT NOT NULL,
+    date DATE NOT NULL,
+    from_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    venue_link TEXT NOT NULL,
+    FOREIGN KEY (venue_id) REFERENCES venue_list(venue_id),
+    FOREIGN KEY (club_id) REFERENCES club_list(club_id)
+);
+
+-- V001: booked_venue indexes and unique names
+CREATE INDEX idx_booked_venue_conflict ON booked_venue (venue_id, date, from_time, end_time);
+CREATE INDEX idx_booked_venue_schedule ON booked_venue (date, from_time, booking_id);
+CREATE INDEX idx_booked_venue_club ON booked_venue (club_id, date, from_time);
+CREATE UNIQUE INDEX uq_club_head_details_email ON club_head_details (email);
+CREATE UNIQUE INDEX uq_venue_list_name ON venue_list (venue_name);
+CREATE UNIQUE INDEX uq_club_list_name ON club_list (club_name);
+
+-- V002: append-only log of every change to booked_venue
+CREATE TABLE booking_change_log (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    operation CHAR(1) NOT NULL,
+    booking_id INT NOT NULL,
+    venue_id INT NOT NULL,
+    club_id INT NOT NULL,
+    date DATE NOT NULL,
+    from_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT check_operation CHECK (operation IN ('I', 'U', 'D'))
+);
+
+CREATE TRIGGER trg_booked_venue_insert AFTER INSERT ON booked_venue FOR EACH ROW BEGIN
+    INSERT INTO booking_change_log (operation, booking_id, venue_id, club_id, date, from_time, end_time)
+    VALUES ('I', NEW.booking_id, NEW.venue_id, NEW.club_id, NEW.date, NEW.from_time, NEW.end_time);
+END;
+
+CREATE TRIGGER trg_booked_venue_update AFTER UPDATE ON booked_venue FOR EACH ROW BEGIN
+    INSERT INTO booking_change_log (operation, booking_id, venue_id, club_id, date, from_time, end_time)
+    VALUES ('U', NEW.booking_id, NEW.venue_id, NEW.club_id, NEW.date, NEW.from_time, NEW.end_time);
+END;
+
+CREATE TRIGGER trg_booked_venue_delete AFTER DELETE ON booked_venue FOR EACH ROW BEGIN
+    INSERT INTO booking_change_log (operation, booking_id, venue_id, club_id, date, from_time, end_time)
+    VALUES ('D', OLD.booking_id, OLD.venue_id, OLD.club_id, OLD.date, OLD.from_time, OLD.end_time);
+END;
+
+-- V003: version counters for cached data
+CREATE TABLE data_version (
+    name VARCHAR(32) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO data_version (name, version) VALUES ('reference', 0);
+
+CREATE TRIGGER trg_venue_list_insert AFTER INSERT ON venue_list FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_venue_list_update AFTER UPDATE ON venue_list FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_venue_list_delete AFTER DELETE ON venue_list FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_club_list_insert AFTER INSERT ON club_list FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_club_list_update AFTER UPDATE ON club_list FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_club_list_delete AFTER DELETE ON club_list FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_club_head_insert AFTER INSERT ON club_head FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_club_head_update AFTER UPDATE ON club_head FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+CREATE TRIGGER trg_club_head_delete AFTER DELETE ON club_head FOR EACH ROW BEGIN
+    UPDATE data_version SET version = version + 1 WHERE name = 'reference';
+END;
+
+-- V004: covering index for the availability sweep
+CREATE INDEX idx_booked_venue_availability ON booked_venue (date, venue_id, from_time, end_time);
+
+-- V005: token buckets of the shared rate limiter
+CREATE TABLE rate_limit_bucket (
+    bucket_key CHAR(40) PRIMARY KEY,
+    tokens DOUBLE NOT NULL,
+    updated_at DOUBLE NOT NULL
+);
+
+CREATE INDEX idx_rate_limit_bucket_updated ON rate_limit_bucket (updated_at);
+
+-- V006: archive of past bookings
+CREATE TABLE booked_venue_archive (
+    booking_id INTEGER PRIMARY KEY,
+    venue_id INT NOT NULL,
+    club_id INT NOT NULL,
+    date DATE NOT NULL,
+    from_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    venue_link TEXT NOT NULL,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (venue_id) REFERENCES venue_list(venue_id),
+    FOREIGN KEY (club_id) REFERENCES club_list(club_id)
+);
+
+CREATE INDEX idx_booked_venue_archive_schedule ON booked_venue_archive (date, from_time, booking_id);
+CREATE INDEX idx_booked_venue_archive_venue ON booked_venue_archive (venue_id, date, from_time);
+CREATE INDEX idx_booked_venue_archive_club ON booked_venue_archive (club_id, date, from_time);
+
+-- V007: highest pruned booking change-log id
+INSERT INTO data_version (name, version) VALUES ('booking_change_log', 0);
+
+-- Lets INSERT ... SELECT ... FROM DUAL run unchanged
+CREATE VIEW dual AS SELECT 'X' AS dummy;
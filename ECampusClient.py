@@ -0,0 +1,270 @@
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from Metrics import ECAMPUS_LOGIN_DURATION, ECAMPUS_REJECTIONS
+
+class ECampusUnavailableError(Exception):
+    """
+    Raised when eCampus cannot be reached, is failing, or the client is already at its concurrency limit.
+    """
+
+def loadECampusConfig():
+    """
+    Reads the eCampus client settings from the environment.
+
+    Environment variables:
+        VENUESCOPE_ECAMPUS_URL (default 'https://ecampus.psgtech.ac.in/studzone2/'): The login page.
+        VENUESCOPE_ECAMPUS_CONNECT_TIMEOUT (default 3): Seconds to wait for a TCP/TLS connection.
+        VENUESCOPE_ECAMPUS_READ_TIMEOUT (default 10): Seconds to wait for the server to respond.
+        VENUESCOPE_ECAMPUS_MAX_CONCURRENCY (default 8): Logins in flight at once; also the keep-alive pool size.
+        VENUESCOPE_ECAMPUS_QUEUE_TIMEOUT (default 2): Seconds a login waits for a free slot before failing.
+        VENUESCOPE_ECAMPUS_RETRIES (default 2): Extra attempts for failed requests.
+        VENUESCOPE_ECAMPUS_BACKOFF (default 0.5): Base delay in seconds for exponential backoff.
+        VENUESCOPE_ECAMPUS_BREAKER_THRESHOLD (default 5): Consecutive failures that open the circuit.
+        VENUESCOPE_ECAMPUS_BREAKER_RESET (default 30): Seconds the circuit stays open before a trial request.
+
+    Returns:
+        dict: The keyword arguments passed to ECampusClient().
+    """
+
+    return {
+        'url': os.environ.get('VENUESCOPE_ECAMPUS_URL', 'https://ecampus.psgtech.ac.in/studzone2/'),
+        'connectTimeout': float(os.environ.get('VENUESCOPE_ECAMPUS_CONNECT_TIMEOUT', '3')),
+        'readTimeout': float(os.environ.get('VENUESCOPE_ECAMPUS_READ_TIMEOUT', '10')),
+        'maxConcurrency': int(os.environ.get('VENUESCOPE_ECAMPUS_MAX_CONCURRENCY', '8')),
+        'queueTimeout': float(os.environ.get('VENUESCOPE_ECAMPUS_QUEUE_TIMEOUT', '2')),
+        'retries': int(os.environ.get('VENUESCOPE_ECAMPUS_RETRIES', '2')),
+        'backoff': float(os.environ.get('VENUESCOPE_ECAMPUS_BACKOFF', '0.5')),
+        'breakerThreshold': int(os.environ.get('VENUESCOPE_ECAMPUS_BREAKER_THRESHOLD', '5')),
+        'breakerReset': float(os.environ.get('VENUESCOPE_ECAMPUS_BREAKER_RESET', '30')),
+    }
+
+class CircuitBreaker:
+    """
+    A consecutive-failure circuit breaker.
+
+    After failureThreshold failures in a row the circuit opens and every call is rejected immediately.
+    Once resetTimeout has passed, a single trial call is let through (half-open): success closes the
+    circuit again, failure re-opens it for another resetTimeout.
+    """
+
+    def __init__(self, failureThreshold=5, resetTimeout=30):
+        self.failureThreshold = failureThreshold
+        self.resetTimeout = resetTimeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._openedAt = None
+        self._trialInFlight = False
+
+    @property
+    def state(self):
+        """
+        Returns:
+            str: 'closed', 'open' or 'half-open'.
+        """
+
+        with self._lock:
+            if self._openedAt is None:
+                return 'closed'
+            if time.monotonic() - self._openedAt >= self.resetTimeout:
+                return 'half-open'
+            return 'open'
+
+    def allowRequest(self):
+        """
+        Checks whether a call may go ahead.
+
+        Returns:
+            bool: True if the circuit is closed, or if this call is the half-open trial.
+        """
+
+        with self._lock:
+            if self._openedAt is None:
+                return True
+            if time.monotonic() - self._openedAt >= self.resetTimeout and not self._trialInFlight:
+                self._trialInFlight = True
+                return True
+            return False
+
+    def recordSuccess(self):
+        """
+        Records a successful call, closing the circuit.
+        """
+
+        with self._lock:
+            self._failures = 0
+            self._openedAt = None
+            self._trialInFlight = False
+
+    def cancelRequest(self):
+        """
+        Records that an allowed call was abandoned before it reached the upstream, freeing the half-open trial.
+        """
+
+        with self._lock:
+            self._trialInFlight = False
+
+    def recordFailure(self):
+        """
+        Records a failed call, opening the circuit if the threshold is reached or the half-open trial failed.
+        """
+
+        with self._lock:
+            self._failures += 1
+            if self._trialInFlight or self._failures >= self.failureThreshold:
+                self._openedAt = time.monotonic()
+            self._trialInFlight = False
+
+class ECampusClient:
+    """
+    A client for the PSG Tech eCampus student login form.
+
+    All logins share one keep-alive connection pool, every request has connect and read timeouts, the number
+    of logins in flight is bounded, failed requests are retried with exponential backoff, and a circuit breaker
+    stops calling eCampus while it is failing, so a slow upstream cannot tie up every Flask worker.
+    """
+
+    def __init__(self, url, connectTimeout=3, readTimeout=10, maxConcurrency=8, queueTimeout=2,
+                 retries=2, backoff=0.5, breakerThreshold=5, breakerReset=30):
+        """
+        Initializes the client and its shared connection pool.
+
+        Args:
+            url (str): The eCampus login page.
+            connectTimeout (float): Seconds to wait for a connection.
+            readTimeout (float): Seconds to wait for a response.
+            maxConcurrency (int): Maximum number of logins in flight at once.
+            queueTimeout (float): Seconds to wait for a free slot before giving up.
+            retries (int): Extra attempts for a failed request.
+            backoff (float): Base delay in seconds between attempts, doubled after each attempt.
+            breakerThreshold (int): Consecutive failures that open the circuit.
+            breakerReset (float): Seconds before an open circuit lets a trial request through.
+        """
+
+        self.url = url
+        self.timeout = (connectTimeout, readTimeout)
+        self.queueTimeout = queueTimeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(breakerThreshold, breakerReset)
+        self._slots = threading.BoundedSemaphore(maxConcurrency)
+
+        # One adapter, and therefore one keep-alive pool, shared by the per-login sessions
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=maxConcurrency, max_retries=0)
+
+    def login(self, rollNo, password):
+        """
+        Logs into eCampus with the given credentials.
+
+        Args:
+            rollNo (str): The student's roll number.
+            password (str): The student's password.
+
+        Returns:
+            bool: True if eCampus accepted the credentials, False if it rejected them.
+
+        Raises:
+            ECampusUnavailableError: If the circuit is open, no slot became free in time, or eCampus kept failing.
+        """
+
+        if not self.breaker.allowRequest():
+            ECAMPUS_REJECTIONS.inc(reason='circuit_open')
+            raise ECampusUnavailableError("eCampus is temporarily unavailable")
+
+        if not self._slots.acquire(timeout=self.queueTimeout):
+            self.breaker.cancelRequest()
+            ECAMPUS_REJECTIONS.inc(reason='busy')
+            raise ECampusUnavailableError("Too many eCampus logins in progress")
+
+        started = time.perf_counter()
+        try:
+            result = self._login(rollNo, password)
+        except (requests.RequestException, ECampusUnavailableError) as e:
+            self.breaker.recordFailure()
+            ECAMPUS_LOGIN_DURATION.observe(time.perf_counter() - started, outcome='failed')
+            raise ECampusUnavailableError(f"eCampus login failed: {e}") from e
+        finally:
+            self._slots.release()
+
+        self.breaker.recordSuccess()
+        ECAMPUS_LOGIN_DURATION.observe(time.perf_counter() - started, outcome='accepted' if result else 'rejected')
+        return result
+
+    def _login(self, rollNo, password):
+        # A session per login keeps the ASP.NET cookies of concurrent logins apart; the mounted adapter is
+        # shared, so the session is not closed (closing it would close the shared pool).
+        session = requests.Session()
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+
+        # Get the login page to retrieve the hidden ASP.NET form fields
+        response = self._request(session, 'GET', self.url, retryOn=requests.RequestException)
+
+        soup = BeautifulSoup(response.text, 'html.parser')
+        fields = {}
+        for name in ('__VIEWSTATE', '__VIEWSTATEGENERATOR', '__EVENTVALIDATION'):
+            field = soup.find('input', {'name': name})
+            if field is None:
+                raise ECampusUnavailableError(f"Login form is missing {name}")
+            fields[name] = field.get('value')
+
+        loginData = dict(fields, txtusercheck=rollNo, txtpwdcheck=password, abcd3='Login')
+
+        # The login form is only re-posted when the connection could not even be opened
+        loginResponse = self._request(session, 'POST', self.url, data=loginData,
+                                      retryOn=requests.exceptions.ConnectTimeout)
+
+        # The login page is served again when the credentials are rejected
+        return "Student Login" not in loginResponse.text
+
+    def _request(self, session, method, url, retryOn, **kwargs):
+        """
+        Sends a request with timeouts, retrying with exponential backoff and jitter.
+
+        Args:
+            session (requests.Session): The session of the current login.
+            method (str): The HTTP method.
+            url (str): The request URL.
+            retryOn (type or tuple): The exceptions that may be retried.
+
+        Returns:
+            requests.Response: The successful response.
+
+        Raises:
+            requests.RequestException: If the last attempt failed.
+        """
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = session.request(method, url, timeout=self.timeout, **kwargs)
+                if response.status_code >= 500:
+                    raise requests.HTTPError(f"eCampus returned {response.status_code}", response=response)
+                if response.status_code != 200:
+                    raise ECampusUnavailableError(f"eCampus returned {response.status_code}")
+                return response
+            except retryOn:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+
+_client = None
+_clientLock = threading.Lock()
+
+def getECampusClient():
+    """
+    Returns the process-wide eCampus client, creating it from the environment on first use.
+
+    Returns:
+        ECampusClient: The shared client.
+    """
+
+    global _client
+    if _client is None:
+        with _clientLock:
+            if _client is None:
+                _client = ECampusClient(**loadECampusConfig())
+    return _client
@@ -0,0 +1,389 @@
+import bisect
+import threading
+import time
+from contextlib import ContextDecorator
+
+# The content type of the Prometheus text exposition format served by /metrics
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def escapeLabelValue(value):
+    """
+    Escapes a label value for the Prometheus text format.
+
+    Args:
+        value: The label value; converted to a string.
+
+    Returns:
+        str: The value with backslashes, double quotes and newlines escaped.
+    """
+
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def formatLabels(labels):
+    """
+    Formats label pairs as a Prometheus label set, e.g. '{route="/",method="GET"}'.
+
+    Args:
+        labels (Iterable[tuple]): (name, value) pairs.
+
+    Returns:
+        str: The label set, or an empty string if there are no labels.
+    """
+
+    pairs = [f'{name}="{escapeLabelValue(value)}"' for name, value in labels]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def formatValue(value):
+    """
+    Formats a sample value for the Prometheus text format.
+
+    Args:
+        value (float or int): The value.
+
+    Returns:
+        str: The value, with infinities written as '+Inf' and '-Inf'.
+    """
+
+    if value == float('inf'):
+        return '+Inf'
+    if value == float('-inf'):
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+class Metric:
+    """
+    A named metric with a fixed set of label names, holding one series per combination of label values.
+    """
+
+    kind = None
+
+    def __init__(self, name, help, labelNames=()):
+        """
+        Initializes a metric with no series.
+
+        Args:
+            name (str): The metric name, e.g. 'venuescope_http_request_duration_seconds'.
+            help (str): A one-line description.
+            labelNames (tuple[str]): The label names every observation must provide.
+        """
+
+        self.name = name
+        self.help = help
+        self.labelNames = tuple(labelNames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelNames):
+            raise ValueError(f"{self.name} expects the labels {self.labelNames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelNames)
+
+    def _labels(self, key, *extra):
+        return formatLabels(list(zip(self.labelNames, key)) + list(extra))
+
+    def samples(self):
+        """
+        Lists the current samples of every series.
+
+        Returns:
+            list[tuple[str, str, float]]: (sample name, formatted label set, value) triples.
+        """
+
+        raise NotImplementedError
+
+class Counter(Metric):
+    """
+    A value that only goes up, such as the number of rejected requests.
+    """
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """
+        Adds to the counter of the series with the given labels.
+
+        Args:
+            amount (float): The amount to add.
+            **labels: The label values.
+        """
+
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            series = sorted(self._series.items())
+        return [(self.name, self._labels(key), value) for key, value in series]
+
+class Gauge(Metric):
+    """
+    A value that can go up and down, such as the number of open connections.
+    """
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        """
+        Sets the value of the series with the given labels.
+
+        Args:
+            value (float): The new value.
+            **labels: The label values.
+        """
+
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def samples(self):
+        with self._lock:
+            series = sorted(self._series.items())
+        return [(self.name, self._labels(key), value) for key, value in series]
+
+class Histogram(Metric):
+    """
+    Counts observations, such as request latencies, in cumulative buckets and tracks their sum.
+
+    Observing a value costs one lock acquisition and a binary search over the bucket bounds.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelNames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initializes a histogram with no series.
+
+        Args:
+            name (str): The metric name.
+            help (str): A one-line description.
+            labelNames (tuple[str]): The label names every observation must provide.
+            buckets (tuple[float]): The ascending bucket upper bounds; a '+Inf' bucket is always added.
+        """
+
+        super().__init__(name, help, labelNames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """
+        Records one observation in the series with the given labels.
+
+        Args:
+            value (float): The observed value, e.g. a duration in seconds.
+            **labels: The label values.
+        """
+
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            series['counts'][index] += 1
+            series['sum'] += value
+
+    def time(self, **labels):
+        """
+        Times a block or a function and records its duration in seconds, whether or not it raises.
+
+        Usable as a context manager (with histogram.time(route='/'): ...) or as a decorator (@histogram.time(...)).
+
+        Args:
+            **labels: The label values.
+
+        Returns:
+            Timer: The timer.
+        """
+
+        self._key(labels)
+        return Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            series = sorted((key, list(value['counts']), value['sum']) for key, value in self._series.items())
+
+        samples = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", self._labels(key, ('le', formatValue(bound))), cumulative))
+            samples.append((f"{self.name}_sum", self._labels(key), total))
+            samples.append((f"{self.name}_count", self._labels(key), cumulative))
+        return samples
+
+class Timer(ContextDecorator):
+    """
+    Records the time spent in a with block, or in each call of a decorated function, in a histogram.
+    """
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = None
+
+    def _recreate_cm(self):
+        # A decorated function may run in several threads at once, so every call gets its own timer
+        return Timer(self.histogram, self.labels)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+class MetricsRegistry:
+    """
+    The metrics of the process, rendered together in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def register(self, metric):
+        """
+        Adds a metric to the registry.
+
+        Args:
+            metric (Metric): The metric.
+
+        Returns:
+            Metric: The same metric, so registration can be combined with assignment.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelNames=()):
+        return self.register(Counter(name, help, labelNames))
+
+    def gauge(self, name, help, labelNames=()):
+        return self.register(Gauge(name, help, labelNames))
+
+    def histogram(self, name, help, labelNames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelNames, buckets))
+
+    def addCollector(self, collector):
+        """
+        Adds a function that is called before every render, to update gauges from state kept elsewhere.
+
+        Args:
+            collector (Callable[[], None]): The function, e.g. one that copies connection pool statistics into gauges.
+        """
+
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, ending with a newline.
+        """
+
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {formatValue(value)}")
+        return '\n'.join(lines) + '\n'
+
+# The process-wide registry served by /metrics
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'venuescope_http_request_duration_seconds',
+    'Time to handle an HTTP request, by route template, method and status code.',
+    ('route', 'method', 'status'))
+
+QUERY_DURATION = REGISTRY.histogram(
+    'venuescope_db_query_duration_seconds',
+    'Time spent in a database operation of VenueManagement or UserAuthentication, including the connection checkout.',
+    ('query',))
+
+ECAMPUS_LOGIN_DURATION = REGISTRY.histogram(
+    'venuescope_ecampus_login_duration_seconds',
+    'Time taken by eCampus login attempts, by outcome (accepted, rejected or failed).',
+    ('outcome',))
+
+ECAMPUS_REJECTIONS = REGISTRY.counter(
+    'venuescope_ecampus_rejections_total',
+    'eCampus logins refused without contacting eCampus, by reason (circuit_open or busy).',
+    ('reason',))
+
+BCRYPT_DURATION = REGISTRY.histogram(
+    'venuescope_bcrypt_duration_seconds',
+    'Time taken by bcrypt operations (hashpw or checkpw), including the wait for a hashing worker.',
+    ('operation',))
+
+BCRYPT_REJECTIONS = REGISTRY.counter(
+    'venuescope_bcrypt_rejections_total',
+    'bcrypt operations refused or abandoned, by reason (busy or timeout).',
+    ('reason',))
+
+RATE_LIMIT_REJECTIONS = REGISTRY.counter(
+    'venuescope_rate_limit_rejections_total',
+    'Login and password reset requests refused by the rate limiter, by rule (e.g. login_ip or reset_account).',
+    ('rule',))
+
+BOOKINGS_ARCHIVED = REGISTRY.counter(
+    'venuescope_bookings_archived_total',
+    'Past bookings moved from booked_venue to booked_venue_archive by this process.')
+
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    'venuescope_db_pool_connections',
+    'Connections in the database connection pool, by state (open, idle or checked_out).',
+    ('state',))
+
+DB_POOL_EVENTS = REGISTRY.gauge(
+    'venuescope_db_pool_events',
+    'Cumulative connection pool events since the process started, by event.',
+    ('event',))
+
+def poolCollector(pool):
+    """
+    Builds a collector that copies a connection pool's statistics into the pool gauges.
+
+    Args:
+        pool (ConnectionPool): The pool.
+
+    Returns:
+        Callable[[], None]: The collector, for MetricsRegistry.addCollector.
+    """
+
+    def collect():
+        stats = pool.stats()
+        DB_POOL_CONNECTIONS.set(stats['open'], state='open')
+        DB_POOL_CONNECTIONS.set(stats['idle'], state='idle')
+        DB_POOL_CONNECTIONS.set(stats['checkedOut'], state='checked_out')
+        for event in ('created', 'closed', 'checkouts', 'waits', 'timeouts', 'recycled', 'healthCheckFailures'):
+            DB_POOL_EVENTS.set(stats[event], event=event)
+
+    return collect
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from Metrics import BCRYPT_DURATION, BCRYPT_REJECTIONS
+
+class PasswordHasherBusyError(Exception):
+    """
+    Raised when the password hashing queue is full or a hash did not finish in time.
+    """
+
+def loadPasswordHasherConfig():
+    """
+    Reads the password hashing settings from the environment.
+
+    Environment variables:
+        VENUESCOPE_BCRYPT_ROUNDS (default 12): The bcrypt cost factor for new hashes. Stored hashes with a
+                                               different cost are rehashed on the next successful login.
+        VENUESCOPE_BCRYPT_WORKERS (default: number of CPUs): Threads that run bcrypt.
+        VENUESCOPE_BCRYPT_MAX_QUEUE (default 4 per worker): Hash requests that may wait for a free thread.
+        VENUESCOPE_BCRYPT_TIMEOUT (default 10): Seconds a request waits for its hash before giving up.
+
+    Returns:
+        dict: The keyword arguments passed to PasswordHasher().
+    """
+
+    workers = int(os.environ.get('VENUESCOPE_BCRYPT_WORKERS', str(os.cpu_count() or 1)))
+    return {
+        'rounds': int(os.environ.get('VENUESCOPE_BCRYPT_ROUNDS', '12')),
+        'workers': workers,
+        'maxQueue': int(os.environ.get('VENUESCOPE_BCRYPT_MAX_QUEUE', str(workers * 4))),
+        'timeout': float(os.environ.get('VENUESCOPE_BCRYPT_TIMEOUT', '10')),
+    }
+
+def getRounds(hashedPassword):
+    """
+    Reads the cost factor from a bcrypt hash.
+
+    Args:
+        hashedPassword (str): A hash in the '$2b$<cost>$<salt and digest>' format.
+
+    Returns:
+        int or None: The cost factor, or None if the hash is not in the bcrypt format.
+    """
+
+    parts = hashedPassword.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded thread pool.
+
+    bcrypt releases the GIL, so the pool threads use separate cores while the request thread waits.
+    The number of requests queued for the pool is bounded, so a burst of logins is turned away
+    quickly instead of piling up behind a long queue of hashes.
+    """
+
+    def __init__(self, rounds=12, workers=1, maxQueue=4, timeout=10):
+        """
+        Initializes the hasher and its thread pool.
+
+        Args:
+            rounds (int): The bcrypt cost factor for new hashes.
+            workers (int): Threads that run bcrypt.
+            maxQueue (int): Requests that may wait for a free thread on top of the running ones.
+            timeout (float): Seconds to wait for a hash before giving up.
+        """
+
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + maxQueue)
+        self._statsLock = threading.Lock()
+        self.rejected = 0
+
+    def hash(self, password):
+        """
+        Hashes a password with the configured cost factor.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The bcrypt hash.
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full or the hash timed out.
+        """
+
+        hashed = self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    def verify(self, password, hashedPassword):
+        """
+        Checks a password against a stored bcrypt hash.
+
+        Args:
+            password (str): The plain-text password.
+            hashedPassword (str): The stored hash.
+
+        Returns:
+            bool: True if the password matches.
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full or the check timed out.
+        """
+
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashedPassword.encode('utf-8'))
+
+    def needsRehash(self, hashedPassword):
+        """
+        Checks whether a stored hash was made with a different cost factor than the configured one.
+
+        Args:
+            hashedPassword (str): The stored hash.
+
+        Returns:
+            bool: True if the password should be hashed again.
+        """
+
+        return getRounds(hashedPassword) != self.rounds
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._statsLock:
+                self.rejected += 1
+            BCRYPT_REJECTIONS.inc(reason='busy')
+            raise PasswordHasherBusyError("Too many password checks in progress")
+
+        started = time.perf_counter()
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The hash keeps its slot until it finishes, so the queue bound still holds
+            BCRYPT_REJECTIONS.inc(reason='timeout')
+            raise PasswordHasherBusyError("Password check timed out")
+
+        BCRYPT_DURATION.observe(time.perf_counter() - started, operation=function.__name__)
+        return result
+
+    def shutdown(self):
+        """
+        Stops the thread pool after the queued hashes have finished.
+        """
+
+        self._executor.shutdown(wait=True)
+
+_hasher = None
+_hasherLock = threading.Lock()
+
+def getPasswordHasher():
+    """
+    Returns the process-wide password hasher, creating it from the environment on first use.
+
+    Returns:
+        PasswordHasher: The shared hasher.
+    """
+
+    global _hasher
+    if _hasher is None:
+        with _hasherLock:
+            if _hasher is None:
+                _hasher = PasswordHasher(**loadPasswordHasherConfig())
+    return _hasher
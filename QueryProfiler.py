@@ -0,0 +1,402 @@
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from ConnectionPool import DatabaseError
+
+# Statements that EXPLAIN accepts; anything else (e.g. DO, PRAGMA, BEGIN) is logged without a plan
+EXPLAINABLE = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|REPLACE|WITH)\b', re.IGNORECASE)
+
+# A run of placeholders in parentheses, e.g. the IN list of a recurring booking's conflict check
+PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+
+# Source files whose frames are skipped when looking for the code that issued a statement
+PROFILER_FILES = ('QueryProfiler.py', 'ConnectionPool.py', 'SQLiteStorage.py', 'Storage.py')
+
+def loadQueryProfilerConfig():
+    """
+    Reads the query profiler settings from the environment.
+
+    Environment variables:
+        VENUESCOPE_QUERY_PROFILING (default 1): Set to 0 to disable the profiler.
+        VENUESCOPE_SLOW_QUERY_MS (default 100): Statements taking at least this many milliseconds are logged.
+        VENUESCOPE_SLOW_QUERY_LOG (default 'slow_queries.log'): The log file.
+        VENUESCOPE_SLOW_QUERY_LOG_BYTES (default 10485760): Size at which the log is rotated.
+        VENUESCOPE_SLOW_QUERY_LOG_BACKUPS (default 5): Number of rotated logs kept.
+
+    Returns:
+        dict: The keyword arguments passed to QueryProfiler(), plus 'enabled'.
+    """
+
+    return {
+        'enabled': os.environ.get('VENUESCOPE_QUERY_PROFILING', '1') != '0',
+        'thresholdMs': float(os.environ.get('VENUESCOPE_SLOW_QUERY_MS', '100')),
+        'logPath': os.environ.get('VENUESCOPE_SLOW_QUERY_LOG', 'slow_queries.log'),
+        'maxBytes': int(os.environ.get('VENUESCOPE_SLOW_QUERY_LOG_BYTES', str(10 * 1024 * 1024))),
+        'backups': int(os.environ.get('VENUESCOPE_SLOW_QUERY_LOG_BACKUPS', '5')),
+    }
+
+def normalizeStatement(operation):
+    """
+    Collapses the whitespace of a statement so that the same query always has the same text.
+
+    Args:
+        operation (str): The SQL statement.
+
+    Returns:
+        str: The statement on one line.
+    """
+
+    return ' '.join(operation.split()).rstrip(';').strip()
+
+def fingerprintStatement(statement):
+    """
+    Reduces a normalized statement to a fingerprint shared by every execution of the same query,
+    whatever the length of its placeholder lists.
+
+    Args:
+        statement (str): The statement, as returned by normalizeStatement.
+
+    Returns:
+        str: The statement with every parenthesized placeholder list collapsed to '(%s, ...)'.
+    """
+
+    return PLACEHOLDER_LIST.sub('(%s, ...)', statement)
+
+def describeParams(params):
+    """
+    Describes the shape of a statement's parameters without recording their values,
+    which may include email addresses and password hashes.
+
+    Args:
+        params (tuple or list or dict or None): The parameters.
+
+    Returns:
+        list or dict: The type name of every parameter.
+    """
+
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+def findCaller():
+    """
+    Finds the function outside the database layer that issued the current statement.
+
+    Returns:
+        str or None: The caller as 'Class.method' (or the function name), or None if it cannot be found.
+    """
+
+    frame = sys._getframe(1)
+    while frame is not None:
+        if os.path.basename(frame.f_code.co_filename) not in PROFILER_FILES:
+            return getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+class ProfilingCursor:
+    """
+    Wraps a cursor and times every statement executed on it, including the fetches of its results.
+
+    A statement is complete once the next statement runs on the cursor or the cursor is closed. Its duration
+    is the time spent inside execute and the fetch calls, so time the caller spends between fetches is not counted.
+    """
+
+    def __init__(self, cursor, connection, profiler, backend):
+        self._cursor = cursor
+        self._connection = connection
+        self._profiler = profiler
+        self._backend = backend
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, function, *args):
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            if self._pending is not None:
+                self._pending['seconds'] += time.perf_counter() - started
+
+    def _begin(self, operation, params, batch=None):
+        self._finish()
+        self._pending = {'operation': operation, 'params': params, 'batch': batch, 'seconds': 0.0, 'rows': None}
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        if pending['rows'] is None:
+            # Nothing was fetched, so report the rows the statement changed
+            try:
+                pending['rows'] = self._cursor.rowcount
+            except DatabaseError:
+                pending['rows'] = -1
+        self._profiler.record(pending, self._connection, self._backend)
+
+    def _countRows(self, rows):
+        if self._pending is not None:
+            self._pending['rows'] = (self._pending['rows'] or 0) + rows
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._begin(operation, params)
+        return self._timed(lambda: self._cursor.execute(operation, params, *args, **kwargs))
+
+    def executemany(self, operation, seqParams, *args, **kwargs):
+        seqParams = list(seqParams)
+        self._begin(operation, seqParams[0] if seqParams else None, batch=len(seqParams))
+        return self._timed(lambda: self._cursor.executemany(operation, seqParams, *args, **kwargs))
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        self._countRows(row is not None)
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._timed(self._cursor.fetchmany, size)
+        self._countRows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._countRows(len(rows))
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+class QueryProfiler:
+    """
+    Logs database statements that exceed a duration threshold, with their execution plan, as JSON lines in a
+    rotating log. Statements under the threshold cost two clock reads and a comparison.
+    """
+
+    def __init__(self, thresholdMs=100, logPath='slow_queries.log', maxBytes=10 * 1024 * 1024, backups=5):
+        """
+        Initializes the profiler. The log file is opened when the first slow statement is recorded.
+
+        Args:
+            thresholdMs (float): Statements taking at least this many milliseconds are logged.
+            logPath (str): The log file.
+            maxBytes (int): Size at which the log is rotated.
+            backups (int): Number of rotated logs kept.
+        """
+
+        self.thresholdMs = thresholdMs
+        self.logPath = logPath
+        self.maxBytes = maxBytes
+        self.backups = backups
+        self._logger = None
+        self._loggerLock = threading.Lock()
+
+    def wrap(self, cursor, connection, backend):
+        """
+        Wraps a cursor so the statements executed on it are profiled.
+
+        Args:
+            cursor: The driver cursor.
+            connection: The driver connection the cursor belongs to, used to run EXPLAIN.
+            backend (StorageBackend): The storage backend, which knows how to explain a statement.
+
+        Returns:
+            ProfilingCursor: The wrapped cursor.
+        """
+
+        return ProfilingCursor(cursor, connection, self, backend)
+
+    def record(self, pending, connection, backend):
+        """
+        Logs a completed statement if it was slow.
+
+        Args:
+            pending (dict): The statement, its parameters, batch size, duration in seconds and row count.
+            connection: The connection the statement ran on.
+            backend (StorageBackend): The storage backend.
+        """
+
+        durationMs = pending['seconds'] * 1000
+        if durationMs < self.thresholdMs:
+            return
+
+        statement = normalizeStatement(pending['operation'])
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'backend': backend.name,
+            'caller': findCaller(),
+            'durationMs': round(durationMs, 3),
+            'rows': pending['rows'],
+            'batch': pending['batch'],
+            'params': describeParams(pending['params']),
+            'statement': statement,
+            'fingerprint': fingerprintStatement(statement),
+        }
+
+        if EXPLAINABLE.match(pending['operation']):
+            try:
+                entry['explain'] = backend.explainQuery(connection, pending['operation'], pending['params'])
+            except DatabaseError as e:
+                entry['explainError'] = str(e)
+
+        self._getLogger().info(json.dumps(entry, default=str))
+
+    def _getLogger(self):
+        if self._logger is None:
+            with self._loggerLock:
+                if self._logger is None:
+                    logger = logging.getLogger(f"venuescope.slowqueries.{id(self)}")
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    handler = RotatingFileHandler(self.logPath, maxBytes=self.maxBytes, backupCount=self.backups)
+                    handler.setFormatter(logging.Formatter('%(message)s'))
+                    logger.addHandler(handler)
+                    self._logger = logger
+        return self._logger
+
+_profiler = None
+_profilerLock = threading.Lock()
+
+def getQueryProfiler():
+    """
+    Returns the process-wide query profiler, creating it from the environment on first use.
+
+    Returns:
+        QueryProfiler or None: The shared profiler, or None if profiling is disabled.
+    """
+
+    global _profiler
+    if _profiler is None:
+        with _profilerLock:
+            if _profiler is None:
+                config = loadQueryProfilerConfig()
+                if not config.pop('enabled'):
+                    return None
+                _profiler = QueryProfiler(**config)
+    return _profiler
+
+def readLog(logPath, backups):
+    """
+    Reads the entries of a slow-query log and its rotated copies, oldest first.
+
+    Args:
+        logPath (str): The current log file.
+        backups (int): The number of rotated copies to look for (logPath.1 ... logPath.N).
+
+    Returns:
+        list[dict]: The log entries. Lines that are not valid JSON are skipped.
+    """
+
+    entries = []
+    for path in [f"{logPath}.{index}" for index in range(backups, 0, -1)] + [logPath]:
+        if not os.path.exists(path):
+            continue
+        with open(path) as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+def summarize(entries):
+    """
+    Groups slow-query log entries by statement fingerprint.
+
+    Args:
+        entries (list[dict]): The log entries, oldest first.
+
+    Returns:
+        list[dict]: One summary per fingerprint, with the count, total, mean, p95 and max duration in milliseconds,
+                    the mean row count, the callers, and the latest entry (including its plan).
+    """
+
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry.get('fingerprint') or entry.get('statement'), []).append(entry)
+
+    summaries = []
+    for fingerprint, group in groups.items():
+        durations = [entry['durationMs'] for entry in group]
+        rows = [entry['rows'] for entry in group if isinstance(entry.get('rows'), int) and entry['rows'] >= 0]
+        summaries.append({
+            'fingerprint': fingerprint,
+            'count': len(group),
+            'totalMs': sum(durations),
+            'meanMs': statistics.fmean(durations),
+            'p95Ms': statistics.quantiles(durations, n=20, method='inclusive')[-1] if len(durations) >= 2 else durations[0],
+            'maxMs': max(durations),
+            'meanRows': statistics.fmean(rows) if rows else None,
+            'callers': sorted({entry.get('caller') or '?' for entry in group}),
+            'latest': group[-1],
+        })
+    return summaries
+
+def printSummary(summaries, top, sortKey, showPlans):
+    """
+    Prints the worst statements.
+
+    Args:
+        summaries (list[dict]): As returned by summarize.
+        top (int): The number of statements to print.
+        sortKey (str): The summary field to rank by, e.g. 'totalMs'.
+        showPlans (bool): Also print the latest execution plan of each statement.
+    """
+
+    ranked = sorted(summaries, key=lambda summary: summary[sortKey], reverse=True)[:top]
+    if not ranked:
+        print("No slow queries logged.")
+        return
+
+    print(f"{'count':>6} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'rows':>8}  statement")
+    for summary in ranked:
+        meanRows = f"{summary['meanRows']:.0f}" if summary['meanRows'] is not None else '-'
+        print(f"{summary['count']:>6} {summary['totalMs']:>10.1f} {summary['meanMs']:>9.1f} {summary['p95Ms']:>9.1f} "
+              f"{summary['maxMs']:>9.1f} {meanRows:>8}  {summary['fingerprint'][:120]}")
+        print(f"{'':>56}called from {', '.join(summary['callers'])}")
+        if showPlans:
+            latest = summary['latest']
+            if 'explain' in latest:
+                for row in latest['explain']:
+                    print(f"{'':>56}{json.dumps(row, default=str)}")
+            elif 'explainError' in latest:
+                print(f"{'':>56}EXPLAIN failed: {latest['explainError']}")
+
+if __name__ == '__main__':
+    config = loadQueryProfilerConfig()
+    parser = argparse.ArgumentParser(description="Summarize the worst statements in the slow-query log.")
+    parser.add_argument('--log', default=config['logPath'], help="The slow-query log (rotated copies are read too)")
+    parser.add_argument('--top', type=int, default=10, help="Number of statements to show")
+    parser.add_argument('--sort', choices=('total', 'max', 'p95', 'mean', 'count'), default='total',
+                        help="Rank statements by total, max, p95 or mean duration, or by count")
+    parser.add_argument('--since', help="Only read entries logged at or after this ISO timestamp, e.g. 2024-05-01T09:00")
+    parser.add_argument('--plans', action='store_true', help="Print the latest EXPLAIN output of each statement")
+    args = parser.parse_args()
+
+    entries = readLog(args.log, config['backups'])
+    if args.since:
+        since = datetime.fromisoformat(args.since)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        entries = [entry for entry in entries if datetime.fromisoformat(entry['time']) >= since]
+
+    sortKey = {'total': 'totalMs', 'max': 'maxMs', 'p95': 'p95Ms', 'mean': 'meanMs', 'count': 'count'}[args.sort]
+    print(f"{len(entries)} slow statements in {args.log}")
+    printSummary(summarize(entries), args.top, sortKey, args.plans)
@@ -0,0 +1,314 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from Metrics import QUERY_DURATION, RATE_LIMIT_REJECTIONS
+from Storage import getStorage, DatabaseError
+
+# The bucket stores that can be selected with VENUESCOPE_RATE_LIMIT_BACKEND
+RATE_LIMIT_BACKENDS = ('memory', 'database')
+
+# The rules and their default rates, as '<requests>/<seconds>': a client may make that many requests at once,
+# and earns them back evenly over that many seconds
+DEFAULT_RATES = {
+    'login_ip': '30/60',
+    'login_account': '10/300',
+    'reset_ip': '10/300',
+    'reset_account': '3/900',
+}
+
+# Most buckets the in-memory store keeps; the least recently used are forgotten first
+MAX_MEMORY_BUCKETS = 100000
+
+# Seconds the database store waits for a bucket's lock before letting the request through
+BUCKET_LOCK_TIMEOUT = 2
+
+# Checks between two purges of idle buckets from the database
+PURGE_INTERVAL = 1000
+
+def parseRate(spec):
+    """
+    Parses a rate given as '<requests>/<seconds>', e.g. '10/300'.
+
+    Args:
+        spec (str): The rate, or 'off' to turn the rule off.
+
+    Returns:
+        tuple[float, float] or None: (capacity, seconds to refill the whole bucket), or None if the rule is off.
+
+    Raises:
+        ValueError: If the rate is not in the expected format.
+    """
+
+    if spec.strip().lower() == 'off':
+        return None
+    requests, _, seconds = spec.partition('/')
+    capacity, window = float(requests), float(seconds or 'nan')
+    if not (capacity >= 1 and window > 0):
+        raise ValueError(f"Invalid rate limit: {spec}")
+    return capacity, window
+
+def loadRateLimitConfig():
+    """
+    Reads the rate limiter settings from the environment.
+
+    Environment variables:
+        VENUESCOPE_RATE_LIMIT_BACKEND (default 'memory'): 'memory' to keep the buckets in each process, or
+            'database' to share them between processes and servers through the rate_limit_bucket table.
+        VENUESCOPE_RATE_LIMIT_LOGIN_IP (default '30/60'): Logins per client address.
+        VENUESCOPE_RATE_LIMIT_LOGIN_ACCOUNT (default '10/300'): Logins per roll number or member email.
+        VENUESCOPE_RATE_LIMIT_RESET_IP (default '10/300'): Password reset submissions per client address.
+        VENUESCOPE_RATE_LIMIT_RESET_ACCOUNT (default '3/900'): Password reset submissions per email.
+        Each rate is '<requests>/<seconds>', or 'off'.
+
+    Returns:
+        dict: The backend name and the parsed rate of every rule.
+
+    Raises:
+        ValueError: If the backend name is not one of RATE_LIMIT_BACKENDS or a rate is invalid.
+    """
+
+    backend = os.environ.get('VENUESCOPE_RATE_LIMIT_BACKEND', 'memory').lower()
+    if backend not in RATE_LIMIT_BACKENDS:
+        raise ValueError(f"Unknown rate limit backend: {backend}")
+
+    return {
+        'backend': backend,
+        'rules': {rule: parseRate(os.environ.get(f'VENUESCOPE_RATE_LIMIT_{rule.upper()}', rate))
+                  for rule, rate in DEFAULT_RATES.items()},
+    }
+
+def refill(tokens, updatedAt, now, capacity, window):
+    """
+    Takes one token from a bucket, after adding the tokens earned since it was last used.
+
+    Args:
+        tokens (float): The tokens left at updatedAt.
+        updatedAt (float): When the bucket was last used.
+        now (float): The current time, on the same clock.
+        capacity (float): The most tokens the bucket holds.
+        window (float): Seconds to refill an empty bucket.
+
+    Returns:
+        tuple[float, float]: (tokens left, seconds to wait for a token), where the wait is 0 if a token was taken.
+    """
+
+    rate = capacity / window
+    tokens = min(capacity, tokens + max(0.0, now - updatedAt) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+class MemoryBuckets:
+    """
+    Keeps the token buckets in this process. Every worker process limits its own share of the requests.
+    """
+
+    def __init__(self, maxBuckets=MAX_MEMORY_BUCKETS):
+        self.maxBuckets = maxBuckets
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, capacity, window):
+        """
+        Takes one token from a bucket.
+
+        Args:
+            key (str): The bucket key.
+            capacity (float): The most tokens the bucket holds.
+            window (float): Seconds to refill an empty bucket.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updatedAt = self._buckets.pop(key, (capacity, now))
+            tokens, wait = refill(tokens, updatedAt, now, capacity, window)
+            self._buckets[key] = (tokens, now)
+            # A forgotten bucket starts full again, which only errs towards letting a client through
+            while len(self._buckets) > self.maxBuckets:
+                self._buckets.popitem(last=False)
+        return wait
+
+class DatabaseBuckets:
+    """
+    Keeps the token buckets in the rate_limit_bucket table, so every worker and server draws on the same buckets.
+
+    A bucket is read and written under a named lock on its key, the way bookings are serialised. If the
+    database fails, or the lock cannot be had in time, the request is let through: the limiter must not
+    lock everyone out while the database is struggling.
+    """
+
+    def __init__(self, storage, maxWindow, purgeInterval=PURGE_INTERVAL):
+        """
+        Initializes the store.
+
+        Args:
+            storage (StorageBackend): The database the table is in.
+            maxWindow (float): The longest refill time of any rule; buckets idle for longer are full, and are purged.
+            purgeInterval (int): Checks between two purges.
+        """
+
+        self.storage = storage
+        self.maxWindow = maxWindow
+        self.purgeInterval = purgeInterval
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    @QUERY_DURATION.time(query='take_rate_limit_token')
+    def take(self, key, capacity, window):
+        now = time.time()
+        lockName = f"venuescope.ratelimit.{key}"
+        connection = None
+        cursor = None
+        try:
+            # An exhausted pool or an unreachable database raises here, and lets the request through too
+            connection = self.storage.getConnection()
+            cursor = connection.cursor(dictionary=True)
+            if not self.storage.acquireLocks(cursor, [lockName], BUCKET_LOCK_TIMEOUT):
+                print(f"Timed out waiting for the rate limit bucket {key}")
+                return 0.0
+
+            try:
+                cursor.execute("SELECT tokens, updated_at FROM rate_limit_bucket WHERE bucket_key = %s", (key,))
+                row = cursor.fetchone()
+                if row is None:
+                    tokens, wait = refill(capacity, now, now, capacity, window)
+                    cursor.execute("INSERT INTO rate_limit_bucket (bucket_key, tokens, updated_at) VALUES (%s, %s, %s)",
+                                   (key, tokens, now))
+                else:
+                    tokens, wait = refill(row['tokens'], row['updated_at'], now, capacity, window)
+                    cursor.execute("UPDATE rate_limit_bucket SET tokens = %s, updated_at = %s WHERE bucket_key = %s",
+                                   (tokens, now, key))
+                connection.commit()
+            finally:
+                self.storage.releaseLocks(cursor, [lockName])
+        except DatabaseError as e:
+            print(f"Error checking the rate limit: {e}")
+            return 0.0
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                connection.close()
+
+        with self._lock:
+            self._checks += 1
+            purge = self._checks % self.purgeInterval == 0
+        if purge:
+            self.purge(now)
+        return wait
+
+    @QUERY_DURATION.time(query='purge_rate_limit_buckets')
+    def purge(self, now):
+        """
+        Deletes the buckets that have been idle long enough to be full again, which is the same as having none.
+
+        Args:
+            now (float): The current Unix time.
+        """
+
+        connection = None
+        cursor = None
+        try:
+            connection = self.storage.getConnection()
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM rate_limit_bucket WHERE updated_at < %s", (now - self.maxWindow,))
+            connection.commit()
+        except DatabaseError as e:
+            print(f"Error purging rate limit buckets: {e}")
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                connection.close()
+
+class RateLimiter:
+    """
+    Limits requests per client address and per account with token buckets, one bucket per rule and key.
+
+    Checks are meant to run before any expensive work, such as a bcrypt comparison or an eCampus login,
+    so that a flood of guesses costs the server almost nothing. Keys are hashed before they are stored,
+    so neither store holds addresses or account names.
+    """
+
+    def __init__(self, rules, buckets):
+        """
+        Initializes the limiter.
+
+        Args:
+            rules (dict[str, tuple[float, float] or None]): The (capacity, seconds) rate of each rule, or None if the rule is off.
+            buckets (MemoryBuckets or DatabaseBuckets): Where the buckets are kept.
+        """
+
+        self.rules = rules
+        self.buckets = buckets
+
+    def check(self, rule, key):
+        """
+        Takes a token from the bucket of a rule and key.
+
+        Args:
+            rule (str): The rule, e.g. 'login_ip'.
+            key (str): The client address or account; matched case-insensitively. An empty key is not limited.
+
+        Returns:
+            int: 0 if the request may go ahead, otherwise the whole seconds to wait, for a Retry-After header.
+        """
+
+        rate = self.rules.get(rule)
+        key = (key or '').strip().lower()
+        if rate is None or not key:
+            return 0
+
+        digest = hashlib.sha1(f"{rule}:{key}".encode()).hexdigest()
+        wait = self.buckets.take(digest, *rate)
+        if wait <= 0:
+            return 0
+        RATE_LIMIT_REJECTIONS.inc(rule=rule)
+        return max(1, math.ceil(wait))
+
+    def checkAll(self, checks):
+        """
+        Runs several checks in order and stops at the first rejection, so a rejected request takes no more tokens.
+
+        Args:
+            checks (Iterable[tuple[str, str]]): (rule, key) pairs, as passed to check().
+
+        Returns:
+            int: 0 if every check passed, otherwise the seconds to wait.
+        """
+
+        for rule, key in checks:
+            wait = self.check(rule, key)
+            if wait:
+                return wait
+        return 0
+
+_rateLimiter = None
+_rateLimiterLock = threading.Lock()
+
+def getRateLimiter():
+    """
+    Returns the process-wide rate limiter, creating it from the environment on first use.
+
+    Returns:
+        RateLimiter: The shared limiter.
+    """
+
+    global _rateLimiter
+    if _rateLimiter is None:
+        with _rateLimiterLock:
+            if _rateLimiter is None:
+                config = loadRateLimitConfig()
+                if config['backend'] == 'database':
+                    windows = [rate[1] for rate in config['rules'].values() if rate is not None]
+                    buckets = DatabaseBuckets(getStorage(), max(windows, default=0))
+                else:
+                    buckets = MemoryBuckets()
+                _rateLimiter = RateLimiter(config['rules'], buckets)
+    return _rateLimiter
@@ -0,0 +1,97 @@
+import threading
+import time
+
+class ReferenceDataCache:
+    """
+    An in-process copy of the venue and club lists, with name to id maps in both directions.
+
+    The copy is reloaded when its time to live expires, when refreshed explicitly, or when the reference
+    data version stored in the database (bumped by triggers on venue_list, club_list and club_head) no longer
+    matches the version it was loaded with. The version is checked at most once per check interval.
+    """
+
+    def __init__(self, ttl=3600, versionCheckInterval=5):
+        """
+        Initializes an empty cache.
+
+        Args:
+            ttl (float): Seconds after which the lists are reloaded regardless of the version.
+            versionCheckInterval (float): Minimum number of seconds between two version checks.
+        """
+
+        self.ttl = ttl
+        self.versionCheckInterval = versionCheckInterval
+
+        self.lock = threading.Lock()
+        self.venues = []
+        self.clubs = []
+        self.venueIds = {}
+        self.clubIds = {}
+        self.venueNames = {}
+        self.clubNames = {}
+        self.version = None
+        self._loadedAt = None
+        self._checkedAt = None
+
+    def load(self, venues, clubs, version):
+        """
+        Replaces the cached lists.
+
+        Args:
+            venues (list[dict]): Rows with venue_id and venue_name.
+            clubs (list[dict]): Rows with club_id and club_name.
+            version (int): The reference data version read together with the lists.
+        """
+
+        self.venueIds = {venue['venue_name']: venue['venue_id'] for venue in venues}
+        self.clubIds = {club['club_name']: club['club_id'] for club in clubs}
+        self.venueNames = {venue['venue_id']: venue['venue_name'] for venue in venues}
+        self.clubNames = {club['club_id']: club['club_name'] for club in clubs}
+        self.venues = venues
+        self.clubs = clubs
+        self.version = version
+        self._loadedAt = self._checkedAt = time.monotonic()
+
+    def invalidate(self):
+        """
+        Marks the cached lists as stale so they are reloaded on next use.
+        """
+
+        self._loadedAt = None
+
+    def needsReload(self):
+        """
+        Checks whether the lists have never been loaded, were invalidated, or have outlived their time to live.
+
+        Returns:
+            bool: True if the lists must be reloaded.
+        """
+
+        return self._loadedAt is None or time.monotonic() - self._loadedAt > self.ttl
+
+    def needsVersionCheck(self):
+        """
+        Checks whether the check interval has elapsed since the version was last compared.
+
+        Returns:
+            bool: True if the stored version should be read again.
+        """
+
+        return time.monotonic() - self._checkedAt >= self.versionCheckInterval
+
+    def confirmVersion(self, version):
+        """
+        Records the result of a version check.
+
+        Args:
+            version (int): The version currently stored in the database.
+
+        Returns:
+            bool: True if the cached lists are still current, False if they were invalidated.
+        """
+
+        self._checkedAt = time.monotonic()
+        if version != self.version:
+            self.invalidate()
+            return False
+        return True
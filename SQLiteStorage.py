@@ -0,0 +1,272 @@
+import calendar
+import itertools
+import os
+import re
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from ConnectionPool import ConnectionPool
+from Storage import StorageBackend
+
+# The schema the SQLite backend creates on first use. It mirrors create_table.sql and every migration.
+SQLITE_SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DB_Init', 'sqlite_schema.sql')
+
+# MySQL DATE_FORMAT specifiers and their strftime equivalents
+DATE_FORMAT_SPECIFIERS = {
+    'Y': '%Y', 'y': '%y', 'm': '%m', 'd': '%d', 'M': '%B', 'b': '%b', 'W': '%A', 'a': '%a',
+    'H': '%H', 'h': '%I', 'I': '%I', 'i': '%M', 's': '%S', 'S': '%S', 'p': '%p',
+    'r': '%I:%M:%S %p', 'T': '%H:%M:%S', '%': '%%',
+}
+
+_memoryDatabases = itertools.count(1)
+
+def formatTimeValue(value):
+    """
+    Formats a timedelta the way MySQL returns a TIME value as text, e.g. '14:30:00'.
+
+    Args:
+        value (datetime.timedelta): The time of day.
+
+    Returns:
+        str: The time in 'HH:MM:SS' format.
+    """
+
+    seconds = int(value.total_seconds())
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def parseTimeValue(value):
+    """
+    Parses a stored 'HH:MM[:SS]' time, returning it as a timedelta like mysql-connector does for TIME columns.
+
+    Args:
+        value (bytes or str): The stored time.
+
+    Returns:
+        datetime.timedelta: The time since midnight.
+    """
+
+    if isinstance(value, bytes):
+        value = value.decode()
+    parts = [int(part) for part in value.split(':')]
+    while len(parts) < 3:
+        parts.append(0)
+    return timedelta(hours=parts[0], minutes=parts[1], seconds=parts[2])
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(time, time.isoformat)
+sqlite3.register_adapter(timedelta, formatTimeValue)
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter('TIME', parseTimeValue)
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+def _curdate():
+    return date.today().isoformat()
+
+def _unixTimestamp(value=None):
+    if value is None:
+        return None
+    # CURRENT_TIMESTAMP stores UTC, so the text is read back as UTC
+    return calendar.timegm(datetime.fromisoformat(value).timetuple())
+
+def _timeToSec(value):
+    if value is None:
+        return None
+    return int(parseTimeValue(value).total_seconds())
+
+def _dateFormat(value, pattern):
+    if value is None or pattern is None:
+        return None
+    if len(value) >= 10 and value[4] == '-':
+        moment = datetime.fromisoformat(value)
+    else:
+        moment = datetime.min + parseTimeValue(value)
+    return moment.strftime(re.sub(r'%(.)', lambda match: DATE_FORMAT_SPECIFIERS.get(match.group(1), match.group(1)),
+                                  pattern))
+
+class SQLiteCursor:
+    """
+    A cursor that accepts the SQL the services write for mysql-connector: %s placeholders,
+    and dictionary rows when created with dictionary=True.
+    """
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        if dictionary:
+            cursor.row_factory = lambda rawCursor, row: {column[0]: value for column, value in
+                                                         zip(rawCursor.description, row)}
+
+    def execute(self, operation, params=None):
+        if params is None:
+            self._cursor.execute(operation)
+        else:
+            self._cursor.execute(operation.replace('%s', '?'), tuple(params))
+        return self
+
+    def executemany(self, operation, seqParams):
+        self._cursor.executemany(operation.replace('%s', '?'), [tuple(params) for params in seqParams])
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """
+    Wraps a sqlite3 connection in the subset of the mysql-connector connection interface that the
+    services and the connection pool use.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._connection.cursor(), dictionary)
+
+    def start_transaction(self, consistent_snapshot=False, readonly=False, **kwargs):
+        # A deferred transaction reads from one snapshot of the database until it ends
+        self._connection.execute("BEGIN")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    @property
+    def unread_result(self):
+        return False
+
+    def consume_results(self):
+        pass
+
+    def ping(self, reconnect=False, **kwargs):
+        self._connection.execute("SELECT 1").fetchone()
+
+    def executescript(self, script):
+        self._connection.executescript(script)
+
+    def close(self):
+        self._connection.close()
+
+class SQLiteStorage(StorageBackend):
+    """
+    Stores the data in an embedded SQLite database, in a file or in memory, so VenueScope can run
+    without a database server.
+
+    SQLite allows one writer at a time, so a booking takes the database write lock (BEGIN IMMEDIATE)
+    instead of a lock per venue and date. File databases use write-ahead logging, so readers are never
+    blocked by the writer. An in-memory database is served by a single pooled connection.
+    """
+
+    name = 'sqlite'
+    explainPrefix = 'EXPLAIN QUERY PLAN'
+
+    def __init__(self, path, busyTimeout=5, poolConfig=None):
+        """
+        Opens the database and creates the schema if the database is new.
+
+        Args:
+            path (str): The database file, or ':memory:' for an in-memory database.
+            busyTimeout (float): Seconds a connection waits for another writer before failing.
+            poolConfig (dict, optional): Keyword arguments for ConnectionPool(), as returned by loadPoolConfig.
+        """
+
+        poolConfig = dict(poolConfig or {})
+        self.path = path
+        self.busyTimeout = busyTimeout
+        self.inMemory = path == ':memory:'
+        self._anchor = None
+
+        if self.inMemory:
+            # A named shared-cache database outlives pooled connections that are recycled, as long as the anchor is open
+            self.database = f"file:venuescope-{os.getpid()}-{next(_memoryDatabases)}?mode=memory&cache=shared"
+            poolConfig.update(size=1, maxOverflow=0)
+            self._anchor = self._connect()
+        else:
+            self.database = path
+
+        super().__init__(ConnectionPool(self._connect, **poolConfig))
+        self.initializeSchema()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.database, timeout=self.busyTimeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                                     check_same_thread=False, uri=self.inMemory)
+        connection.execute("PRAGMA foreign_keys = ON")
+        if not self.inMemory:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+
+        # The MySQL functions the services' queries use
+        connection.create_function('CURDATE', 0, _curdate)
+        connection.create_function('UNIX_TIMESTAMP', 1, _unixTimestamp, deterministic=True)
+        connection.create_function('TIME_TO_SEC', 1, _timeToSec, deterministic=True)
+        connection.create_function('DATE_FORMAT', 2, _dateFormat, deterministic=True)
+        return SQLiteConnection(connection)
+
+    def initializeSchema(self):
+        """
+        Creates the tables, indexes and triggers from sqlite_schema.sql if the database has no tables yet.
+        """
+
+        connection = self.getConnection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'booked_venue'")
+            exists = cursor.fetchone() is not None
+            cursor.close()
+
+            if not exists:
+                with open(SQLITE_SCHEMA) as file:
+                    connection.executescript(file.read())
+        finally:
+            connection.close()
+
+    def acquireLocks(self, cursor, names, timeout):
+        # The write lock covers every venue and date at once, so it is taken once whatever the names
+        cursor.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            if e.sqlite_errorcode != sqlite3.SQLITE_BUSY:
+                raise
+            return False
+        finally:
+            cursor.execute(f"PRAGMA busy_timeout = {int(self.busyTimeout * 1000)}")
+        return True
+
+    def releaseLocks(self, cursor, names):
+        # The write lock is released by the commit or rollback that ends the transaction
+        pass
+
+    def close(self):
+        super().close()
+        if self._anchor is not None:
+            self._anchor.close()
+            self._anchor = None
@@ -0,0 +1,196 @@
+import os
+import threading
+import mysql.connector
+from ConnectionPool import ConnectionPool, DatabaseError, loadDBConfig, loadPoolConfig
+from QueryProfiler import getQueryProfiler
+
+# The storage backends that can be selected with VENUESCOPE_DB_BACKEND
+STORAGE_BACKENDS = ('mysql', 'sqlite')
+
+def loadStorageConfig():
+    """
+    Reads the storage backend settings from the environment.
+
+    Environment variables:
+        VENUESCOPE_DB_BACKEND (default 'mysql'): 'mysql' for a MySQL server, or 'sqlite' for an embedded SQLite database.
+        VENUESCOPE_SQLITE_PATH (default 'VenueScope.sqlite3'): The SQLite database file, or ':memory:' for a
+            private in-memory database that lives as long as the process.
+        VENUESCOPE_SQLITE_BUSY_TIMEOUT (default 5): Seconds a SQLite connection waits for another writer.
+
+    Returns:
+        dict: The backend name, the SQLite path and the SQLite busy timeout.
+
+    Raises:
+        ValueError: If the backend name is not one of STORAGE_BACKENDS.
+    """
+
+    backend = os.environ.get('VENUESCOPE_DB_BACKEND', 'mysql').lower()
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    return {
+        'backend': backend,
+        'sqlitePath': os.environ.get('VENUESCOPE_SQLITE_PATH', 'VenueScope.sqlite3'),
+        'busyTimeout': float(os.environ.get('VENUESCOPE_SQLITE_BUSY_TIMEOUT', '5')),
+    }
+
+class StorageBackend:
+    """
+    The database a VenueScope process stores its data in.
+
+    A backend owns the connection pool and covers what differs between database engines beyond the
+    connection itself: how concurrent bookings of the same venue and date are serialised, and how a
+    statement's execution plan is shown. Connections
+    handed out by every backend accept the same SQL, with %s placeholders, and return the same Python types.
+    Unless profiling is disabled, every cursor is wrapped by the query profiler, which logs slow statements.
+    """
+
+    name = None
+
+    # The statement prefix that shows a query's execution plan
+    explainPrefix = 'EXPLAIN'
+
+    def __init__(self, pool):
+        """
+        Initializes the backend with its connection pool.
+
+        Args:
+            pool (ConnectionPool): The pool connections are checked out of.
+        """
+
+        self.pool = pool
+        self.profiler = getQueryProfiler()
+        if self.profiler is not None:
+            pool.cursorHook = lambda cursor, connection: self.profiler.wrap(cursor, connection, self)
+
+    def getConnection(self):
+        """
+        Checks a connection out of the backend's pool.
+
+        Returns:
+            PooledConnection: A proxy whose close() returns the connection to the pool.
+        """
+
+        return self.pool.getConnection()
+
+    def acquireLocks(self, cursor, names, timeout):
+        """
+        Takes the booking locks with the given names on the cursor's connection, in the order given.
+
+        Args:
+            cursor: A cursor of a connection checked out of this backend.
+            names (list[str]): The lock names, e.g. one per venue and date.
+            timeout (float): Seconds to wait for each lock.
+
+        Returns:
+            bool: True if every lock was taken, False if waiting for one timed out.
+        """
+
+        raise NotImplementedError
+
+    def releaseLocks(self, cursor, names):
+        """
+        Releases booking locks taken with acquireLocks.
+
+        Args:
+            cursor: The cursor the locks were taken on.
+            names (list[str]): The lock names.
+        """
+
+        raise NotImplementedError
+
+    def explainQuery(self, connection, operation, params=None):
+        """
+        Shows the execution plan of a statement without running it.
+
+        Args:
+            connection: A driver connection of this backend.
+            operation (str): The statement, with %s placeholders.
+            params (tuple, optional): The statement's parameters.
+
+        Returns:
+            list[dict]: The plan rows.
+        """
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(f"{self.explainPrefix} {operation}", params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def beforeFork(self):
+        """
+        Closes the idle connections before the process forks worker processes, so no worker inherits them.
+        """
+
+        self.pool.closeAll()
+
+    def afterFork(self):
+        """
+        Gives a forked worker process its own, empty connection pool. The pool object is kept, so everything
+        holding a reference to it, such as the services and the metrics collector, uses the new connections.
+        """
+
+        self.pool.reset()
+
+    def close(self):
+        """
+        Closes every idle connection of the backend.
+        """
+
+        self.pool.closeAll()
+
+class MySQLStorage(StorageBackend):
+    """
+    Stores the data on a MySQL server. Booking locks are MySQL named locks (GET_LOCK), which only block
+    bookings of the same venue and date.
+    """
+
+    name = 'mysql'
+
+    def __init__(self, dbConfig, poolConfig):
+        """
+        Initializes the backend with a pool of MySQL connections.
+
+        Args:
+            dbConfig (dict): Keyword arguments for mysql.connector.connect(), as returned by loadDBConfig.
+            poolConfig (dict): Keyword arguments for ConnectionPool(), as returned by loadPoolConfig.
+        """
+
+        super().__init__(ConnectionPool(lambda: mysql.connector.connect(**dbConfig), **poolConfig))
+
+    def acquireLocks(self, cursor, names, timeout):
+        for name in names:
+            cursor.execute("SELECT GET_LOCK(%s, %s) AS acquired", (name, timeout))
+            row = cursor.fetchone()
+            if not (row['acquired'] if isinstance(row, dict) else row[0]):
+                return False
+        return True
+
+    def releaseLocks(self, cursor, names):
+        if names:
+            cursor.execute(f"DO {', '.join(['RELEASE_LOCK(%s)'] * len(names))}", tuple(names))
+
+_storage = None
+_storageLock = threading.Lock()
+
+def getStorage():
+    """
+    Returns the process-wide storage backend, creating it from the environment on first use.
+
+    Returns:
+        StorageBackend: The shared backend.
+    """
+
+    global _storage
+    if _storage is None:
+        with _storageLock:
+            if _storage is None:
+                config = loadStorageConfig()
+                if config['backend'] == 'sqlite':
+                    from SQLiteStorage import SQLiteStorage
+                    _storage = SQLiteStorage(config['sqlitePath'], config['busyTimeout'], loadPoolConfig())
+                else:
+                    _storage = MySQLStorage(loadDBConfig(), loadPoolConfig())
+    return _storage
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    A small thread-safe cache with a per-entry time to live and least-recently-used eviction.
+    """
+
+    def __init__(self, maxSize=128, ttl=300):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxSize (int): The maximum number of entries. The least recently used entry is evicted beyond this.
+            ttl (float): Seconds an entry stays valid after it was stored.
+        """
+
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Looks up an entry, refreshing its position in the LRU order.
+
+        Args:
+            key: The cache key.
+            default: The value returned when the key is missing or expired.
+
+        Returns:
+            The cached value, or default.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """
+        Stores an entry, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+        """
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key):
+        """
+        Removes an entry if it exists.
+
+        Args:
+            key: The cache key.
+        """
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
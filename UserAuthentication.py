@@ -1,8 +1,8 @@
 import re
-import bcrypt
-import mysql.connector
-import requests
-from bs4 import BeautifulSoup
+from Storage import getStorage, DatabaseError
+from ECampusClient import getECampusClient
+from PasswordHasher import getPasswordHasher, PasswordHasherBusyError
+from Metrics import QUERY_DURATION
 
 class UserAuthentication:
     """
@@ -11,23 +11,21 @@ class UserAuthentication:
 
     def __init__(self):
         """
-        Initializes the UserAuthentication object with connection details to the MySQL database.
+        Initializes the UserAuthentication object with the shared database connection pool, eCampus client
+        and password hasher.
         """
 
-        database = 'VenueScope'
-        self.db_config = {
-            'user': 'root',
-            'password': 'root',
-            'host': 'localhost',
-            'database': database,
-        }
+        self.pool = getStorage().pool
+        self.ecampus = getECampusClient()
+        self.hasher = getPasswordHasher()
 
     def authenticateMember(self, email, password):
         """
         Authenticates a club member by verifying their email and password.
         
         Checks if the provided password meets strong password criteria and then verifies it
-        against the stored hashed password in the database.
+        against the stored hashed password in the database. A stored hash made with a different bcrypt
+        cost than the configured one is replaced after a successful login.
 
         Args:
             email (str): The email of the member attempting to authenticate.
@@ -35,6 +33,9 @@ class UserAuthentication:
 
         Returns:
             bool: True if authentication is successful, False otherwise.
+
+        Raises:
+            PasswordHasherBusyError: If too many password checks are already in progress.
         """
 
         # First, check if the password meets the validation policy
@@ -51,8 +52,10 @@ class UserAuthentication:
             return False
 
         # Compare the user-entered password with the stored hashed password
-        if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
+        if self.hasher.verify(password, stored_password):
             print("Authentication successful.")
+            if self.hasher.needsRehash(stored_password):
+                self.rehashPassword(email, password)
             return True
         else:
             print("Authentication failed. Incorrect password.")
@@ -89,9 +92,10 @@ class UserAuthentication:
         else:
             return False
 
+    @QUERY_DURATION.time(query='getPasswordFromDB')
     def getPasswordFromDB(self, email):
         """
-        Retrieves the stored hashed password for a given member's email from the MySQL database.
+        Retrieves the stored hashed password for a given member's email from the database.
 
         Args:
             email (str): The email of the user whose password needs to be retrieved.
@@ -101,8 +105,13 @@ class UserAuthentication:
         """
 
         try:
-            # Connect to the MySQL database
-            conn = mysql.connector.connect(**self.db_config)
+            # Borrow a connection from the shared pool
+            conn = self.pool.getConnection()
+        except DatabaseError as err:
+            print(f"Error: {err}")
+            return None
+
+        try:
             cursor = conn.cursor()
 
             # Query to fetch the hashed password for the given email
@@ -112,10 +121,7 @@ class UserAuthentication:
 
             # Fetch the result
             result = cursor.fetchone()
-
-            # Close the cursor and connection
             cursor.close()
-            conn.close()
 
             # Return the hashed password if the user exists, otherwise return None
             if result:
@@ -123,15 +129,18 @@ class UserAuthentication:
             else:
                 return None
 
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             print(f"Error: {err}")
             return None
+        finally:
+            # Return the connection to the pool
+            conn.close()
     
     def authenticateStudent(self, roll_no, password):
         """
         Authenticates a student by logging into the PSG Tech eCampus platform using the provided roll number and password.
 
-        The method attempts to log in using the provided credentials by submitting them to the eCampus login form.
+        The login goes through the shared eCampus client, which bounds the time and concurrency spent on eCampus.
         
         Args:
             roll_no (str): The student's roll number.
@@ -139,43 +148,12 @@ class UserAuthentication:
 
         Returns:
             bool: True if login is successful, False otherwise.
-        """
-
-        # URL of the login page
-        url = 'https://ecampus.psgtech.ac.in/studzone2/'
 
-        # Create a session to manage cookies
-        session = requests.Session()
-
-        # Get the login page to retrieve necessary hidden fields
-        response = session.get(url)
-        
-        # Check if the page was retrieved successfully
-        if response.status_code != 200:
-            print("Failed to load the login page.")
-            return False
+        Raises:
+            ECampusUnavailableError: If eCampus is unreachable, failing, or overloaded.
+        """
 
-        # Parse the required hidden fields (__VIEWSTATE, __VIEWSTATEGENERATOR, __EVENTVALIDATION)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        viewstate = soup.find('input', {'name': '__VIEWSTATE'}).get('value')
-        viewstategen = soup.find('input', {'name': '__VIEWSTATEGENERATOR'}).get('value')
-        eventval = soup.find('input', {'name': '__EVENTVALIDATION'}).get('value')
-
-        # Data for login
-        login_data = {
-            '__VIEWSTATE': viewstate,
-            '__VIEWSTATEGENERATOR': viewstategen,
-            '__EVENTVALIDATION': eventval,
-            'txtusercheck': roll_no,
-            'txtpwdcheck': password,
-            'abcd3': 'Login',
-        }
-
-        # Post the login data to the server
-        login_response = session.post(url, data=login_data)
-
-        # Check if login was successful by inspecting the response
-        if "Student Login" not in login_response.text:
+        if self.ecampus.login(roll_no, password):
             print("Login successful!")
             return True
         else:
@@ -184,19 +162,40 @@ class UserAuthentication:
     
     def hashPassword(self, password):
         """
-        Hashes the provided password using bcrypt.
+        Hashes the provided password using bcrypt with the configured cost factor.
 
         Args:
             password (str): The plain-text password to hash.
 
         Returns:
             str: The hashed password.
+
+        Raises:
+            PasswordHasherBusyError: If too many password checks are already in progress.
         """
         
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed_password.decode('utf-8')
+        return self.hasher.hash(password)
 
+    def rehashPassword(self, email, password):
+        """
+        Replaces a member's stored hash with one made at the configured cost factor.
+
+        The login has already succeeded, so a busy hasher only postpones the rehash to the next login.
+
+        Args:
+            email (str): The email of the member.
+            password (str): The verified plain-text password.
+        """
+
+        try:
+            hashed_password = self.hasher.hash(password)
+        except PasswordHasherBusyError as e:
+            print(f"Rehash skipped: {e}")
+            return
+
+        self.updatePasswordInDB(email.lower(), hashed_password)
+
+    @QUERY_DURATION.time(query='updatePasswordInDB')
     def updatePasswordInDB(self, email, hashed_password):
         """
         Updates the password for the specified email in the database.
@@ -206,8 +205,13 @@ class UserAuthentication:
             hashed_password (str): The new hashed password to store.
         """
         try:
-            # Connect to the MySQL database
-            conn = mysql.connector.connect(**self.db_config)
+            # Borrow a connection from the shared pool
+            conn = self.pool.getConnection()
+        except DatabaseError as err:
+            print(f"Error: {err}")
+            return
+
+        try:
             cursor = conn.cursor()
 
             # Update the password for the given email
@@ -216,12 +220,12 @@ class UserAuthentication:
             
             # Commit the changes
             conn.commit()
-
-            # Close the cursor and connection
             cursor.close()
-            conn.close()
 
             print(f"Password updated successfully for {email}.")
 
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             print(f"Error: {err}")
+        finally:
+            # Return the connection to the pool
+            conn.close()
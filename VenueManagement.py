@@ -1,6 +1,163 @@
-import mysql.connector
-from mysql.connector import Error
-from datetime import datetime
+import os
+import threading
+from Storage import getStorage, DatabaseError
+from BookingIndex import BookingIndex, toSeconds
+from TTLCache import TTLCache
+from ReferenceDataCache import ReferenceDataCache
+from Availability import findFreeSlots, formatClock
+from BookingExport import BookingStream, EXPORT_BATCH_SIZE
+from CalendarFeed import FeedVersions
+from Metrics import QUERY_DURATION, BOOKINGS_ARCHIVED
+from datetime import datetime, date as dateType, timedelta
+
+# Seconds to wait for another booking of the same venue and date to finish
+BOOKING_LOCK_TIMEOUT = 5
+
+# Seconds a resolved club identity is reused before it is looked up again
+CLUB_IDENTITY_TTL = int(os.environ.get('VENUESCOPE_CLUB_IDENTITY_TTL', '300'))
+
+# Number of bookings returned per page by fetchBookings
+BOOKINGS_PAGE_SIZE = 50
+
+# Weeks between two occurrences of a recurring booking, by frequency
+RECURRENCE_INTERVALS = {'weekly': 1, 'biweekly': 2}
+
+# The bookable hours searched by findAvailability, in 'HH:MM' format
+AVAILABILITY_DAY_START = os.environ.get('VENUESCOPE_AVAILABILITY_DAY_START', '08:00')
+AVAILABILITY_DAY_END = os.environ.get('VENUESCOPE_AVAILABILITY_DAY_END', '20:00')
+
+# Longest date range, in days, that one availability search may cover
+MAX_AVAILABILITY_DAYS = 62
+
+# Upper bound on the number of occurrences in one recurring booking, a little over a year of weekly bookings
+MAX_SERIES_OCCURRENCES = 60
+
+# Live update event names, by change-log operation
+CHANGE_EVENT_TYPES = {'I': 'insert', 'U': 'update', 'D': 'delete'}
+
+# Change-log ids deleted per transaction by pruneBookingChangeLog
+CHANGE_LOG_PRUNE_BATCH_SIZE = 5000
+
+# Bookings moved to booked_venue_archive per transaction by archiveBookings
+ARCHIVE_BATCH_SIZE = 500
+
+# The lock that keeps two processes from archiving at once; a process that finds it taken skips its run
+ARCHIVE_LOCK = 'venuescope.archive'
+
+def formatTime(value):
+    """
+    Formats a MySQL TIME value the way the dashboards display it, e.g. '02:30:00 PM'.
+
+    Args:
+        value (datetime.timedelta or datetime.time or str): The time of day.
+
+    Returns:
+        str: The time in 'hh:mm:ss AM/PM' format.
+    """
+
+    seconds = toSeconds(value)
+    hours, minutes = seconds // 3600, seconds % 3600 // 60
+    return f"{(hours % 12) or 12:02d}:{minutes:02d}:{seconds % 60:02d} {'AM' if hours < 12 else 'PM'}"
+
+def normalizeTime(value):
+    """
+    Normalizes a time of day to the 'HH:MM:SS' form stored in the database, so times compare correctly as text.
+
+    Args:
+        value (datetime.timedelta or datetime.time or str): The time of day, e.g. '14:30' from a form.
+
+    Returns:
+        str: The time in 'HH:MM:SS' format.
+    """
+
+    seconds = toSeconds(value)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def includesArchive(from_date):
+    """
+    Checks whether bookings from a date onwards may include archived ones. Only days before today are
+    archived, so a range starting today or later is served by booked_venue alone.
+
+    Args:
+        from_date (str or datetime.date or None): The first date of the range, or None for no lower bound.
+
+    Returns:
+        bool: True if booked_venue_archive must be read as well.
+    """
+
+    return from_date is None or str(from_date) < dateType.today().isoformat()
+
+def encodeBookingCursor(booking):
+    """
+    Builds the opaque keyset cursor that points just after the given booking.
+
+    Args:
+        booking (dict): A raw booking row with date, from_time and booking_id.
+
+    Returns:
+        str: The cursor, in '<YYYY-MM-DD>_<seconds since midnight>_<booking id>' format.
+    """
+
+    return f"{booking['date'].isoformat()}_{toSeconds(booking['from_time'])}_{booking['booking_id']}"
+
+def decodeBookingCursor(cursor):
+    """
+    Parses a keyset cursor produced by encodeBookingCursor.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        tuple: The (date, from_time, booking_id) position, with from_time in 'HH:MM:SS' format.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+
+    date, seconds, bookingId = cursor.split('_')
+    seconds = int(seconds)
+    if not 0 <= seconds < 86400:
+        raise ValueError(f"Invalid cursor time: {seconds}")
+    fromTime = f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return dateType.fromisoformat(date), fromTime, int(bookingId)
+
+def expandRecurrence(start_date, end_date, frequency, exceptions=()):
+    """
+    Lists the dates of a recurring booking.
+
+    Args:
+        start_date (str): The first occurrence (in 'YYYY-MM-DD' format). Later occurrences fall on the same weekday.
+        end_date (str): The last date the series may run to, inclusive (in 'YYYY-MM-DD' format).
+        frequency (str): A key of RECURRENCE_INTERVALS, e.g. 'weekly' or 'biweekly'.
+        exceptions (Iterable[str], optional): Dates to skip (in 'YYYY-MM-DD' format).
+
+    Returns:
+        list[datetime.date]: The occurrence dates in ascending order.
+
+    Raises:
+        ValueError: If a date is malformed, the frequency is unknown, the end date precedes the start date,
+                    or the series has no occurrences or more than MAX_SERIES_OCCURRENCES.
+    """
+
+    if frequency not in RECURRENCE_INTERVALS:
+        raise ValueError(f"Unknown frequency: {frequency}")
+
+    start = dateType.fromisoformat(start_date)
+    end = dateType.fromisoformat(end_date)
+    if end < start:
+        raise ValueError("The end date is before the start date")
+
+    skipped = {dateType.fromisoformat(exception) for exception in exceptions}
+    step = timedelta(weeks=RECURRENCE_INTERVALS[frequency])
+    count = (end - start) // step + 1
+    if count > MAX_SERIES_OCCURRENCES:
+        raise ValueError(f"A recurring booking may have at most {MAX_SERIES_OCCURRENCES} occurrences")
+
+    dates = [start + step * index for index in range(count)]
+    dates = [occurrence for occurrence in dates if occurrence not in skipped]
+    if not dates:
+        raise ValueError("The recurring booking has no occurrences")
+    return dates
 
 class VenueManagement:
     """
@@ -9,160 +166,965 @@ class VenueManagement:
 
     def __init__(self):
         """
-        Initializes the VenueManagement object with the MySQL database configuration.
+        Initializes the VenueManagement object with the shared storage backend.
 
         Attributes:
-            db_config (dict): A dictionary containing database connection parameters (user, password, host, database).
+            storage (StorageBackend): The process-wide MySQL or SQLite backend, configured from the environment.
+            pool (ConnectionPool): The backend's connection pool.
+            bookingIndex (BookingIndex): In-memory index of current and future bookings, used for conflict checks.
+                Its change-log poll interval is read from VENUESCOPE_BOOKING_INDEX_SYNC_INTERVAL (default 1 second).
+            clubIdentityCache (TTLCache): Club id and name per club head email.
+            referenceData (ReferenceDataCache): Venue and club lists with name/id maps. Reloaded after
+                VENUESCOPE_REFERENCE_DATA_TTL seconds (default 3600), or sooner when the reference data version
+                changes, which is checked at most every VENUESCOPE_REFERENCE_DATA_CHECK_INTERVAL seconds (default 5).
+            bookingChangeListeners (list[Callable]): Functions called when the booking index picks up changes.
+            feedVersions (FeedVersions): The version of every venue and club calendar feed, kept up to date
+                from the booking changes.
         """
 
-        database = 'VenueScope'
-        self.db_config = {
-            'user': 'root',
-            'password': 'root',
-            'host': 'localhost',
-            'database': database,
-        }
+        self.storage = getStorage()
+        self.pool = self.storage.pool
+        self.bookingIndex = BookingIndex(syncInterval=float(os.environ.get('VENUESCOPE_BOOKING_INDEX_SYNC_INTERVAL', '1')))
+        self._indexSyncLock = threading.Lock()
+        self.clubIdentityCache = TTLCache(maxSize=1024, ttl=CLUB_IDENTITY_TTL)
+        self.referenceData = ReferenceDataCache(
+            ttl=float(os.environ.get('VENUESCOPE_REFERENCE_DATA_TTL', '3600')),
+            versionCheckInterval=float(os.environ.get('VENUESCOPE_REFERENCE_DATA_CHECK_INTERVAL', '5')),
+        )
+        self.bookingChangeListeners = []
+        self.feedVersions = FeedVersions()
+        self.addBookingChangeListener(self._updateFeedVersions)
+
+    def addBookingChangeListener(self, listener):
+        """
+        Registers a function to be called whenever the booking index picks up changes, whether they were made
+        by this process or, through the change log, by another worker. Used to drop caches derived from bookings.
+
+        Listeners run on the thread that synced the index, while the index is locked, so they must be quick.
+        Bookings moved to booked_venue_archive are still listed, so the deletes that archived them are left out.
+
+        Args:
+            listener (Callable[[list[dict] or None], None]): Called with the applied change-log rows,
+                or with None when the whole index was reloaded.
+        """
+
+        self.bookingChangeListeners.append(listener)
+
+    def _updateFeedVersions(self, changes):
+        tag = self.bookingIndex.versionTag()
+        if changes is None:
+            self.feedVersions.reset(tag)
+        else:
+            self.feedVersions.bump(changes, tag)
+
+    def _notifyBookingChange(self, changes):
+        for listener in self.bookingChangeListeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"Error in booking change listener: {e}")
 
     def getDBConnection(self):
         """
-        Establishes a connection to the MySQL database using the stored configuration.
+        Checks a connection out of the shared connection pool.
+
+        Calling close() on the returned connection hands it back to the pool.
 
         Returns:
-            mysql.connector.connection_cext.CMySQLConnection or None: 
-            The MySQL connection object if the connection is successful, or None if the connection fails.
+            PooledConnection or None: 
+            The pooled connection if one is available, or None if the connection fails.
         """
 
         try:
-            connection = mysql.connector.connect(
-                host=self.db_config['host'],
-                user=self.db_config['user'],
-                password=self.db_config['password'],
-                database=self.db_config['database']
-            )
-            if connection.is_connected():
-                return connection
-        except Error as e:
-            print(f"Error while connecting to MySQL: {e}")
+            return self.pool.getConnection()
+        except DatabaseError as e:
+            print(f"Error while connecting to the database: {e}")
             return None
 
-    def fetchBookedVenues(self):
+    @QUERY_DURATION.time(query='fetchBookings')
+    def fetchBookings(self, from_date=None, to_date=None, venue_name=None, club_name=None, after=None, limit=BOOKINGS_PAGE_SIZE):
         """
-        Retrieves details of all booked venues from the database, including the venue name and club name.
+        Retrieves one page of bookings in chronological order, restricted to a date window.
+
+        Pages are addressed with a keyset cursor on (date, from_time, booking_id), so every page costs an
+        index range scan of at most limit + 1 rows no matter how much booking history the table holds.
+        A window starting before today also reads the archived bookings, merging the first limit + 1 rows
+        of each table.
+
+        Args:
+            from_date (str, optional): The first date to include (in 'YYYY-MM-DD' format). Defaults to today, i.e. upcoming bookings.
+            to_date (str, optional): The last date to include (in 'YYYY-MM-DD' format). Defaults to no upper bound.
+            venue_name (str, optional): Only include bookings for this venue.
+            club_name (str, optional): Only include bookings made by this club.
+            after (str, optional): The cursor returned as 'next' by the previous page.
+            limit (int, optional): The maximum number of bookings to return.
 
         Returns:
-            list[dict]: A list of dictionaries, where each dictionary contains booking details such as 
-                        date, from_time, end_time, venue link, venue name, and club name.
+            dict: A dictionary with:
+                - 'bookings' (list[dict]): Booking details (booking_id, date, from_time, end_time, venue link,
+                  venue name and club name), with the date as 'DD-MM-YYYY' and the times as displayed, e.g. '02:30:00 PM'.
+                - 'next' (str or None): The cursor for the following page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the after cursor is malformed.
         """
 
+        self.ensureReferenceData()
+
+        conditions = ["bv.date >= COALESCE(%s, CURDATE())"]
+        params = [from_date]
+
+        if to_date:
+            conditions.append("bv.date <= %s")
+            params.append(to_date)
+        if venue_name:
+            conditions.append("bv.venue_id = %s")
+            params.append(self.referenceData.venueIds.get(venue_name))
+        if club_name:
+            conditions.append("bv.club_id = %s")
+            params.append(self.referenceData.clubIds.get(club_name))
+        if after:
+            afterDate, afterTime, afterId = decodeBookingCursor(after)
+            conditions.append("""(bv.date > %s OR (bv.date = %s AND (bv.from_time > %s
+                OR (bv.from_time = %s AND bv.booking_id > %s))))""")
+            params.extend([afterDate, afterDate, afterTime, afterTime, afterId])
+
         connection = self.getDBConnection()
         if connection is None:
-            return []
+            return {'bookings': [], 'next': None}
 
-        cursor = connection.cursor(dictionary=True)  # Use dictionary cursor for dict output
-        query = """
+        cursor = connection.cursor(dictionary=True)
+        query = f"""
             SELECT 
-                DATE_FORMAT(bv.date, '%d-%m-%Y') AS date, 
-                DATE_FORMAT(bv.from_time, '%r') AS from_time, 
-                DATE_FORMAT(bv.end_time, '%r') AS end_time, 
+                bv.booking_id, 
+                bv.date, 
+                bv.from_time, 
+                bv.end_time, 
                 bv.venue_link, 
-                vl.venue_name, 
-                cl.club_name
+                bv.venue_id, 
+                bv.club_id
             FROM 
-                booked_venue bv 
-            JOIN 
-                venue_list vl ON bv.venue_id = vl.venue_id 
-            JOIN 
-                club_list cl ON bv.club_id = cl.club_id;
+                {{table}} bv 
+            WHERE {' AND '.join(conditions)}
+            ORDER BY bv.date, bv.from_time, bv.booking_id
+            LIMIT %s
         """
+        params.append(limit + 1)  # One extra row tells whether another page follows
 
-        cursor.execute(query)
-        bookings = cursor.fetchall()
+        if includesArchive(from_date or dateType.today()):
+            query = f"""
+                SELECT * FROM ({query.format(table='booked_venue_archive')}) archived
+                UNION ALL
+                SELECT * FROM ({query.format(table='booked_venue')}) upcoming
+                ORDER BY date, from_time, booking_id
+                LIMIT %s;
+            """
+            params = params + params + [limit + 1]
+        else:
+            query = query.format(table='booked_venue')
 
-        cursor.close()
-        connection.close()
+        try:
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        except DatabaseError as e:
+            print(f"Error fetching bookings: {e}")
+            rows = []
+        finally:
+            cursor.close()
+            connection.close()
 
-        return bookings
-    
-    def fetchVenues(self):
+        nextCursor = encodeBookingCursor(rows[limit - 1]) if len(rows) > limit else None
+
+        bookings = []
+        for row in rows[:limit]:
+            bookings.append({
+                'booking_id': row['booking_id'],
+                'date': row['date'].strftime('%d-%m-%Y'),
+                'from_time': formatTime(row['from_time']),
+                'end_time': formatTime(row['end_time']),
+                'venue_link': row['venue_link'],
+                'venue_name': self.referenceData.venueNames.get(row['venue_id']),
+                'club_name': self.referenceData.clubNames.get(row['club_id']),
+                'sort_key': encodeBookingCursor(row),
+            })
+
+        return {'bookings': bookings, 'next': nextCursor}
+
+    def exportBookings(self, from_date=None, to_date=None, venue_name=None, club_name=None, batch_size=EXPORT_BATCH_SIZE):
         """
-        Fetches the list of all available venues from the venue_list table.
+        Streams every booking matching the filters in chronological order, for full history exports.
+
+        The rows are read from an unbuffered cursor, so the database sends them as they are consumed and
+        memory use does not grow with the number of bookings. The returned stream holds a pooled connection
+        until it is exhausted or closed, and must always be closed. Unless the range starts today or later,
+        the archived bookings are streamed first; every archived booking is dated before the current ones.
+
+        Args:
+            from_date (str, optional): The first date to include (in 'YYYY-MM-DD' format). Defaults to no lower bound.
+            to_date (str, optional): The last date to include (in 'YYYY-MM-DD' format). Defaults to no upper bound.
+            venue_name (str, optional): Only include bookings for this venue.
+            club_name (str, optional): Only include bookings made by this club.
+            batch_size (int, optional): Rows fetched from the database per round trip.
 
         Returns:
-            list[dict]: A list of dictionaries where each dictionary contains 'venue_name'.
+            BookingStream or None: The bookings (booking_id, date as 'YYYY-MM-DD', from_time and end_time as
+                'HH:MM:SS', venue name, club name and venue link), or None if the query could not be run.
         """
 
+        self.ensureReferenceData()
+
+        conditions = []
+        params = []
+
+        if from_date:
+            conditions.append("bv.date >= %s")
+            params.append(from_date)
+        if to_date:
+            conditions.append("bv.date <= %s")
+            params.append(to_date)
+        if venue_name:
+            conditions.append("bv.venue_id = %s")
+            params.append(self.referenceData.venueIds.get(venue_name))
+        if club_name:
+            conditions.append("bv.club_id = %s")
+            params.append(self.referenceData.clubIds.get(club_name))
+
         connection = self.getDBConnection()
+        if connection is None:
+            return None
+
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        query = f"""
+            SELECT 
+                bv.booking_id, 
+                bv.date, 
+                bv.from_time, 
+                bv.end_time, 
+                bv.venue_link, 
+                bv.venue_id, 
+                bv.club_id
+            FROM 
+                {{table}} bv 
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY bv.date, bv.from_time, bv.booking_id;
+        """
+
+        tables = ['booked_venue_archive', 'booked_venue'] if includesArchive(from_date) else ['booked_venue']
+        following = [(query.format(table=table), tuple(params)) for table in tables[1:]]
+
+        try:
+            with QUERY_DURATION.time(query='exportBookings'):
+                cursor.execute(query.format(table=tables[0]), tuple(params))
+        except DatabaseError as e:
+            print(f"Error exporting bookings: {e}")
+            connection.discard()
+            return None
+
+        referenceData = self.referenceData
+        def formatRow(row):
+            return {
+                'booking_id': row['booking_id'],
+                'date': row['date'].isoformat(),
+                'from_time': normalizeTime(row['from_time']),
+                'end_time': normalizeTime(row['end_time']),
+                'venue_name': referenceData.venueNames.get(row['venue_id']),
+                'club_name': referenceData.clubNames.get(row['club_id']),
+                'venue_link': row['venue_link'],
+            }
+
+        return BookingStream(connection, cursor, formatRow, batch_size, following)
+
+    def resolveFeed(self, kind, name):
+        """
+        Looks up the venue or club a calendar feed is for.
+
+        Args:
+            kind (str): 'venue' or 'club'.
+            name (str): The venue or club name.
+
+        Returns:
+            int or None: The venue or club id, or None if there is no such venue or club.
+        """
+
+        self.ensureReferenceData()
+        ids = self.referenceData.venueIds if kind == 'venue' else self.referenceData.clubIds
+        return ids.get(name)
+
+    def getFeedVersion(self, kind, feed_id):
+        """
+        Returns the version of a venue or club calendar feed, for conditional GET handling and caching.
+
+        The version only changes when a booking of that venue or club is made or deleted, so bookings
+        elsewhere do not make calendar clients download the feed again.
+
+        Args:
+            kind (str): 'venue' or 'club'.
+            feed_id (int): The venue or club id.
+
+        Returns:
+            tuple or None: A (version, lastModified) pair, where lastModified is the Unix time of the last
+                           booking change anywhere, or None if the booking index could not be loaded.
+        """
+
+        if not self.syncBookingIndex():
+            return None
+        version = self.feedVersions.get(kind, feed_id)
+        if version is None:
+            return None
+        return version, self.bookingIndex.lastModified
+
+    @QUERY_DURATION.time(query='fetchCalendarBookings')
+    def fetchCalendarBookings(self, kind, feed_id, from_date):
+        """
+        Retrieves the bookings of one venue or one club from a date onwards, for its calendar feed,
+        including the archived ones.
+
+        Args:
+            kind (str): 'venue' or 'club'.
+            feed_id (int): The venue or club id.
+            from_date (datetime.date): The first date to include.
+
+        Returns:
+            list[dict] or None: Bookings (booking_id, date, from_time, end_time, venue link, venue name and
+                club name) in chronological order, with date and times as returned by the database,
+                or None if they could not be read.
+        """
+
+        self.ensureReferenceData()
+
+        connection = self.getDBConnection()
+        if connection is None:
+            return None
+
+        column = 'venue_id' if kind == 'venue' else 'club_id'
+        tables = ['booked_venue_archive', 'booked_venue'] if includesArchive(from_date) else ['booked_venue']
+        query = ' UNION ALL '.join(f"""
+                SELECT booking_id, date, from_time, end_time, venue_link, venue_id, club_id
+                FROM {table}
+                WHERE {column} = %s AND date >= %s
+            """ for table in tables) + 'ORDER BY date, from_time'
+
         cursor = connection.cursor(dictionary=True)
-        
-        query = "SELECT venue_name FROM venue_list"
-        cursor.execute(query)
-        
-        venues = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        try:
+            cursor.execute(query, (feed_id, from_date) * len(tables))
+            rows = cursor.fetchall()
+        except DatabaseError as e:
+            print(f"Error fetching calendar bookings: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+        for row in rows:
+            row['venue_name'] = self.referenceData.venueNames.get(row['venue_id'])
+            row['club_name'] = self.referenceData.clubNames.get(row['club_id'])
+        return rows
+
+    @QUERY_DURATION.time(query='findAvailability')
+    def findAvailability(self, from_date, to_date, min_duration, venue_name=None,
+                         day_start=AVAILABILITY_DAY_START, day_end=AVAILABILITY_DAY_END):
+        """
+        Finds the free intervals of every venue, or of one venue, on every date of a range.
+
+        The bookings of the whole range are read with one query that is answered from a covering index
+        in (date, venue, start time) order, and the free intervals are computed by a single sweep over them.
+
+        Args:
+            from_date (str): The first date to search (in 'YYYY-MM-DD' format).
+            to_date (str): The last date to search, inclusive (in 'YYYY-MM-DD' format).
+            min_duration (int): The shortest free interval to report, in minutes.
+            venue_name (str, optional): Only search this venue.
+            day_start (str, optional): The start of the bookable day (in 'HH:MM' format).
+            day_end (str, optional): The end of the bookable day (in 'HH:MM' format).
+
+        Returns:
+            list[dict]: One entry per venue with 'venue_name' and 'days', a list of dictionaries with 'date'
+                        ('YYYY-MM-DD') and 'free', a list of {'from_time', 'end_time'} intervals in 'HH:MM' format.
+                        None if the database could not be queried.
+
+        Raises:
+            ValueError: If a date or time is malformed, the range is empty or longer than MAX_AVAILABILITY_DAYS,
+                        the duration is not positive, or the venue is unknown.
+        """
 
-        return venues
+        start = dateType.fromisoformat(from_date)
+        end = dateType.fromisoformat(to_date)
+        if end < start:
+            raise ValueError("The end date is before the start date")
+        if (end - start).days >= MAX_AVAILABILITY_DAYS:
+            raise ValueError(f"At most {MAX_AVAILABILITY_DAYS} days can be searched at once")
+
+        minDuration = int(min_duration) * 60
+        dayStart, dayEnd = toSeconds(day_start), toSeconds(day_end)
+        if minDuration <= 0 or not 0 <= dayStart < dayEnd <= 86400:
+            raise ValueError("Invalid duration or bookable hours")
+
+        self.ensureReferenceData()
+        if venue_name:
+            venueId = self.referenceData.venueIds.get(venue_name)
+            if venueId is None:
+                raise ValueError(f"Unknown venue: {venue_name}")
+            venues = [(venueId, venue_name)]
+        else:
+            venues = [(venue['venue_id'], venue['venue_name']) for venue in self.referenceData.venues]
+
+        # Times are converted to seconds by the server, so the sweep works on plain integers
+        query = """
+        SELECT venue_id, date, TIME_TO_SEC(from_time), TIME_TO_SEC(end_time)
+        FROM booked_venue
+        WHERE date BETWEEN %s AND %s
+        ORDER BY date, venue_id, from_time;
+        """
+        params = (start, end)
+        if venue_name:
+            query = """
+            SELECT venue_id, date, TIME_TO_SEC(from_time), TIME_TO_SEC(end_time)
+            FROM booked_venue
+            WHERE venue_id = %s AND date BETWEEN %s AND %s
+            ORDER BY date, from_time;
+            """
+            params = (venues[0][0], start, end)
+
+        connection = self.getDBConnection()
+        if connection is None:
+            return None
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, params)
+            bookings = cursor.fetchall()
+        except DatabaseError as e:
+            print(f"Error fetching availability: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+        dates = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        free = findFreeSlots(bookings, [venueId for venueId, _ in venues], dates, dayStart, dayEnd, minDuration)
+
+        return [{
+            'venue_name': venueName,
+            'days': [{
+                'date': day,
+                'free': [{'from_time': formatClock(slotStart), 'end_time': formatClock(slotEnd)}
+                         for slotStart, slotEnd in slots],
+            } for day, slots in free[venueId].items()],
+        } for venueId, venueName in venues]
+
+    def fetchVenues(self):
+        """
+        Fetches the list of all available venues, from the reference data cache.
+
+        Returns:
+            list[dict]: A list of dictionaries where each dictionary contains 'venue_id' and 'venue_name'.
+        """
+
+        self.ensureReferenceData()
+        return self.referenceData.venues
 
     def fetchClubs(self):
         """
-        Fetches the list of all clubs from the club_list table.
+        Fetches the list of all clubs, from the reference data cache.
 
         Returns:
-            list[dict]: A list of dictionaries where each dictionary contains 'club_name'.
+            list[dict]: A list of dictionaries where each dictionary contains 'club_id' and 'club_name'.
+        """
+
+        self.ensureReferenceData()
+        return self.referenceData.clubs
+
+    def ensureReferenceData(self, refresh=False):
         """
+        Makes sure the cached venue and club lists are loaded and current.
+
+        The lists are reloaded when they are missing or older than their time to live. In between, the
+        reference data version in the database is compared with the cached one at most once per check
+        interval; a changed version triggers a reload and also drops the cached club identities, since
+        club head assignments are part of the reference data.
+
+        Args:
+            refresh (bool): Reload the lists unconditionally.
 
+        Returns:
+            bool: True if the lists are loaded, False if they could not be read.
+        """
+
+        cache = self.referenceData
+        if not refresh and not cache.needsReload() and not cache.needsVersionCheck():
+            return True
+
+        with cache.lock:
+            if refresh:
+                cache.invalidate()
+
+            if not cache.needsReload() and cache.needsVersionCheck():
+                version = self._readReferenceVersion()
+                if version is None or cache.confirmVersion(version):
+                    return True
+
+            if cache.needsReload():
+                return self._loadReferenceData()
+        return True
+
+    def refreshReferenceData(self):
+        """
+        Reloads the venue and club lists, for example right after an admin edits them.
+
+        Returns:
+            bool: True if the lists were reloaded.
+        """
+
+        return self.ensureReferenceData(refresh=True)
+
+    @QUERY_DURATION.time(query='_readReferenceVersion')
+    def _readReferenceVersion(self):
         connection = self.getDBConnection()
+        if connection is None:
+            return None
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT version FROM data_version WHERE name = 'reference'")
+            result = cursor.fetchone()
+            return result[0] if result else None
+        except DatabaseError as e:
+            print(f"Error reading the reference data version: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+    @QUERY_DURATION.time(query='_loadReferenceData')
+    def _loadReferenceData(self):
+        connection = self.getDBConnection()
+        if connection is None:
+            return False
+
         cursor = connection.cursor(dictionary=True)
+        try:
+            connection.start_transaction(consistent_snapshot=True, readonly=True)
+            cursor.execute("SELECT version FROM data_version WHERE name = 'reference'")
+            version = cursor.fetchone()['version']
+            cursor.execute("SELECT venue_id, venue_name FROM venue_list ORDER BY venue_id")
+            venues = cursor.fetchall()
+            cursor.execute("SELECT club_id, club_name FROM club_list ORDER BY club_id")
+            clubs = cursor.fetchall()
+            connection.commit()
+        except DatabaseError as e:
+            print(f"Error loading reference data: {e}")
+            return False
+        finally:
+            cursor.close()
+            connection.close()
 
-        query = "SELECT club_name FROM club_list"
-        cursor.execute(query)
+        if self.referenceData.version is not None and version != self.referenceData.version:
+            self.invalidateClubIdentity()
+        self.referenceData.load(venues, clubs, version)
+        return True
 
-        clubs = cursor.fetchall()
+    def warmBookingIndex(self):
+        """
+        Loads today's and all future bookings into the in-memory booking index.
 
-        cursor.close()
-        connection.close()
+        The bookings and the change-log position are read from one consistent snapshot, so that
+        later syncs pick up exactly the changes made after the snapshot.
 
-        return clubs
+        Returns:
+            bool: True if the index was loaded, False if the database could not be read.
+        """
 
-    
-    def isVenueBooked(self, date, from_time, end_time, venue_name):
+        with self._indexSyncLock:
+            return self._loadBookingIndex()
+
+    @QUERY_DURATION.time(query='_loadBookingIndex')
+    def _loadBookingIndex(self):
+        connection = self.getDBConnection()
+        if connection is None:
+            return False
+
+        cursor = connection.cursor(dictionary=True)
+        try:
+            connection.start_transaction(consistent_snapshot=True, readonly=True)
+
+            cursor.execute("""
+                SELECT 
+                    CURDATE() AS today, 
+                    COALESCE(MAX(change_id), 0) AS last_change_id
+                FROM booking_change_log
+            """)
+            snapshot = cursor.fetchone()
+
+            # changed_at is not indexed, so the time of the latest change is read by primary key
+            cursor.execute("""
+                SELECT UNIX_TIMESTAMP(changed_at) AS last_modified
+                FROM booking_change_log
+                WHERE change_id = %s
+            """, (snapshot['last_change_id'],))
+            latest = cursor.fetchone()
+            snapshot['last_modified'] = latest['last_modified'] if latest else None
+
+            cursor.execute("""
+                SELECT booking_id, venue_id, date, from_time, end_time
+                FROM booked_venue
+                WHERE date >= %s
+            """, (snapshot['today'],))
+            bookings = cursor.fetchall()
+
+            connection.commit()
+        except DatabaseError as e:
+            print(f"Error loading the booking index: {e}")
+            return False
+        finally:
+            cursor.close()
+            connection.close()
+
+        self.bookingIndex.load(bookings, snapshot['last_change_id'], snapshot['today'], snapshot['last_modified'])
+        self._notifyBookingChange(None)
+        return True
+
+    def syncBookingIndex(self, force=False):
         """
-        Checks if a venue is already booked for the given date and time range.
+        Applies new entries from booking_change_log to the in-memory booking index.
+
+        Every worker process polls the change log at most once per sync interval, which is how bookings
+        made or deleted by other workers reach this worker's index. If the log cannot be read, the index
+        is invalidated and rebuilt on next use, so a stale index is never trusted after an error. If entries
+        the index has not read yet were pruned (see pruneBookingChangeLog), the index is reloaded.
 
         Args:
-            date (str): The date of the booking (in 'YYYY-MM-DD' format).
-            from_time (str): The start time of the booking (in 'HH:MM:SS' format).
-            end_time (str): The end time of the booking (in 'HH:MM:SS' format).
-            venue_name (str): The name of the venue being checked.
+            force (bool): Poll immediately, waiting for any sync already in progress. Used after this process writes a booking.
+
+        Returns:
+            bool: True if the index is warm and up to date as of this call.
+        """
+
+        if not self.bookingIndex.isWarm:
+            return self.warmBookingIndex()
+        if not force and not self.bookingIndex.needsSync():
+            return True
+
+        # A periodic sync is skipped while another thread is syncing; changes must be applied in order
+        if not self._indexSyncLock.acquire(blocking=force):
+            return True
+
+        try:
+            if not self.bookingIndex.isWarm:
+                return self._loadBookingIndex()
+
+            connection = self.getDBConnection()
+            if connection is None:
+                self.bookingIndex.invalidate()
+                return False
+
+            cursor = connection.cursor(dictionary=True)
+            watermark = self.bookingIndex.syncWatermark()
+            try:
+                with QUERY_DURATION.time(query='syncBookingIndex'):
+                    cursor.execute("""
+                        SELECT 
+                            change_id, operation, booking_id, venue_id, club_id, date, from_time, end_time, 
+                            UNIX_TIMESTAMP(changed_at) AS changed_at
+                        FROM booking_change_log
+                        WHERE change_id > %s
+                        ORDER BY change_id
+                    """, (watermark,))
+                    changes = cursor.fetchall()
+
+                    # Read after the changes, so a prune that removed any of them is seen
+                    cursor.execute("SELECT version FROM data_version WHERE name = 'booking_change_log'")
+                    pruned = cursor.fetchone()
+                if pruned is None or pruned['version'] <= watermark:
+                    self.bookingIndex.applyChanges(changes)
+                    archivedIds = self._findArchivedBookings(cursor, changes)
+                else:
+                    self.bookingIndex.invalidate()
+            except DatabaseError as e:
+                print(f"Error syncing the booking index: {e}")
+                self.bookingIndex.invalidate()
+                return False
+            finally:
+                cursor.close()
+                connection.close()
+
+            if not self.bookingIndex.isWarm:
+                return self._loadBookingIndex()
+
+            # An archived booking left booked_venue but is still listed, exported and in its feeds
+            changes = [change for change in changes
+                       if change['operation'] != 'D' or change['booking_id'] not in archivedIds]
+
+            # Listeners may query the database themselves, so the connection is returned first
+            if changes:
+                self._notifyBookingChange(changes)
+            return True
+        finally:
+            self._indexSyncLock.release()
+
+    def _findArchivedBookings(self, cursor, changes):
+        """
+        Finds which deleted bookings in a batch of changes were moved to booked_venue_archive, rather than cancelled.
+
+        Args:
+            cursor: An open dictionary cursor.
+            changes (list[dict]): Change-log rows.
 
         Returns:
-            bool: True if the venue is already booked for the specified time range, False otherwise.
+            set[int]: The ids of the archived bookings.
+        """
+
+        # Only days before today are archived
+        today = dateType.today().isoformat()
+        bookingIds = sorted({change['booking_id'] for change in changes
+                             if change['operation'] == 'D' and str(change['date']) < today})
+        if not bookingIds:
+            return set()
+
+        cursor.execute(f"""
+            SELECT booking_id
+            FROM booked_venue_archive
+            WHERE booking_id IN ({', '.join(['%s'] * len(bookingIds))})
+        """, tuple(bookingIds))
+        return {row['booking_id'] for row in cursor.fetchall()}
+
+    def pruneBookingChangeLog(self, before, batch_size=CHANGE_LOG_PRUNE_BATCH_SIZE):
         """
+        Deletes the booking change-log entries made before a time, so the log does not grow forever.
+
+        Only entries this process's booking index has applied are deleted, and the latest entry is always kept,
+        because the index reads the time of the last change from it. The highest pruned id is recorded in
+        data_version in the same transaction; a worker whose index is further behind reloads it instead of
+        missing the pruned changes. Entries are deleted in id order, batch_size ids per transaction.
+
+        Args:
+            before (float): A Unix time; entries changed at or after it are kept.
+            batch_size (int, optional): Change-log ids deleted per transaction.
+
+        Returns:
+            int or None: The number of entries deleted, or None if the index is not loaded or the database failed.
+        """
+
+        if not self.syncBookingIndex(force=True):
+            return None
+        watermark = self.bookingIndex.syncWatermark()
 
         connection = self.getDBConnection()
+        if connection is None:
+            return None
+
         cursor = connection.cursor()
+        pruned = 0
+        try:
+            with QUERY_DURATION.time(query='pruneBookingChangeLog'):
+                cursor.execute("SELECT MIN(change_id), MAX(change_id) FROM booking_change_log")
+                oldest, latest = cursor.fetchone()
+                if oldest is None:
+                    return 0
+                upTo = min(watermark, latest - 1)
 
-        query = """
-        SELECT 1
-        FROM booked_venue bv
-        JOIN venue_list vl ON bv.venue_id = vl.venue_id
-        WHERE bv.date = %s AND vl.venue_name = %s
-        AND ((bv.from_time <= %s AND bv.end_time > %s) 
-            OR (bv.from_time < %s AND bv.end_time >= %s));
+                # The ids grow with time, so the entries to delete are the ones up to the last old enough
+                cursor.execute("""
+                    SELECT MAX(change_id)
+                    FROM booking_change_log
+                    WHERE change_id <= %s AND UNIX_TIMESTAMP(changed_at) < %s
+                """, (upTo, before))
+                cut = cursor.fetchone()[0]
+                connection.commit()
+
+                while cut is not None and oldest <= cut:
+                    bound = min(cut, oldest + batch_size - 1)
+                    cursor.execute("DELETE FROM booking_change_log WHERE change_id <= %s", (bound,))
+                    pruned += cursor.rowcount
+                    cursor.execute("""
+                        UPDATE data_version SET version = %s
+                        WHERE name = 'booking_change_log' AND version < %s
+                    """, (bound, bound))
+                    connection.commit()
+                    oldest = bound + 1
+        except DatabaseError as e:
+            print(f"Error pruning the booking change log: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+        return pruned
+
+    def getBookingChangePosition(self):
         """
+        Returns the id of the last booking change applied to the in-memory booking index.
 
-        cursor.execute(query, (date, venue_name, from_time, from_time, end_time, end_time))
-        result = cursor.fetchone()
+        A page rendered after this call reflects at least these changes, so its live update stream can
+        start from this position without missing any.
 
-        cursor.close()
-        connection.close()
+        Returns:
+            int: The change-log id, or 0 if the index has not been loaded.
+        """
+
+        return self.bookingIndex.lastChangeId
+
+    @QUERY_DURATION.time(query='describeBookingChanges')
+    def describeBookingChanges(self, changes):
+        """
+        Turns change-log rows into booking events for the live dashboard updates.
+
+        The change log does not record venue links, so the links of inserted and updated bookings are read
+        with one query per batch.
+
+        Args:
+            changes (list[dict]): Change-log rows, as read by syncBookingIndex.
+
+        Returns:
+            list[dict]: One event per change, with 'id' (the change id), 'type' ('insert', 'update' or 'delete')
+                and 'booking' (formatted like fetchBookings).
+        """
+
+        self.ensureReferenceData()
+
+        links = {}
+        bookingIds = sorted({change['booking_id'] for change in changes if change['operation'] != 'D'})
+        if bookingIds:
+            connection = self.getDBConnection()
+            if connection is not None:
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    cursor.execute(f"""
+                        SELECT booking_id, venue_link
+                        FROM booked_venue
+                        WHERE booking_id IN ({', '.join(['%s'] * len(bookingIds))})
+                    """, tuple(bookingIds))
+                    links = {row['booking_id']: row['venue_link'] for row in cursor.fetchall()}
+                except DatabaseError as e:
+                    print(f"Error fetching venue links: {e}")
+                finally:
+                    cursor.close()
+                    connection.close()
+
+        events = []
+        for change in changes:
+            events.append({
+                'id': change['change_id'],
+                'type': CHANGE_EVENT_TYPES[change['operation']],
+                'booking': {
+                    'booking_id': change['booking_id'],
+                    'date': change['date'].strftime('%d-%m-%Y'),
+                    'from_time': formatTime(change['from_time']),
+                    'end_time': formatTime(change['end_time']),
+                    'venue_link': links.get(change['booking_id']),
+                    'venue_name': self.referenceData.venueNames.get(change['venue_id']),
+                    'club_name': self.referenceData.clubNames.get(change['club_id']),
+                    'sort_key': encodeBookingCursor(change),
+                },
+            })
+        return events
+
+    def getBookingVersion(self):
+        """
+        Returns the current version of the booking data, for conditional GET handling.
 
-        return result is not None
+        The version comes from the in-memory booking index, which polls the change log at most once per
+        sync interval, so checking it usually does not touch the database at all.
 
+        Returns:
+            tuple or None: A (versionTag, lastModified) pair, where lastModified is a Unix time,
+                           or None if the booking index could not be loaded.
+        """
+
+        if not self.syncBookingIndex():
+            return None
+        return self.bookingIndex.versionTag(), self.bookingIndex.lastModified
+
+    @QUERY_DURATION.time(query='findIndexedConflict')
+    def findIndexedConflict(self, venueId, date, from_time, end_time, exclude_id=None):
+        """
+        Looks up a booking that clashes with a slot in the in-memory booking index, before any lock is taken,
+        so a request for a taken slot is turned down without queueing on the booking lock.
+
+        The index answers with a binary search. A clash it reports is confirmed with a primary-key lookup,
+        because the index may lag behind the database; a booking that no longer clashes is dropped from the
+        index and the search repeated. Only a clash is conclusive: a free slot must still be claimed through
+        the transactional conflict check.
+
+        Args:
+            venueId (int): The venue id.
+            date (str or datetime.date): The booking date (in 'YYYY-MM-DD' format).
+            from_time (str): The start time (in 'HH:MM:SS' format).
+            end_time (str): The end time (in 'HH:MM:SS' format).
+            exclude_id (int, optional): A booking that does not count as a clash, e.g. the one being rescheduled.
+
+        Returns:
+            dict or None: The clashing booking (booking_id, date, from_time, end_time, club_id), or None if the index
+                          found no clash, does not cover the date, or the clash could not be confirmed.
+        """
+
+        self.syncBookingIndex()
+        if not self.bookingIndex.covers(date):
+            return None
+
+        connection = None
+        cursor = None
+        try:
+            while True:
+                bookingId = self.bookingIndex.findConflict(venueId, date, from_time, end_time)
+                # The index reports one clash per slot, so another booking hidden behind the excluded one is left to the database
+                if bookingId is None or bookingId == exclude_id:
+                    return None
+
+                if connection is None:
+                    connection = self.getDBConnection()
+                    if connection is None:
+                        return None
+                    cursor = connection.cursor(dictionary=True)
+
+                cursor.execute("""
+                    SELECT booking_id, date, from_time, end_time, club_id
+                    FROM booked_venue
+                    WHERE booking_id = %s AND venue_id = %s AND date = %s
+                    AND from_time < %s AND end_time > %s;
+                """, (bookingId, venueId, date, end_time, from_time))
+                clash = cursor.fetchone()
+                if clash is not None:
+                    return clash
+                self.bookingIndex.discard(bookingId)
+        except DatabaseError as e:
+            print(f"Error confirming a booking conflict: {e}")
+            return None
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                connection.close()
+
+    def describeConflict(self, clash):
+        """
+        Formats a clashing booking the way the booking methods report it.
+
+        Args:
+            clash (dict): A booked_venue row with booking_id, date, from_time, end_time and club_id.
+
+        Returns:
+            dict: The booking_id, date ('DD-MM-YYYY'), from_time and end_time (as displayed) and club_name.
+        """
+
+        return {
+            'booking_id': clash['booking_id'],
+            'date': clash['date'].strftime('%d-%m-%Y'),
+            'from_time': formatTime(clash['from_time']),
+            'end_time': formatTime(clash['end_time']),
+            'club_name': self.referenceData.clubNames.get(clash['club_id']),
+        }
+
+    @QUERY_DURATION.time(query='bookVenue')
     def bookVenue(self, date, from_time, end_time, venue_name, club_name, venue_link):
         """
-        Inserts a new venue booking into the database if no time conflicts exist.
+        Books a venue if the requested time slot is free.
+
+        The conflict check and the insert run as a single INSERT ... SELECT ... WHERE NOT EXISTS statement
+        inside one transaction. Concurrent bookings for the same venue and date are serialised with the storage
+        backend's booking lock. On MySQL it is a named lock scoped to that venue and date, so bookings for other
+        venues or days are never blocked; on SQLite it is the database write lock.
+        Two time ranges clash when each one starts before the other ends. A slot the booking index already
+        knows to be taken is turned down before the lock is taken (see findIndexedConflict).
 
         Args:
             date (str): The booking date (in 'YYYY-MM-DD' format).
@@ -171,33 +1133,228 @@ class VenueManagement:
             venue_name (str): The name of the venue being booked.
             club_name (str): The name of the club making the booking.
             venue_link (str): A link related to the booking (e.g., for event registration).
+
+        Returns:
+            tuple: A (booked, conflict) pair. booked is the id of the new booking, or False if none was inserted. conflict is a dictionary
+                   describing the clashing booking (booking_id, date, from_time, end_time, club_name) if the slot
+                   was taken, or None if the booking succeeded or could not be attempted.
         """
 
+        self.ensureReferenceData()
+        venueId = self.referenceData.venueIds.get(venue_name)
+        clubId = self.referenceData.clubIds.get(club_name)
+        if venueId is None or clubId is None:
+            print(f"Unknown venue or club: {venue_name}, {club_name}")
+            return False, None
+
+        from_time, end_time = normalizeTime(from_time), normalizeTime(end_time)
+
+        clash = self.findIndexedConflict(venueId, date, from_time, end_time)
+        if clash is not None:
+            return False, self.describeConflict(clash)
+
         connection = self.getDBConnection()
-        cursor = connection.cursor()
+        if connection is None:
+            return False, None
 
-        # Insert the new booking into the DB
-        query = """
+        cursor = connection.cursor(dictionary=True)
+        booked = False
+        lockName = f"venuescope.booking.{venueId}.{date}"
+
+        insertQuery = """
         INSERT INTO booked_venue (venue_id, club_id, date, from_time, end_time, venue_link)
-        VALUES ((SELECT venue_id FROM venue_list WHERE venue_name = %s), 
-                (SELECT club_id FROM club_list WHERE club_name = %s), %s, %s, %s, %s);
+        SELECT %s, %s, %s, %s, %s, %s
+        FROM DUAL
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM booked_venue bv
+            WHERE bv.venue_id = %s AND bv.date = %s
+            AND bv.from_time < %s AND bv.end_time > %s
+        );
         """
 
-        cursor.execute(query, (venue_name, club_name, date, from_time, end_time, venue_link))
-        connection.commit()
+        conflictQuery = """
+        SELECT booking_id, date, from_time, end_time, club_id
+        FROM booked_venue
+        WHERE venue_id = %s AND date = %s
+        AND from_time < %s AND end_time > %s
+        ORDER BY from_time
+        LIMIT 1;
+        """
 
-        cursor.close()
-        connection.close()
+        try:
+            if not self.storage.acquireLocks(cursor, [lockName], BOOKING_LOCK_TIMEOUT):
+                print(f"Timed out waiting for the booking lock on {venue_name} {date}")
+                return False, None
 
-    def getClubNameByEmail(self, email):
+            try:
+                cursor.execute(insertQuery, (venueId, clubId, date, from_time, end_time, venue_link,
+                                             venueId, date, end_time, from_time))
+                if cursor.rowcount == 1:
+                    bookingId = cursor.lastrowid
+                    connection.commit()
+                    booked = True
+                    return bookingId, None
+
+                connection.rollback()
+                cursor.execute(conflictQuery, (venueId, date, end_time, from_time))
+                clash = cursor.fetchone()
+            finally:
+                self.storage.releaseLocks(cursor, [lockName])
+        except DatabaseError as e:
+            print(f"Error booking venue: {e}")
+            return False, None
+        finally:
+            cursor.close()
+            connection.close()
+            if booked:
+                self.syncBookingIndex(force=True)
+
+        if clash is None:
+            return False, None
+
+        return False, self.describeConflict(clash)
+
+    @QUERY_DURATION.time(query='bookVenueSeries')
+    def bookVenueSeries(self, dates, from_time, end_time, venue_name, club_name, venue_link, allow_partial=False):
         """
-        Retrieves the club name associated with a logged-in user based on their email address.
+        Books the same venue and time slot on several dates, e.g. the occurrences of a recurring booking.
+
+        The booking locks of every venue and date in the series are taken in date order, the same locks bookVenue
+        takes for a single date. Every occurrence is then checked against the existing bookings with one set-based
+        query, and the free occurrences are inserted with one multi-row INSERT in the same transaction.
+        Unless allow_partial is set, a series with an occurrence the booking index knows to be taken is turned
+        down before any lock is taken, reporting the clash the index found on each such date.
 
         Args:
-            email (str): The email address of the logged-in member.
+            dates (list[datetime.date]): The occurrence dates, as returned by expandRecurrence.
+            from_time (str): The start time of every occurrence (in 'HH:MM:SS' format).
+            end_time (str): The end time of every occurrence (in 'HH:MM:SS' format).
+            venue_name (str): The name of the venue being booked.
+            club_name (str): The name of the club making the booking.
+            venue_link (str): A link related to the booking (e.g., for event registration).
+            allow_partial (bool, optional): Book the free occurrences even if others clash. By default nothing is
+                                            booked unless every occurrence is free.
 
         Returns:
-            str or None: The club name if found, or None if no club is associated with the given email.
+            dict or None: 'booked', the dates booked (in 'YYYY-MM-DD' format), and 'conflicts', one dictionary per
+                          clashing occurrence describing the existing booking (booking_id, date, from_time, end_time,
+                          club_name). None if the series could not be attempted.
+        """
+
+        self.ensureReferenceData()
+        venueId = self.referenceData.venueIds.get(venue_name)
+        clubId = self.referenceData.clubIds.get(club_name)
+        if venueId is None or clubId is None:
+            print(f"Unknown venue or club: {venue_name}, {club_name}")
+            return None
+
+        from_time, end_time = normalizeTime(from_time), normalizeTime(end_time)
+        dates = sorted(set(dates))
+
+        # Unless partial series are allowed, one clash found in the index is enough to book nothing
+        if not allow_partial:
+            clashes = [clash for clash in (self.findIndexedConflict(venueId, occurrence, from_time, end_time)
+                                           for occurrence in dates) if clash is not None]
+            if clashes:
+                return {'booked': [], 'conflicts': [self.describeConflict(clash) for clash in clashes]}
+
+        lockNames = [f"venuescope.booking.{venueId}.{occurrence.isoformat()}" for occurrence in dates]
+        connection = self.getDBConnection()
+        if connection is None:
+            return None
+
+        cursor = connection.cursor(dictionary=True)
+        booked = []
+        placeholders = ', '.join(['%s'] * len(dates))
+
+        conflictQuery = f"""
+        SELECT booking_id, date, from_time, end_time, club_id
+        FROM booked_venue
+        WHERE venue_id = %s AND date IN ({placeholders})
+        AND from_time < %s AND end_time > %s
+        ORDER BY date, from_time;
+        """
+
+        insertQuery = """
+        INSERT INTO booked_venue (venue_id, club_id, date, from_time, end_time, venue_link)
+        VALUES (%s, %s, %s, %s, %s, %s);
+        """
+
+        try:
+            try:
+                # Locks are always taken in date order, so two overlapping series cannot deadlock
+                if not self.storage.acquireLocks(cursor, lockNames, BOOKING_LOCK_TIMEOUT):
+                    print(f"Timed out waiting for the booking locks on {venue_name} {dates[0]} to {dates[-1]}")
+                    return None
+
+                cursor.execute(conflictQuery, (venueId, *dates, end_time, from_time))
+                clashes = cursor.fetchall()
+
+                clashingDates = {clash['date'] for clash in clashes}
+                freeDates = [occurrence for occurrence in dates if occurrence not in clashingDates]
+                if freeDates and (allow_partial or not clashes):
+                    # mysql-connector rewrites executemany of a simple INSERT into one multi-row statement;
+                    # sqlite3 reuses one prepared statement for every row
+                    cursor.executemany(insertQuery, [(venueId, clubId, occurrence, from_time, end_time, venue_link)
+                                                     for occurrence in freeDates])
+                    connection.commit()
+                    booked = freeDates
+                else:
+                    connection.rollback()
+            finally:
+                self.storage.releaseLocks(cursor, lockNames)
+        except DatabaseError as e:
+            print(f"Error booking recurring venue: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+            if booked:
+                self.syncBookingIndex(force=True)
+
+        return {'booked': [occurrence.isoformat() for occurrence in booked],
+                'conflicts': [self.describeConflict(clash) for clash in clashes]}
+
+    def archiveBookings(self, before, batch_size=ARCHIVE_BATCH_SIZE):
+        """
+        Moves the bookings dated before a day from booked_venue to booked_venue_archive, so the conflict checks,
+        dashboards and booking index only pay for current and future bookings.
+
+        Bookings are moved in batches, each copied and deleted in one transaction under ARCHIVE_LOCK, so
+        a booking is never in both tables or in neither. The deletes reach the change log like any other,
+        and every worker drops the archived bookings from its booking index.
+
+        Args:
+            before (str): The first date to keep (in 'YYYY-MM-DD' format).
+            batch_size (int, optional): Bookings moved per transaction.
+
+        Returns:
+            int or None: The number of bookings archived, or None if nothing could be archived because
+                         another process is archiving or the database failed.
+        """
+
+        archived = 0
+        while True:
+            moved = self._archiveBatch(before, batch_size)
+            if moved is None:
+                break
+            archived += moved
+            if moved < batch_size:
+                break
+
+        if archived:
+            BOOKINGS_ARCHIVED.inc(archived)
+            self.syncBookingIndex(force=True)
+        return archived if archived or moved is not None else None
+
+    @QUERY_DURATION.time(query='archiveBookings')
+    def _archiveBatch(self, before, batch_size):
+        """
+        Archives up to batch_size of the oldest bookings dated before a day.
+
+        Returns:
+            int or None: The number of bookings archived, or None if the lock was taken or the database failed.
         """
 
         connection = self.getDBConnection()
@@ -205,36 +1362,143 @@ class VenueManagement:
             return None
 
         cursor = connection.cursor()
+        columns = "booking_id, venue_id, club_id, date, from_time, end_time, venue_link"
+
+        try:
+            # Another process is already archiving the same bookings
+            if not self.storage.acquireLocks(cursor, [ARCHIVE_LOCK], 0):
+                return None
+
+            try:
+                cursor.execute("""
+                    SELECT booking_id
+                    FROM booked_venue
+                    WHERE date < %s
+                    ORDER BY date, from_time, booking_id
+                    LIMIT %s;
+                """, (before, batch_size))
+                bookingIds = [row[0] for row in cursor.fetchall()]
+
+                if bookingIds:
+                    # The date is checked again, in case a booking was rescheduled since it was selected
+                    placeholders = ', '.join(['%s'] * len(bookingIds))
+                    cursor.execute(f"""
+                        INSERT INTO booked_venue_archive ({columns})
+                        SELECT {columns}
+                        FROM booked_venue
+                        WHERE booking_id IN ({placeholders}) AND date < %s;
+                    """, (*bookingIds, before))
+                    cursor.execute(f"""
+                        DELETE FROM booked_venue
+                        WHERE booking_id IN ({placeholders}) AND date < %s;
+                    """, (*bookingIds, before))
+                    moved = cursor.rowcount
+                else:
+                    moved = 0
+                connection.commit()
+            finally:
+                self.storage.releaseLocks(cursor, [ARCHIVE_LOCK])
+        except DatabaseError as e:
+            print(f"Error archiving bookings: {e}")
+            return None
+        finally:
+            cursor.close()
+            connection.close()
+
+        return moved
+
+    def getClubByEmail(self, email):
+        """
+        Resolves the club a club head manages, from their email address.
+
+        Results are kept in a process-wide TTL/LRU cache, so repeated lookups for the same member do not
+        query the database until the entry expires or is invalidated with invalidateClubIdentity().
+
+        Args:
+            email (str): The email address of the logged-in member.
+
+        Returns:
+            dict or None: A dictionary with 'club_id' and 'club_name', or None if no club is associated with the given email.
+        """
+
+        if not email:
+            return None
+
+        email = email.lower()
+        club = self.clubIdentityCache.get(email)
+        if club is not None:
+            return club
+
+        connection = self.getDBConnection()
+        if connection is None:
+            return None
+
+        cursor = connection.cursor(dictionary=True)
         query = """
-            SELECT cl.club_name 
+            SELECT cl.club_id, cl.club_name 
             FROM club_head_details chd
             JOIN club_head ch ON chd.head_id = ch.head_id
             JOIN club_list cl ON ch.club_id = cl.club_id
             WHERE chd.email = %s
         """
-        cursor.execute(query, (email,))
-        result = cursor.fetchone()
+        with QUERY_DURATION.time(query='getClubByEmail'):
+            cursor.execute(query, (email,))
+            club = cursor.fetchone()
 
         cursor.close()
         connection.close()
 
-        if result:
-            return result[0]
+        if club:
+            self.clubIdentityCache.set(email, club)
+        return club
+
+    def getClubNameByEmail(self, email):
+        """
+        Retrieves the club name associated with a logged-in user based on their email address.
+
+        Args:
+            email (str): The email address of the logged-in member.
+
+        Returns:
+            str or None: The club name if found, or None if no club is associated with the given email.
+        """
+
+        club = self.getClubByEmail(email)
+        if club:
+            return club['club_name']
         return None
+
+    def invalidateClubIdentity(self, email=None):
+        """
+        Drops cached club identities, for example after a club head is reassigned.
+
+        Args:
+            email (str, optional): The member whose identity should be dropped. Drops every entry if omitted.
+        """
+
+        if email is None:
+            self.clubIdentityCache.clear()
+        else:
+            self.clubIdentityCache.pop(email.lower())
     
-    def deleteBooking(self, date, from_time, end_time, venue_name, club_name):
+    @QUERY_DURATION.time(query='deleteBooking')
+    def deleteBooking(self, booking_id, club_name):
         """
-        Deletes a booking for the given date, time, and venue.
+        Deletes a booking by its id, if it belongs to the given club.
 
         Args:
-            date (str): The date of the booking.
-            from_time (str): The starting time of the booking.
-            venue_name (str): The name of the venue.
+            booking_id (int): The id of the booking.
+            club_name (str): The club of the logged-in member; bookings of other clubs are left alone.
 
         Returns:
-            bool: True if the deletion was successful, False otherwise.
+            bool: True if the booking was deleted, False otherwise.
         """
 
+        self.ensureReferenceData()
+        clubId = self.referenceData.clubIds.get(club_name)
+        if clubId is None:
+            return False
+
         connection = self.getDBConnection()
         if connection is None:
             return False
@@ -242,27 +1506,143 @@ class VenueManagement:
         cursor = connection.cursor()
 
         query = """
-        DELETE FROM booked_venue 
-        WHERE date = %s AND from_time = %s AND end_time = %s AND venue_id = (
-            SELECT venue_id FROM venue_list WHERE venue_name = %s
-        ) AND club_id = (SELECT club_id FROM club_list WHERE club_name = %s);
+        DELETE FROM booked_venue
+        WHERE booking_id = %s AND club_id = %s;
         """
         try:
-            from_time = datetime.strptime(from_time, '%I:%M:%S %p').time() 
-            end_time = datetime.strptime(end_time, '%I:%M:%S %p').time()
-            print(date, from_time, end_time, venue_name, club_name)
-            cursor.execute(query, (date, from_time, end_time, venue_name, club_name))
+            cursor.execute(query, (booking_id, clubId))
             connection.commit()
             result = cursor.rowcount > 0  # Check if rows were affected
-        except Error as e:
+        except DatabaseError as e:
             print(f"Error deleting booking: {e}")
             result = False
         finally:
             cursor.close()
             connection.close()
 
+        if result:
+            self.syncBookingIndex(force=True)
+
         return result
 
+    @QUERY_DURATION.time(query='rescheduleBooking')
+    def rescheduleBooking(self, booking_id, club_name, date, from_time, end_time, venue_name, venue_link=None):
+        """
+        Moves a booking to another date, time or venue in place, keeping its id, if the new slot is free.
+
+        The new slot is checked and the row updated in one transaction, under the booking lock of the new venue
+        and date that bookVenue takes, so a reschedule and a booking of the same slot cannot both succeed.
+        The booking's current slot does not count as a clash, so a booking can be shortened or shifted.
+        As in bookVenue, a new slot the booking index knows to be taken is turned down before the lock is taken.
+
+        Args:
+            booking_id (int): The id of the booking.
+            club_name (str): The club of the logged-in member; bookings of other clubs are left alone.
+            date (str): The new booking date (in 'YYYY-MM-DD' format).
+            from_time (str): The new start time (in 'HH:MM:SS' format).
+            end_time (str): The new end time (in 'HH:MM:SS' format).
+            venue_name (str): The name of the new venue.
+            venue_link (str, optional): A new link; the current one is kept if None.
+
+        Returns:
+            tuple: An (updated, conflict) pair, as returned by bookVenue. updated is True if the booking was moved,
+                   or already was in the new slot. Both are False and None if the booking does not exist, belongs
+                   to another club, or could not be updated.
+        """
+
+        self.ensureReferenceData()
+        venueId = self.referenceData.venueIds.get(venue_name)
+        clubId = self.referenceData.clubIds.get(club_name)
+        if venueId is None or clubId is None:
+            print(f"Unknown venue or club: {venue_name}, {club_name}")
+            return False, None
+
+        from_time, end_time = normalizeTime(from_time), normalizeTime(end_time)
+
+        clash = self.findIndexedConflict(venueId, date, from_time, end_time, exclude_id=booking_id)
+        if clash is not None:
+            return False, self.describeConflict(clash)
+
+        connection = self.getDBConnection()
+        if connection is None:
+            return False, None
+
+        cursor = connection.cursor(dictionary=True)
+        updated = False
+        clash = None
+        lockName = f"venuescope.booking.{venueId}.{date}"
+
+        currentQuery = """
+        SELECT venue_id, date, from_time, end_time, venue_link
+        FROM booked_venue
+        WHERE booking_id = %s AND club_id = %s;
+        """
+
+        conflictQuery = """
+        SELECT booking_id, date, from_time, end_time, club_id
+        FROM booked_venue
+        WHERE venue_id = %s AND date = %s
+        AND from_time < %s AND end_time > %s
+        AND booking_id <> %s
+        ORDER BY from_time
+        LIMIT 1;
+        """
+
+        updateQuery = """
+        UPDATE booked_venue
+        SET venue_id = %s, date = %s, from_time = %s, end_time = %s, venue_link = %s
+        WHERE booking_id = %s AND club_id = %s;
+        """
+
+        try:
+            if not self.storage.acquireLocks(cursor, [lockName], BOOKING_LOCK_TIMEOUT):
+                print(f"Timed out waiting for the booking lock on {venue_name} {date}")
+                return False, None
+
+            try:
+                cursor.execute(currentQuery, (booking_id, clubId))
+                current = cursor.fetchone()
+                if current is None:
+                    connection.rollback()
+                    return False, None
+                if venue_link is None:
+                    venue_link = current['venue_link']
+
+                unchanged = (current['venue_id'] == venueId and str(current['date']) == date
+                             and normalizeTime(current['from_time']) == from_time
+                             and normalizeTime(current['end_time']) == end_time
+                             and current['venue_link'] == venue_link)
+                if unchanged:
+                    connection.rollback()
+                    return True, None
+
+                cursor.execute(conflictQuery, (venueId, date, end_time, from_time, booking_id))
+                clash = cursor.fetchone()
+                if clash is None:
+                    cursor.execute(updateQuery, (venueId, date, from_time, end_time, venue_link, booking_id, clubId))
+                    # The booking may have been deleted since it was read
+                    if cursor.rowcount == 1:
+                        connection.commit()
+                        updated = True
+                        return True, None
+                connection.rollback()
+            finally:
+                self.storage.releaseLocks(cursor, [lockName])
+        except DatabaseError as e:
+            print(f"Error rescheduling booking: {e}")
+            return False, None
+        finally:
+            cursor.close()
+            connection.close()
+            if updated:
+                self.syncBookingIndex(force=True)
+
+        if clash is None:
+            return False, None
+
+        return False, self.describeConflict(clash)
+
+    @QUERY_DURATION.time(query='fetchClubNameForBooking')
     def fetchClubNameForBooking(self, date, from_time, venue_name):
         """
         Retrieves the club name associated with a specific booking.
@@ -1,20 +1,160 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_from_directory, abort, g
+from markupsafe import Markup
+from werkzeug.middleware.proxy_fix import ProxyFix
 from Captcha import Captcha
 from UserAuthentication import UserAuthentication
-from VenueManagement import VenueManagement
-from datetime import datetime
+from ECampusClient import ECampusUnavailableError
+from PasswordHasher import PasswordHasherBusyError
+from VenueManagement import VenueManagement, CLUB_IDENTITY_TTL, expandRecurrence, normalizeTime
+from BookingExport import encodeCsv, encodeJsonLines
+from CalendarFeed import renderCalendar, CALENDAR_PAST_DAYS
+from BookingEvents import BookingEventBroker
+from RateLimiter import getRateLimiter
+from BookingArchive import ArchiveJob
+from Metrics import REGISTRY, HTTP_REQUEST_DURATION, PROMETHEUS_CONTENT_TYPE, poolCollector
+from TTLCache import TTLCache
+from datetime import datetime, date, timezone, timedelta
+import os
+import time
 
 app = Flask(__name__)
 app.secret_key = '!@#$%^&*()-=_+[]{}\|;:/.,<>?`~'
 
+# Behind a reverse proxy every request comes from the proxy, so the client address is taken from the
+# X-Forwarded-For entries added by the given number of trusted proxies
+TRUSTED_PROXIES = int(os.environ.get('VENUESCOPE_TRUSTED_PROXIES', '0'))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
+
 # Initialize services
-captchaService = Captcha()
+captchaService = Captcha(app.secret_key)
 userAuthService = UserAuthentication()
 venueManagementService = VenueManagement()
+rateLimiter = getRateLimiter()
+
+# Report the connection pool state on /metrics
+REGISTRY.addCollector(poolCollector(venueManagementService.pool))
 
 # Constants
 DEFAULT_ATTEMPTS = 3
 
+# Rendered booking listings, keyed by dashboard, booking data version, filters and, for members, club
+bookingTableCache = TTLCache(maxSize=int(os.environ.get('VENUESCOPE_BOOKING_TABLE_CACHE_SIZE', '256')),
+                             ttl=float(os.environ.get('VENUESCOPE_BOOKING_TABLE_CACHE_TTL', '300')))
+
+# Renderings of older booking versions can never be hit again, so they are dropped as soon as bookings change
+venueManagementService.addBookingChangeListener(lambda changes: bookingTableCache.clear())
+
+# Broadcasts booking changes to the open dashboards as Server-Sent Events
+bookingEvents = BookingEventBroker(venueManagementService.describeBookingChanges,
+                                   venueManagementService.syncBookingIndex,
+                                   venueManagementService.getBookingChangePosition,
+                                   pollInterval=venueManagementService.bookingIndex.syncInterval)
+venueManagementService.addBookingChangeListener(bookingEvents.onBookingChange)
+
+# Rendered calendar feeds, keyed by feed and feed version, so a change to one venue leaves the other feeds cached
+calendarFeedCache = TTLCache(maxSize=int(os.environ.get('VENUESCOPE_CALENDAR_CACHE_SIZE', '512')), ttl=3600)
+
+# Moves past bookings to the archive table in the background
+bookingArchive = ArchiveJob(venueManagementService)
+
+def warmUp():
+    """
+    Loads what the first requests would otherwise wait for: the booking index, the venue and club lists
+    and the compiled templates. The CAPTCHA catalog is already indexed when the Captcha service is created.
+    """
+
+    venueManagementService.warmBookingIndex()
+    venueManagementService.ensureReferenceData()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+def createApp():
+    """
+    Returns the WSGI application with its caches warmed, for a production server.
+
+    gunicorn loads it as 'app:createApp()' (see gunicorn.conf.py). With preload_app the warm-up runs once
+    in the master process, and every worker starts with warm caches.
+
+    Returns:
+        Flask: The application.
+    """
+
+    warmUp()
+    return app
+
+def startMaintenance():
+    """
+    Starts the background maintenance of this process, the booking archive job. It runs in every
+    serving process, so it is started after forking (see gunicorn.conf.py), never in the master.
+    """
+
+    bookingArchive.start()
+
+def beforeFork():
+    """
+    Prepares the master process for forking workers by closing its idle database connections.
+    """
+
+    venueManagementService.storage.beforeFork()
+
+def afterFork():
+    """
+    Gives a newly forked worker process its own connection pool.
+    """
+
+    venueManagementService.storage.afterFork()
+
+def shutdown():
+    """
+    Releases the worker's resources before it exits: ends the live update streams, so they do not hold
+    the worker until the graceful timeout, stops the archive job and closes the idle database connections.
+    """
+
+    bookingEvents.shutdown()
+    bookingArchive.stop()
+    venueManagementService.storage.close()
+
+@app.before_request
+def startRequestTimer():
+    """
+    Records when the request started, for the request latency histogram.
+    """
+
+    g.requestStarted = time.perf_counter()
+
+@app.after_request
+def recordRequestMetrics(response):
+    """
+    Records the request's latency under its route template, so that e.g. every /captcha/<imageId> request
+    shares one series.
+
+    Args:
+        response (Response): The response being sent.
+
+    Returns:
+        Response: The same response.
+    """
+
+    started = g.pop('requestStarted', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started,
+                                      route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """
+    Exposes the request, query, eCampus, bcrypt and connection pool metrics of this process in the
+    Prometheus text format.
+
+    Returns:
+        Response: The metrics, as text/plain.
+    """
+
+    return app.response_class(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.route('/')
 def home():
     """
@@ -42,8 +182,20 @@ def studentLogin():
     if request.method == 'POST':
         rollNo = request.form.get('roll_no')
         password = request.form.get('password')
+
+        retryAfter = rateLimiter.checkAll([('login_ip', request.remote_addr), ('login_account', rollNo)])
+        if retryAfter:
+            return rateLimitedResponse(render_template('student_login.html', message=rateLimitMessage(retryAfter)),
+                                       retryAfter)
         
-        if userAuthService.authenticateStudent(rollNo, password):
+        try:
+            authenticated = userAuthService.authenticateStudent(rollNo, password)
+        except ECampusUnavailableError as e:
+            print(e)
+            return render_template('student_login.html',
+                                   message='eCampus is not responding. Please try again in a few minutes.')
+
+        if authenticated:
             return redirect(url_for('mainStudent'))
         else:
             flash('Invalid credentials', 'error')
@@ -67,9 +219,23 @@ def memberLogin():
     if request.method == 'POST':
         email = request.form.get('email')
         password = request.form.get('password')
+
+        retryAfter = rateLimiter.checkAll([('login_ip', request.remote_addr), ('login_account', email)])
+        if retryAfter:
+            return rateLimitedResponse(render_template('member_login.html', message=rateLimitMessage(retryAfter)),
+                                       retryAfter)
         
-        if userAuthService.authenticateMember(email, password):
+        try:
+            authenticated = userAuthService.authenticateMember(email, password)
+        except PasswordHasherBusyError as e:
+            print(e)
+            return render_template('member_login.html',
+                                   message='Too many logins right now. Please try again in a moment.')
+
+        if authenticated:
             session['email'] = email
+            # Resolve the club once so the booking routes need no identity lookup
+            storeSessionClub(venueManagementService.getClubByEmail(email))
             return redirect(url_for('mainMember'))
         else:
             flash('Invalid credentials', 'error')
@@ -95,6 +261,12 @@ def forgotPassword():
     initializeAttemptCounter()
 
     if request.method == 'POST':
+        # The account is the email being submitted, or, once the CAPTCHA is shown, the one being reset
+        account = request.form.get('email') or session.get('email')
+        retryAfter = rateLimiter.checkAll([('reset_ip', request.remote_addr), ('reset_account', account)])
+        if retryAfter:
+            return rateLimitedResponse(renderForgotPasswordPage(message=rateLimitMessage(retryAfter)), retryAfter)
+
         if 'email' in request.form:
             initializeAttemptCounter()
             return handleUsernameSubmission()
@@ -106,42 +278,249 @@ def forgotPassword():
 @app.route('/mainStudent')
 def mainStudent():
     """
-    Renders the main dashboard for students, displaying their booked venues.
+    Renders the main dashboard for students, displaying one page of upcoming booked venues.
+
+    The listing can be narrowed with the 'from', 'to', 'venue' and 'club' query parameters and paged with 'after'.
 
     Returns:
         str: The rendered HTML of the student main page with booking information.
     """
 
-    bookings = venueManagementService.fetchBookedVenues()
-    return render_template('main_student.html', bookings=bookings)
+    # Taken before rendering, so the live updates replay anything the listing might have missed
+    eventsSince = venueManagementService.getBookingChangePosition()
+    try:
+        bookingTable, nextCursor = renderBookingTable('student_bookings.html')
+    except ValueError:
+        return "Invalid page cursor", 400
+    return render_template('main_student.html', bookingTable=bookingTable, eventsSince=eventsSince,
+                           nextPageUrl=nextPageUrl('mainStudent', nextCursor))
 
 @app.route('/mainMember')
 def mainMember():
     """
     Renders the main dashboard page for members.
 
-    This function fetches the list of booked venues, available venues, and the club name associated with the currently logged-in user (based on the user's email stored in the session). 
+    This function fetches one page of upcoming booked venues, the available venues, and the club name associated with the currently logged-in user (based on the user's email stored in the session). 
     It then renders the `main_member.html` template, passing in these details for display in the user's dashboard.
+    The listing can be narrowed with the 'from', 'to', 'venue' and 'club' query parameters and paged with 'after'.
 
     Returns:
         str: The rendered HTML of the member dashboard, displaying:
-            - A list of the user's current bookings (`bookings`).
+            - A page of current bookings (`bookings`).
             - A dropdown list of available venues (`venues`).
             - The club name associated with the logged-in user (`club_name`).
     """
 
-    bookings = venueManagementService.fetchBookedVenues()
+    club = getSessionClub()
+    club_name = club['club_name'] if club else None
+    eventsSince = venueManagementService.getBookingChangePosition()
+    try:
+        bookingTable, nextCursor = renderBookingTable('member_bookings.html', club_name)
+    except ValueError:
+        return "Invalid page cursor", 400
     venues = venueManagementService.fetchVenues()
-    email = session.get('email')
-    club_name = venueManagementService.getClubNameByEmail(email)
-    return render_template('main_member.html', bookings=bookings, venues=venues, club_name=club_name)
+    return render_template('main_member.html', bookingTable=bookingTable, venues=venues, club_name=club_name,
+                           eventsSince=eventsSince, nextPageUrl=nextPageUrl('mainMember', nextCursor))
+
+@app.route('/api/bookings')
+def apiBookings():
+    """
+    Returns one page of bookings as JSON, with conditional GET support.
+
+    Accepts the same 'from', 'to', 'venue', 'club' and 'after' query parameters as the dashboards.
+    The response carries a strong ETag and a Last-Modified header derived from the booking change log.
+    When the client's If-None-Match or If-Modified-Since shows that its copy is current, a
+    304 Not Modified is returned without querying the bookings.
+
+    Returns:
+        Response: A JSON object with 'bookings' and 'next' (200), an empty 304 response,
+                  or an error message (400) for an invalid page cursor.
+    """
+
+    version = venueManagementService.getBookingVersion()
+    if version is not None:
+        versionTag, lastModified = version
+        # The default window starts today, so the same data version renders differently on another day
+        etag = f"{versionTag}-{date.today().isoformat()}"
+        lastModified = datetime.fromtimestamp(int(lastModified), timezone.utc)
+
+        if isNotModified(etag, lastModified):
+            return notModifiedResponse(etag, lastModified)
+
+    try:
+        page = venueManagementService.fetchBookings(**readBookingFilters())
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid page cursor.'}), 400
+
+    response = jsonify(page)
+    response.headers['Cache-Control'] = 'no-cache'
+    if version is not None:
+        response.set_etag(etag)
+        response.last_modified = lastModified
+    return response
+
+# Response encoders and content types of the booking export formats
+EXPORT_FORMATS = {
+    'csv': (encodeCsv, 'text/csv'),
+    'jsonl': (encodeJsonLines, 'application/x-ndjson'),
+}
+
+@app.route('/api/bookings/events')
+def apiBookingEvents():
+    """
+    Streams booking inserts, updates and deletes to a dashboard as Server-Sent Events.
+
+    Each event carries one booking, formatted like /api/bookings, and the change-log id as its event id.
+    A 'reload' event tells the dashboard that some changes cannot be replayed and its listing must be fetched again.
+
+    Query parameters:
+        since (int, optional): The change-log position the dashboard was rendered at. A reconnecting
+            browser's Last-Event-ID header takes precedence.
+
+    Returns:
+        Response: The event stream (200), or an error message (503) if too many streams are open.
+    """
+
+    subscription = bookingEvents.subscribe(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    if subscription is None:
+        response = jsonify({'status': 'error', 'message': 'Too many live update streams are open.'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    response = app.response_class(subscription.events(), mimetype='text/event-stream')
+    # Also runs when the browser goes away, which is how a stream normally ends
+    response.call_on_close(subscription.close)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Tells nginx not to buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/bookings/export')
+def apiExportBookings():
+    """
+    Streams the full booking history, or the part matching the filters, as a CSV or JSON-lines download.
+
+    The bookings are read from the database as the response is sent, in a chunked response, so the export
+    uses the same memory whether it holds a hundred bookings or a million.
+
+    Query parameters:
+        format (str, optional): 'csv' (default) or 'jsonl'.
+        from, to (str, optional): The first and last dates to include ('YYYY-MM-DD'). Default to no bound.
+        venue, club (str, optional): Only include bookings for this venue or made by this club.
+
+    Returns:
+        Response: The streamed export (200), or an error message for an unknown format (400)
+                  or an unavailable database (500).
+    """
+
+    exportFormat = request.args.get('format', 'csv')
+    if exportFormat not in EXPORT_FORMATS:
+        return jsonify({'status': 'error', 'message': f"Unknown export format: {exportFormat}"}), 400
+    encode, mimetype = EXPORT_FORMATS[exportFormat]
+
+    stream = venueManagementService.exportBookings(
+        from_date=request.args.get('from') or None,
+        to_date=request.args.get('to') or None,
+        venue_name=request.args.get('venue') or None,
+        club_name=request.args.get('club') or None,
+    )
+    if stream is None:
+        return jsonify({'status': 'error', 'message': 'Bookings could not be exported. Please try again.'}), 500
+
+    response = app.response_class(encode(stream), mimetype=mimetype)
+    # Also runs when the client disconnects before the export is finished
+    response.call_on_close(stream.close)
+    response.headers['Content-Disposition'] = f'attachment; filename="bookings-{date.today().isoformat()}.{exportFormat}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/calendar/<any(venue, club):kind>/<path:name>.ics')
+def calendarFeed(kind, name):
+    """
+    Serves the iCalendar feed of a venue or a club, with conditional GET support.
+
+    The feed holds the venue's or club's bookings from CALENDAR_PAST_DAYS days ago onwards. Its ETag is
+    the feed version, which only changes when one of its bookings is made or deleted, so calendar apps
+    polling an unchanged feed get a 304 Not Modified without a query. A changed feed is rendered once
+    per version and served from the feed cache to every client after that.
+
+    Args:
+        kind (str): 'venue' or 'club'.
+        name (str): The venue or club name.
+
+    Returns:
+        Response: The feed (200), an empty 304 response, a 404 for an unknown venue or club,
+                  or an error message (500) if the bookings could not be read.
+    """
+
+    feedId = venueManagementService.resolveFeed(kind, name)
+    if feedId is None:
+        abort(404)
+
+    today = date.today()
+    version = venueManagementService.getFeedVersion(kind, feedId)
+    cacheKey = etag = lastModified = None
+    if version is not None:
+        feedVersion, changedAt = version
+        # The feed window moves every day, so the same feed version renders differently on another day
+        etag = f"{kind}-{feedId}-{feedVersion}-{today.isoformat()}"
+        lastModified = datetime.fromtimestamp(int(changedAt), timezone.utc)
+        if isNotModified(etag, lastModified):
+            return notModifiedResponse(etag, lastModified)
+        cacheKey = (kind, feedId, feedVersion, today)
+
+    body = calendarFeedCache.get(cacheKey) if cacheKey else None
+    if body is None:
+        bookings = venueManagementService.fetchCalendarBookings(kind, feedId, today - timedelta(days=CALENDAR_PAST_DAYS))
+        if bookings is None:
+            return "Calendar could not be loaded. Please try again.", 500
+        body = renderCalendar(f"{name} bookings", bookings, version[1] if version else time.time())
+        if cacheKey:
+            calendarFeedCache.set(cacheKey, body)
+
+    response = app.response_class(body, mimetype='text/calendar')
+    response.headers['Cache-Control'] = 'no-cache'
+    if etag:
+        response.set_etag(etag)
+        response.last_modified = lastModified
+    return response
+
+@app.route('/api/availability')
+def apiAvailability():
+    """
+    Returns the free intervals of every venue over a date range as JSON.
+
+    Query parameters:
+        from (str, optional): The first date to search ('YYYY-MM-DD'). Defaults to today.
+        to (str, optional): The last date to search ('YYYY-MM-DD'). Defaults to a week from the first date.
+        duration (int, optional): The shortest free interval to report, in minutes. Defaults to 60.
+        venue (str, optional): Only search this venue.
+        day_start, day_end (str, optional): The bookable hours ('HH:MM'). Default to 08:00 and 20:00.
+
+    Returns:
+        Response: A JSON object with 'venues' (200), or an error message (400) for invalid parameters.
+    """
+
+    fromDate = request.args.get('from') or date.today().isoformat()
+    try:
+        toDate = request.args.get('to') or (date.fromisoformat(fromDate) + timedelta(days=6)).isoformat()
+        options = {key: request.args[key] for key in ('day_start', 'day_end') if request.args.get(key)}
+        venues = venueManagementService.findAvailability(fromDate, toDate, request.args.get('duration', 60),
+                                                         venue_name=request.args.get('venue') or None, **options)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': f"Invalid availability search: {e}"}), 400
+
+    if venues is None:
+        return jsonify({'status': 'error', 'message': 'Availability could not be computed. Please try again.'}), 500
+    return jsonify({'from': fromDate, 'to': toDate, 'venues': venues})
 
 @app.route('/book_venue', methods=['POST'])
 def book_venue():
     """
     Handles the form submission for booking a venue. 
 
-    This function receives a JSON request containing booking details, validates the data, checks for conflicting bookings, and either confirms the booking or returns an error message. 
+    This function receives a JSON request containing booking details and books the venue through a single transactional operation that checks for conflicting bookings and inserts the booking atomically. 
     It ensures that the booking date and time are valid (i.e., not in the past and that the end time is after the start time) and that the venue is available. 
     If the booking is successful, it stores the booking in the database and returns a success response. Otherwise, it returns an appropriate error message. 
 
@@ -154,11 +533,11 @@ def book_venue():
 
     data = request.get_json()  # Fetch data from JSON request body
     
-    email = session.get('email')
-    # Fetch the club name associated with the logged-in user
-    club_name = venueManagementService.getClubNameByEmail(email)
-    if not club_name:
+    # The club associated with the logged-in user, resolved at login
+    club = getSessionClub()
+    if not club:
         return jsonify({'status': 'error', 'message': 'Club not found for the logged-in user.'}), 400
+    club_name = club['club_name']
     
     date = data['date']  # Expected format 'DD/MM/YYYY'
     from_time = data['from_time']  # Expected format 'HH:MM AM/PM'
@@ -167,49 +546,297 @@ def book_venue():
     venue_name = data['venue_name']
     venue_link = data['link']
     
-    # Check for booking clashes
-    if venueManagementService.isVenueBooked(date, from_time, end_time, venue_name):
-        return jsonify({'status': 'error', 'message': 'Venue is already booked for this time slot.'}), 400
-    
-    # Insert the booking if all validations pass
-    venueManagementService.bookVenue(date, from_time, end_time, venue_name, club_name, venue_link)
+    # Check for clashes and insert the booking in one transaction
+    booked, conflict = venueManagementService.bookVenue(date, from_time, end_time, venue_name, club_name, venue_link)
+    if conflict:
+        message = (f"Venue is already booked for this time slot by {conflict['club_name']} "
+                   f"({conflict['from_time']} - {conflict['end_time']}).")
+        return jsonify({'status': 'error', 'message': message, 'conflict': conflict}), 400
+    if not booked:
+        return jsonify({'status': 'error', 'message': 'The venue could not be booked. Please try again.'}), 400
     
-    return jsonify({'status': 'success', 'message': 'Venue booked successfully!'}), 200
+    return jsonify({'status': 'success', 'message': 'Venue booked successfully!', 'booking_id': booked}), 200
+
+@app.route('/book_venue_series', methods=['POST'])
+def book_venue_series():
+    """
+    Handles the form submission for a recurring booking.
+
+    This function receives a JSON request with the same fields as /book_venue, where 'date' is the first occurrence,
+    plus 'frequency' ('weekly' or 'biweekly'), 'until' (the last date, 'YYYY-MM-DD'), optional 'exceptions' (dates to
+    skip) and optional 'allow_partial'. Every occurrence is checked and booked in one transaction.
+
+    Returns:
+        Response: A JSON response with the status, message, booked dates and clashing occurrences.
+        Possible statuses are:
+            - 'success' (200): If every occurrence was booked, or the free ones were booked with allow_partial.
+            - 'error' (400): If the series is invalid, or any occurrence clashes and allow_partial is not set.
+    """
+
+    data = request.get_json()  # Fetch data from JSON request body
+
+    # The club associated with the logged-in user, resolved at login
+    club = getSessionClub()
+    if not club:
+        return jsonify({'status': 'error', 'message': 'Club not found for the logged-in user.'}), 400
+
+    try:
+        dates = expandRecurrence(data['date'], data['until'], data['frequency'], data.get('exceptions') or [])
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f"Invalid recurring booking: {e}"}), 400
+
+    result = venueManagementService.bookVenueSeries(dates, data['from_time'], data['end_time'], data['venue_name'],
+                                                    club['club_name'], data['link'], bool(data.get('allow_partial')))
+    if result is None:
+        return jsonify({'status': 'error', 'message': 'The venue could not be booked. Please try again.'}), 400
+
+    booked, conflicts = result['booked'], result['conflicts']
+    clashing = len({conflict['date'] for conflict in conflicts})
+    if not booked:
+        message = f"No occurrences were booked: {clashing} of {len(dates)} clash with existing bookings."
+        return jsonify({'status': 'error', 'message': message, 'booked': booked, 'conflicts': conflicts}), 400
+
+    message = f"Booked {len(booked)} of {len(dates)} occurrences."
+    if conflicts:
+        message += f" {clashing} clashed with existing bookings and were skipped."
+    return jsonify({'status': 'success', 'message': message, 'booked': booked, 'conflicts': conflicts}), 200
+
+@app.route('/reschedule_booking', methods=['POST'])
+def reschedule_booking():
+    """
+    Handles moving a booking to another date, time or venue.
+
+    This function receives a JSON request with the 'booking_id' of one of the logged-in club's bookings and the
+    same fields as /book_venue ('link' is optional). The booking keeps its id, and the new slot is checked for
+    clashes with every other booking in the same transaction that updates it.
+
+    Returns:
+        Response: A JSON response with the status and message of the reschedule.
+        Possible statuses are:
+            - 'success' (200): If the booking was moved.
+            - 'error' (400): If the request is invalid, the new slot is taken, or the booking is not the club's.
+    """
+
+    data = request.get_json()  # Fetch data from JSON request body
+
+    # The club associated with the logged-in user, resolved at login
+    club = getSessionClub()
+    if not club:
+        return jsonify({'status': 'error', 'message': 'Club not found for the logged-in user.'}), 400
+
+    try:
+        bookingId = int(data['booking_id'])
+        bookingDate = date.fromisoformat(data['date'])
+        fromTime, endTime = normalizeTime(data['from_time']), normalizeTime(data['end_time'])
+        venue_name = data['venue_name']
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'status': 'error', 'message': f"Invalid booking change: {e}"}), 400
+    if bookingDate < date.today() or fromTime >= endTime:
+        return jsonify({'status': 'error', 'message': 'The new slot must be in the future and end after it starts.'}), 400
+
+    updated, conflict = venueManagementService.rescheduleBooking(bookingId, club['club_name'], bookingDate.isoformat(),
+                                                                 fromTime, endTime, venue_name, data.get('link'))
+    if conflict:
+        message = (f"Venue is already booked for this time slot by {conflict['club_name']} "
+                   f"({conflict['from_time']} - {conflict['end_time']}).")
+        return jsonify({'status': 'error', 'message': message, 'conflict': conflict}), 400
+    if not updated:
+        return jsonify({'status': 'error', 'message': 'The booking could not be rescheduled. Please try again.'}), 400
+
+    return jsonify({'status': 'success', 'message': 'Booking rescheduled successfully!', 'booking_id': bookingId}), 200
 
 @app.route('/delete_booking', methods=['POST'])
 def delete_booking():
     """
     Handles the deletion of a booked venue.
 
-    This function deletes a specific booking from the database, based on the
-    provided date, time, and venue name. It ensures that the club associated
-    with the booking matches the logged-in user before deletion.
+    This function deletes the booking with the posted 'booking_id'. Only bookings of the logged-in
+    member's club are deleted.
 
     Returns:
         str: Redirects back to the main member page.
     """
 
-    # Retrieve form data
-    date_str = request.form.get('date')
-    from_time = request.form.get('from_time')
-    end_time = request.form.get('end_time')
-    venue_name = request.form.get('venue_name')
-    club_name = request.form.get('club_name')
-
-    # Convert date from 'DD-MM-YYYY' to 'YYYY-MM-DD'
     try:
-        date = datetime.strptime(date_str, '%d-%m-%Y').strftime('%Y-%m-%d')
-    except ValueError:
-        # Handle invalid date format error
-        return "Invalid date format", 400
-    # Only delete if the club matches the user's club
-    email = session.get('email')
-    user_club_name = venueManagementService.getClubNameByEmail(email)
-    
-    venueManagementService.deleteBooking(date, from_time, end_time, venue_name, user_club_name)
+        bookingId = int(request.form.get('booking_id'))
+    except (TypeError, ValueError):
+        return "Invalid booking", 400
+
+    club = getSessionClub()
+    if not club:
+        return redirect(url_for('mainMember'))
+
+    venueManagementService.deleteBooking(bookingId, club['club_name'])
 
     return redirect(url_for('mainMember'))
 
+def storeSessionClub(club):
+    """
+    Stores the club identity of the logged-in member in the session, together with the time it was resolved.
+
+    Args:
+        club (dict or None): A dictionary with 'club_id' and 'club_name', as returned by VenueManagement.getClubByEmail.
+    """
+
+    if club:
+        session['club'] = {'club_id': club['club_id'], 'club_name': club['club_name'], 'resolvedAt': time.time()}
+    else:
+        session.pop('club', None)
+
+def getSessionClub():
+    """
+    Returns the club identity of the logged-in member.
+
+    The identity stored at login is trusted for CLUB_IDENTITY_TTL seconds. After that, or for sessions that
+    predate it, it is re-resolved through VenueManagement's shared identity cache, which honours explicit
+    invalidation.
+
+    Returns:
+        dict or None: A dictionary with 'club_id' and 'club_name', or None if the member has no club.
+    """
+
+    club = session.get('club')
+    if club is None or time.time() - club['resolvedAt'] > CLUB_IDENTITY_TTL:
+        storeSessionClub(venueManagementService.getClubByEmail(session.get('email')))
+        club = session.get('club')
+    return club
+
+def isNotModified(etag, lastModified):
+    """
+    Checks the request's conditional headers against the current version of a resource.
+
+    If-None-Match takes precedence over If-Modified-Since, as required by RFC 9110.
+
+    Args:
+        etag (str): The resource's current strong ETag.
+        lastModified (datetime.datetime): When the resource last changed, in UTC.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 Not Modified can be sent.
+    """
+
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    return request.if_modified_since is not None and lastModified <= request.if_modified_since
+
+def notModifiedResponse(etag, lastModified):
+    """
+    Builds an empty 304 Not Modified response carrying the resource's validators.
+
+    Args:
+        etag (str): The resource's current strong ETag.
+        lastModified (datetime.datetime): When the resource last changed, in UTC.
+
+    Returns:
+        Response: The 304 response.
+    """
+
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.last_modified = lastModified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def rateLimitMessage(retryAfter):
+    """
+    Words the message shown when the rate limiter turns a request away.
+
+    Args:
+        retryAfter (int): Seconds until the client may try again.
+
+    Returns:
+        str: The message.
+    """
+
+    minutes = -(-retryAfter // 60)
+    wait = f"{retryAfter} seconds" if retryAfter < 60 else f"{minutes} minute{'s' if minutes > 1 else ''}"
+    return f"Too many attempts. Please try again in {wait}."
+
+def rateLimitedResponse(body, retryAfter):
+    """
+    Builds a 429 Too Many Requests response telling the client when to try again.
+
+    Args:
+        body (str): The rendered page.
+        retryAfter (int): Seconds until the client may try again.
+
+    Returns:
+        Response: The 429 response, with a Retry-After header.
+    """
+
+    response = app.make_response((body, 429))
+    response.headers['Retry-After'] = str(retryAfter)
+    return response
+
+def readBookingFilters():
+    """
+    Reads the booking listing filters from the query string.
+
+    Returns:
+        dict: Keyword arguments for VenueManagement.fetchBookings ('from', 'to', 'venue', 'club' and 'after' parameters).
+    """
+
+    return {
+        'from_date': request.args.get('from') or None,
+        'to_date': request.args.get('to') or None,
+        'venue_name': request.args.get('venue') or None,
+        'club_name': request.args.get('club') or None,
+        'after': request.args.get('after') or None,
+    }
+
+def renderBookingTable(template, club_name=None):
+    """
+    Renders one page of the booking listing for a dashboard, reusing an earlier rendering when possible.
+
+    Renderings are cached under the booking data version of the in-memory booking index, so a cached page
+    is never served after a booking is made or deleted, in this worker or another. The member listing is
+    cached per club, because only the club's own bookings get a delete button.
+
+    Args:
+        template (str): The fragment template, 'student_bookings.html' or 'member_bookings.html'.
+        club_name (str, optional): The logged-in member's club.
+
+    Returns:
+        tuple[Markup, str or None]: The rendered listing and the cursor of the next page.
+
+    Raises:
+        ValueError: If the after cursor is malformed.
+    """
+
+    filters = readBookingFilters()
+    version = venueManagementService.getBookingVersion()
+    key = None
+    if version is not None:
+        # The default window starts today, so the same data version renders differently on another day
+        key = (template, version[0], date.today().isoformat(), club_name, *sorted(filters.items()))
+        cached = bookingTableCache.get(key)
+        if cached is not None:
+            return cached
+
+    page = venueManagementService.fetchBookings(**filters)
+    rendered = (Markup(render_template(template, bookings=page['bookings'], club_name=club_name)), page['next'])
+    if key is not None:
+        bookingTableCache.set(key, rendered)
+    return rendered
+
+def nextPageUrl(endpoint, cursor):
+    """
+    Builds the link to the next page of a booking listing, keeping the current filters.
+
+    Args:
+        endpoint (str): The dashboard endpoint.
+        cursor (str or None): The keyset cursor of the next page.
+
+    Returns:
+        str or None: The URL of the next page, or None if there is no next page.
+    """
+
+    if cursor is None:
+        return None
+    args = request.args.to_dict()
+    args['after'] = cursor
+    return url_for(endpoint, **args)
+
 def initializeAttemptCounter():
     """
     Initializes the attempt counter for the forgot password process if it doesn't already exist in the session.
@@ -268,13 +895,11 @@ def handleUsernameSubmission():
 
     username = request.form.get('username')
     showCaptcha = True
-    selectedImage = captchaService.selectRandomImage()
+    imageId, captchaToken = captchaService.createChallenge()
     
-    session['captchaSolution'] = captchaService.solution
     session['username'] = username
-    session['selectedImage'] = selectedImage
     
-    return renderForgotPasswordPage(showCaptcha, selectedImage)
+    return renderForgotPasswordPage(showCaptcha, imageId, captchaToken=captchaToken)
 
 def handleCaptchaSubmission():
     """
@@ -290,14 +915,21 @@ def handleCaptchaSubmission():
     newPassword = request.form.get('newPassword')
     confirmPassword = request.form.get('reEnterPassword')
     captchaInput = request.form.get('otp')
+    captchaToken = request.form.get('captchaToken')
 
     email = session.get('email')
     print(email)
-    selectedImage = session.get('selectedImage')
 
-    if isCaptchaAndPasswordValid(captchaInput, newPassword, confirmPassword):
+    if isCaptchaAndPasswordValid(captchaInput, captchaToken, newPassword, confirmPassword):
         # Encrypt the new password and update the database
-        hashed_password = userAuthService.hashPassword(newPassword)
+        try:
+            hashed_password = userAuthService.hashPassword(newPassword)
+        except PasswordHasherBusyError as e:
+            print(e)
+            imageId, captchaToken = captchaService.createChallenge()
+            message = 'The server is busy. Please try again in a moment.'
+            return renderForgotPasswordPage(showCaptcha=True, selectedImage=imageId,
+                                            message=message, captchaToken=captchaToken)
         userAuthService.updatePasswordInDB(email, hashed_password)
         
         initializeAttemptCounter()
@@ -307,21 +939,21 @@ def handleCaptchaSubmission():
         decrementAttemptCounter()
         
         # Regenerate CAPTCHA on failed attempt
-        selectedImage = captchaService.selectRandomImage()
-        session['captchaSolution'] = captchaService.solution
-        session['selectedImage'] = selectedImage
+        imageId, captchaToken = captchaService.createChallenge()
 
         flash('Invalid CAPTCHA or mismatched password, please try again.', 'error')
         message = 'Invalid CAPTCHA or mismatched password, please try again.'
-        return renderForgotPasswordPage(showCaptcha=True, selectedImage=selectedImage, message=message)
+        return renderForgotPasswordPage(showCaptcha=True, selectedImage=imageId,
+                                        message=message, captchaToken=captchaToken)
 
-def isCaptchaAndPasswordValid(captchaInput, newPassword, confirmPassword):
+def isCaptchaAndPasswordValid(captchaInput, captchaToken, newPassword, confirmPassword):
     """
     Validates the provided CAPTCHA input and checks that the new password matches 
     the confirmation password and meets the required policy.
 
     Args:
         captchaInput (str): The input provided for the CAPTCHA validation.
+        captchaToken (str): The signed challenge token submitted with the form.
         newPassword (str): The new password entered by the user.
         confirmPassword (str): The confirmation of the new password.
 
@@ -329,18 +961,18 @@ def isCaptchaAndPasswordValid(captchaInput, newPassword, confirmPassword):
         bool: True if both the CAPTCHA and password validation pass, False otherwise.
     """
 
-    return ('captchaSolution' in session and 
-            captchaService.validateCaptcha(captchaInput) and 
+    return (captchaService.validateCaptcha(captchaInput, captchaToken) and 
             captchaService.validatePassword(newPassword, confirmPassword))
 
-def renderForgotPasswordPage(showCaptcha=False, selectedImage=None, message=''):
+def renderForgotPasswordPage(showCaptcha=False, selectedImage=None, message='', captchaToken=None):
     """
     Renders the forgot password page, optionally displaying the CAPTCHA and any error message.
 
     Args:
         showCaptcha (bool, optional): Whether to display the CAPTCHA section. Defaults to False.
-        selectedImage (str, optional): The filename of the selected CAPTCHA image. Defaults to None.
+        selectedImage (str, optional): The id of the selected CAPTCHA image. Defaults to None.
         message (str, optional): Any message to display to the user. Defaults to an empty string.
+        captchaToken (str, optional): The signed challenge token for the selected image. Defaults to None.
 
     Returns:
         str: The rendered HTML of the forgot password page.
@@ -351,8 +983,32 @@ def renderForgotPasswordPage(showCaptcha=False, selectedImage=None, message=''):
     return render_template('forgot_password.html', 
                            showCaptcha=showCaptcha, 
                            imageName=selectedImage,
+                           captchaToken=captchaToken,
                            attemptsRemaining=attemptCounter, 
                            message=message)
 
+@app.route('/captcha/<imageId>')
+def captchaImage(imageId):
+    """
+    Serves a CAPTCHA image by its opaque id, so the image URL does not give away the solution.
+
+    Args:
+        imageId (str): The image id from a challenge.
+
+    Returns:
+        Response: The image, or 404 if the id is unknown.
+    """
+
+    file = captchaService.getImageFile(imageId)
+    if file is None:
+        abort(404)
+
+    response = send_from_directory(captchaService.folderPath, file, mimetype='image/jpeg')
+    response.headers['Cache-Control'] = 'private, max-age=3600'
+    return response
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # The development server; use gunicorn with gunicorn.conf.py in production
+    warmUp()
+    startMaintenance()
+    app.run(debug=os.environ.get('VENUESCOPE_DEBUG', '1') == '1', threaded=True)
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""
+gunicorn settings for running VenueScope in production:
+
+    gunicorn -c gunicorn.conf.py
+
+Each worker process serves requests from a pool of threads, so blocking database and eCampus calls do not
+hold up the others, and every core gets a worker. The application is loaded and warmed once in the master
+process, and forked workers share its caches; each worker opens its own database connections.
+"""
+
+import multiprocessing
+import os
+import signal
+import sys
+
+bind = os.environ.get('VENUESCOPE_BIND', '0.0.0.0:8000')
+wsgi_app = 'app:createApp()'
+
+# One worker process per core, each with a pool of request threads
+worker_class = 'gthread'
+workers = int(os.environ.get('VENUESCOPE_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('VENUESCOPE_THREADS', '16'))
+
+# Every live update stream holds a thread for as long as the dashboard is open, so at most half of them may
+os.environ.setdefault('VENUESCOPE_SSE_MAX_CLIENTS', str(max(1, threads // 2)))
+
+# Load and warm the application once, before forking
+preload_app = True
+
+# An in-memory SQLite database lives in a single process, and must not be carried across a fork
+if (os.environ.get('VENUESCOPE_DB_BACKEND', 'mysql').lower() == 'sqlite'
+        and os.environ.get('VENUESCOPE_SQLITE_PATH') == ':memory:'):
+    workers = 1
+    preload_app = False
+
+timeout = 60
+graceful_timeout = int(os.environ.get('VENUESCOPE_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+accesslog = '-'
+
+def _application():
+    # The application module, if it has been loaded in this process
+    return sys.modules.get('app')
+
+def pre_fork(server, worker):
+    # Workers must not inherit the master's database connections
+    application = _application()
+    if application is not None:
+        application.beforeFork()
+
+def post_fork(server, worker):
+    application = _application()
+    if application is not None:
+        application.afterFork()
+
+def post_worker_init(worker):
+    application = _application()
+    application.startMaintenance()
+
+    # A graceful stop waits for requests in progress, which live update streams never finish on their own
+    stop = signal.getsignal(signal.SIGTERM)
+
+    def handleTerm(signum, frame):
+        application.bookingEvents.shutdown()
+        stop(signum, frame)
+
+    signal.signal(signal.SIGTERM, handleTerm)
+
+def worker_exit(server, worker):
+    application = _application()
+    if application is not None:
+        application.shutdown()
@@ -0,0 +1,105 @@
+// Live booking updates shared by the student and member dashboards.
+// The server pushes every booking insert, update and delete over /api/bookings/events,
+// and the listing on the page is patched in place instead of being reloaded.
+
+// Splits a 'YYYY-MM-DD_<seconds since midnight>_<booking id>' sort key into comparable parts
+function parseSortKey(key) {
+    const [date, seconds, bookingId] = key.split('_');
+    return [date, Number(seconds), Number(bookingId)];
+}
+
+function compareSortKeys(left, right) {
+    const a = parseSortKey(left);
+    const b = parseSortKey(right);
+    for (let i = 0; i < a.length; i++) {
+        if (a[i] < b[i]) {
+            return -1;
+        }
+        if (a[i] > b[i]) {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+// Checks a booking against the page's filters and the part of the listing this page shows
+function belongsOnPage(booking, params, lastKey, hasNext) {
+    const date = booking.sort_key.split('_')[0];
+    const from = params.get('from') || new Date().toLocaleDateString('en-CA');
+
+    if (date < from || (params.get('to') && date > params.get('to'))) {
+        return false;
+    }
+    if ((params.get('venue') && booking.venue_name !== params.get('venue')) ||
+        (params.get('club') && booking.club_name !== params.get('club'))) {
+        return false;
+    }
+    if (params.get('after') && compareSortKeys(booking.sort_key, params.get('after')) <= 0) {
+        return false;
+    }
+    // Bookings after the last one shown belong to a later page
+    return !(hasNext && lastKey && compareSortKeys(booking.sort_key, lastKey) > 0);
+}
+
+// Subscribes a listing to the booking event stream.
+//   container: the element carrying data-events-since and data-has-next
+//   itemSelector: selects the element of one booking, e.g. 'tbody tr'
+//   createItem: builds the element of a booking
+//   onReload: called when the listing has to be fetched again
+//   onLiveChange: called with true once the stream is open, and with false if the browser has no
+//     EventSource support or the stream is closed for good, e.g. refused with 503 when the server
+//     has too many streams open; the page must then fall back to reloading or polling
+function connectBookingEvents(container, itemSelector, createItem, onReload, onLiveChange) {
+    if (!window.EventSource) {
+        onLiveChange(false);
+        return;
+    }
+
+    const params = new URLSearchParams(window.location.search);
+    const hasNext = container.dataset.hasNext === 'true';
+    const source = new EventSource('/api/bookings/events?since=' + encodeURIComponent(container.dataset.eventsSince));
+
+    const remove = booking => {
+        container.querySelectorAll(`${itemSelector}[data-booking-id="${booking.booking_id}"]`)
+            .forEach(item => item.remove());
+    };
+
+    const insert = booking => {
+        const items = Array.from(container.querySelectorAll(itemSelector));
+        const lastKey = items.length > 0 ? items[items.length - 1].dataset.sortKey : null;
+        if (!belongsOnPage(booking, params, lastKey, hasNext)) {
+            return;
+        }
+
+        const item = createItem(booking);
+        item.dataset.bookingId = booking.booking_id;
+        item.dataset.sortKey = booking.sort_key;
+
+        const following = items.find(other => compareSortKeys(other.dataset.sortKey, booking.sort_key) > 0);
+        if (following) {
+            following.before(item);
+        } else {
+            (container.querySelector('tbody') || container).appendChild(item);
+        }
+    };
+
+    // Events may be replayed after a reconnect, so every change replaces any copy already shown
+    const upsert = event => {
+        const booking = JSON.parse(event.data);
+        remove(booking);
+        insert(booking);
+    };
+
+    source.addEventListener('insert', upsert);
+    source.addEventListener('update', upsert);
+    source.addEventListener('delete', event => remove(JSON.parse(event.data)));
+    source.addEventListener('reload', () => onReload());
+
+    source.addEventListener('open', () => onLiveChange(true));
+    // The browser reconnects by itself after a dropped connection, but gives up on a refused one
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+            onLiveChange(false);
+        }
+    };
+}
@@ -16,6 +16,124 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 });
 
+// Set while the booking table follows the live booking updates, i.e. while the event stream is open
+let liveUpdates = false;
+
+function createBookingRow(booking) {
+    const row = document.createElement('tr');
+    [booking.date, booking.from_time, booking.end_time, booking.venue_name, booking.club_name].forEach(text => {
+        const cell = document.createElement('td');
+        cell.textContent = text;
+        row.appendChild(cell);
+    });
+
+    const actions = document.createElement('td');
+    if (booking.club_name === document.getElementById('club_name').value) {
+        const reschedule = document.createElement('button');
+        reschedule.type = 'button';
+        reschedule.className = 'reschedule-btn';
+        reschedule.textContent = 'Reschedule';
+        actions.appendChild(reschedule);
+
+        const form = document.createElement('form');
+        form.action = '/delete_booking';
+        form.method = 'POST';
+        form.onsubmit = () => confirm('Are you sure you want to delete this booking?');
+        const input = document.createElement('input');
+        input.type = 'hidden';
+        input.name = 'booking_id';
+        input.value = booking.booking_id;
+        form.appendChild(input);
+        const button = document.createElement('button');
+        button.type = 'submit';
+        button.className = 'delete-btn';
+        button.textContent = 'Delete';
+        form.appendChild(button);
+        actions.appendChild(form);
+    }
+    row.appendChild(actions);
+    return row;
+}
+
+// Converts a displayed time such as '02:30:00 PM' to the 'HH:MM' value of a time input
+function toInputTime(text) {
+    const [time, period] = text.split(' ');
+    const [hours, minutes] = time.split(':').map(Number);
+    return `${String(hours % 12 + (period === 'PM' ? 12 : 0)).padStart(2, '0')}:${String(minutes).padStart(2, '0')}`;
+}
+
+// Fills the booking form with a booking of this club, so submitting it moves the booking instead of adding one
+function startReschedule(row) {
+    const cells = row.querySelectorAll('td');
+    document.getElementById('booking_id').value = row.dataset.bookingId;
+    document.getElementById('date').value = row.dataset.sortKey.split('_')[0];
+    document.getElementById('from_time').value = toInputTime(cells[1].textContent);
+    document.getElementById('end_time').value = toInputTime(cells[2].textContent);
+    document.getElementById('venue_name').value = cells[3].textContent;
+
+    // The current link is kept unless a new one is entered, and a reschedule moves a single booking
+    const link = document.getElementById('link');
+    link.value = '';
+    link.required = false;
+    link.placeholder = 'Leave empty to keep the current link';
+    ['frequency', 'until', 'exceptions'].forEach(id => document.getElementById(id).disabled = true);
+
+    document.getElementById('formTitle').textContent = 'Reschedule Booking';
+    document.getElementById('formSubmit').value = 'Save Changes';
+    document.getElementById('cancelReschedule').hidden = false;
+    document.getElementById('venueForm').scrollIntoView({ behavior: 'smooth' });
+}
+
+function endReschedule() {
+    document.getElementById('venueForm').reset();
+    document.getElementById('booking_id').value = '';
+
+    const link = document.getElementById('link');
+    link.required = true;
+    link.placeholder = '';
+    ['frequency', 'until', 'exceptions'].forEach(id => document.getElementById(id).disabled = false);
+
+    document.getElementById('formTitle').textContent = 'Book a Venue';
+    document.getElementById('formSubmit').value = 'Book Venue';
+    document.getElementById('cancelReschedule').hidden = true;
+}
+
+// Shows a change made by this member: patched in by the live updates, or by reloading the page without them
+function showBookingChange() {
+    if (liveUpdates) {
+        endReschedule();
+    } else {
+        window.location.href = "/mainMember";
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    const container = document.querySelector('.booked-venue-details');
+    connectBookingEvents(container, 'tbody tr', createBookingRow, () => window.location.reload(), live => {
+        liveUpdates = live;
+    });
+
+    container.addEventListener('click', event => {
+        if (event.target.classList.contains('reschedule-btn')) {
+            startReschedule(event.target.closest('tr'));
+        }
+    });
+    document.getElementById('cancelReschedule').addEventListener('click', endReschedule);
+
+    // With live updates, a deletion is sent in the background and its event removes the row
+    container.addEventListener('submit', event => {
+        if (!liveUpdates || event.defaultPrevented) {
+            return;
+        }
+        event.preventDefault();
+        fetch(event.target.action, { method: 'POST', body: new FormData(event.target), redirect: 'manual' })
+            .catch(error => {
+                console.error('Error:', error);
+                alert('An error occurred while deleting the booking.');
+            });
+    });
+});
+
 document.getElementById("venueForm").addEventListener("submit", function (event) {
     event.preventDefault();
 
@@ -68,6 +186,18 @@ document.getElementById("venueForm").addEventListener("submit", function (event)
         return;
     }
 
+    const bookingId = document.getElementById("booking_id").value;
+    if (bookingId) {
+        rescheduleBooking(bookingId, dateInput, fromTimeInput, endTimeInput, venueName, venueLink);
+        return;
+    }
+
+    const frequency = document.getElementById("frequency").value;
+    if (frequency) {
+        bookSeries(dateInput, fromTimeInput, endTimeInput, venueName, venueLink, frequency, dateRegex);
+        return;
+    }
+
     // All validations passed, proceed with the fetch request
     fetch('/book_venue', {
         method: 'POST',
@@ -88,12 +218,116 @@ document.getElementById("venueForm").addEventListener("submit", function (event)
             // Show an alert if there's an error
             alert(data.message);
         } else {
-            // Redirect to the main page after successful booking
-            window.location.href = "/mainMember";
+            showBookingChange();
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('An error occurred while booking the venue.');
+    });
+});
+
+// Moves an existing booking of this club to the slot entered in the form
+function rescheduleBooking(bookingId, dateInput, fromTimeInput, endTimeInput, venueName, venueLink) {
+    const request = {
+        booking_id: Number(bookingId),
+        date: dateInput,
+        from_time: fromTimeInput,
+        end_time: endTimeInput,
+        venue_name: venueName
+    };
+    if (venueLink) {
+        request.link = venueLink;
+    }
+
+    fetch('/reschedule_booking', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(request)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'error') {
+            alert(data.message);
+        } else {
+            showBookingChange();
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('An error occurred while rescheduling the booking.');
+    });
+}
+
+// Books a recurring series; if some occurrences clash, offers to book the free ones
+function bookSeries(dateInput, fromTimeInput, endTimeInput, venueName, venueLink, frequency, dateRegex) {
+    const untilInput = document.getElementById("until").value;
+    if (!dateRegex.test(untilInput) || untilInput < dateInput) {
+        alert("Please enter an end date on or after the first date for a repeating booking.");
+        return;
+    }
+
+    const exceptions = document.getElementById("exceptions").value
+        .split(",")
+        .map(value => value.trim())
+        .filter(value => value !== "");
+    if (!exceptions.every(value => dateRegex.test(value))) {
+        alert("Invalid skip date. Please enter dates in YYYY-MM-DD format, separated by commas.");
+        return;
+    }
+
+    const request = {
+        date: dateInput,
+        until: untilInput,
+        frequency: frequency,
+        exceptions: exceptions,
+        from_time: fromTimeInput,
+        end_time: endTimeInput,
+        venue_name: venueName,
+        link: venueLink,
+        allow_partial: false
+    };
+
+    const send = () => fetch('/book_venue_series', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(request)
+    }).then(response => response.json());
+
+    send()
+    .then(data => {
+        if (data.status === 'success') {
+            return data;
+        }
+        if (!data.conflicts || data.conflicts.length === 0) {
+            alert(data.message);
+            return null;
+        }
+
+        const clashes = data.conflicts
+            .map(conflict => `${conflict.date}: ${conflict.club_name} (${conflict.from_time} - ${conflict.end_time})`)
+            .join("\n");
+        if (!confirm(`These occurrences clash with existing bookings:\n${clashes}\n\nBook the remaining dates?`)) {
+            return null;
+        }
+        request.allow_partial = true;
+        return send();
+    })
+    .then(data => {
+        if (!data) {
+            return;
+        }
+        alert(data.message);
+        if (data.status === 'success') {
+            showBookingChange();
         }
     })
     .catch(error => {
         console.error('Error:', error);
         alert('An error occurred while booking the venue.');
     });
-});
\ No newline at end of file
+}
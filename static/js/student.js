@@ -15,4 +15,85 @@ document.addEventListener('DOMContentLoaded', () => {
         scale: 1.00,
         scaleMobile: 1.00
     });
-});
\ No newline at end of file
+});
+
+// Interval between checks for booking updates, in milliseconds, when live updates are unavailable
+const BOOKINGS_POLL_INTERVAL = 30000;
+
+let bookingsETag = null;
+
+function createBookingBox(booking) {
+    const box = document.createElement('div');
+    box.className = 'booking-box';
+    box.dataset.bookingId = booking.booking_id;
+    box.dataset.sortKey = booking.sort_key;
+
+    const venue = document.createElement('h2');
+    venue.textContent = `Venue: ${booking.venue_name}`;
+    box.appendChild(venue);
+
+    [
+        `Club: ${booking.club_name}`,
+        `Date: ${booking.date}`,
+        `Time: ${booking.from_time} - ${booking.end_time}`
+    ].forEach(text => {
+        const paragraph = document.createElement('p');
+        paragraph.textContent = text;
+        box.appendChild(paragraph);
+    });
+
+    const buttonGroup = document.createElement('div');
+    buttonGroup.className = 'button-group';
+    const register = document.createElement('a');
+    register.href = booking.venue_link;
+    register.target = '_blank';
+    register.className = 'home-btn';
+    register.textContent = 'REGISTER';
+    buttonGroup.appendChild(register);
+    box.appendChild(buttonGroup);
+
+    return box;
+}
+
+function renderBookings(bookings) {
+    const container = document.querySelector('.bookings');
+    container.replaceChildren(...bookings.map(createBookingBox));
+}
+
+function refreshBookings() {
+    const headers = {};
+    if (bookingsETag) {
+        headers['If-None-Match'] = bookingsETag;
+    }
+
+    // The server answers 304 Not Modified without querying the bookings when nothing has changed
+    fetch('/api/bookings' + window.location.search, { headers: headers, cache: 'no-store' })
+        .then(response => {
+            if (response.status === 304 || !response.ok) {
+                return null;
+            }
+            bookingsETag = response.headers.get('ETag');
+            return response.json();
+        })
+        .then(data => {
+            if (data) {
+                renderBookings(data.bookings);
+            }
+        })
+        .catch(error => console.error('Error:', error));
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    // Bookings are patched in place as they change; polling is the fallback for browsers without EventSource,
+    // and for streams the server refused or that could not be kept open
+    const container = document.querySelector('.bookings');
+    let pollTimer = null;
+    connectBookingEvents(container, '.booking-box', createBookingBox, refreshBookings, live => {
+        if (live || pollTimer !== null) {
+            return;
+        }
+        // Changes made while the stream was connecting or open may have been missed
+        refreshBookings();
+        pollTimer = setInterval(refreshBookings, BOOKINGS_POLL_INTERVAL);
+    });
+});